@@ -0,0 +1,96 @@
+"""
+Microbenchmark : calcul de couverture RGB sur une image pleine résolution,
+ancienne version de calcul_pourcentage_nuance (une passe par équipe, différences en uint8)
+comparée au noyau empaqueté uint32 (une passe, table de correspondance), exact et avec tolérance,
+et à l'estimation par échantillonnage stratifié (intervalle de confiance à 95 %).
+
+Rapporte le temps moyen et le pic mémoire (tracemalloc, allocations NumPy comprises).
+
+Usage :
+    python -m benchmarks.bench_coverage_kernel --repeat 5
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from utils.config import PlayerConfig, TeamConfig
+from utils.recup_couleur import calcul_pourcentage_nuance, estimer_pourcentage_nuance, table_couleurs
+
+RESOLUTIONS = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+
+
+def calcul_historique(arr, map_couleur, width, height, seuil=2):
+    """Version d'origine de calcul_pourcentage_nuance, conservée comme référence."""
+    total_pixels = width * height
+    if total_pixels == 0:
+        return {team: 0.0 for team in map_couleur}
+    arr = np.array(arr)
+    seuil_carre = seuil * seuil
+    compteur_couleur = {team: 0 for team in map_couleur}
+    for ident, (r_ref, g_ref, b_ref) in map_couleur.items():
+        r_diff = arr[:, :, 0] - r_ref
+        g_diff = arr[:, :, 1] - g_ref
+        b_diff = arr[:, :, 2] - b_ref
+        dist_carre = r_diff**2 + g_diff**2 + b_diff**2
+        compteur_couleur[ident] = np.sum(dist_carre <= seuil_carre)
+    return {team: (count / total_pixels) for team, count in compteur_couleur.items()}
+
+
+def make_frame(width, height, count=3000, seed=1):
+    """Traînées antialiasées avec contours blancs, comme l'ancienne couche de peinture."""
+    rng = random.Random(seed)
+    surface = pygame.Surface((width, height))
+    colors = list(TeamConfig.COLOR_MAP.values())
+    for _ in range(count):
+        x, y = rng.randrange(width), rng.randrange(height)
+        pygame.draw.circle(surface, rng.choice(colors), (x, y), PlayerConfig.RADIUS * 2)
+        pygame.draw.aaline(surface, (255, 255, 255), (x - 20, y), (x + 20, y + 5))
+    return pygame.surfarray.array3d(surface)
+
+
+def measure(fn, repeat):
+    fn()  # échauffement (tables de correspondance construites une fois)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cmap = TeamConfig.COLOR_MAP
+    print(f"table de correspondance : {table_couleurs(cmap, 20).nbytes / 1e6:.1f} Mo (construite une fois par palette/seuil)")
+    print(f"{'écran':>6} | {'version':>20} | {'ms':>8} | {'pic Mo':>7} | pourcentages")
+    for label, (width, height) in RESOLUTIONS.items():
+        frame = make_frame(width, height)
+        cases = (
+            ("historique seuil=2", lambda: calcul_historique(frame, cmap, width, height, seuil=2)),
+            ("empaqueté exact", lambda: calcul_pourcentage_nuance(frame, cmap, width, height, seuil=0)),
+            ("empaqueté seuil=2", lambda: calcul_pourcentage_nuance(frame, cmap, width, height, seuil=2)),
+            ("empaqueté seuil=20", lambda: calcul_pourcentage_nuance(frame, cmap, width, height, seuil=20)),
+            ("échantillon n=4096", lambda: estimer_pourcentage_nuance(frame, cmap, 4096, seuil=2)),
+        )
+        for name, fn in cases:
+            elapsed, peak, result = measure(fn, args.repeat)
+            ratios = " ".join(
+                f"T{team}={r[0] * 100:.2f}±{r[1] * 100:.2f}%" if isinstance(r, tuple) else f"T{team}={float(r) * 100:.2f}%"
+                for team, r in result.items()
+            )
+            print(f"{label:>6} | {name:>20} | {elapsed * 1000:>8.2f} | {peak / 1e6:>7.1f} | {ratios}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark : couverture exacte par tuiles (CouvertureTuiles) comparée au noyau empaqueté
+en un seul appel, à froid (toutes les tuiles comptées), puis avec le cache de tuiles
+(image inchangée, et quelques traînées ajoutées entre deux appels).
+
+Le gain du pool de threads dépend du nombre de cœurs : comparer --workers 1 et --workers N.
+
+Usage :
+    python -m benchmarks.bench_coverage_tiles --workers 1 4 16
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import random
+import time
+
+from utils.config import TeamConfig
+from utils.recup_couleur import CouvertureTuiles, calcul_pourcentage_nuance
+from benchmarks.bench_coverage_kernel import RESOLUTIONS, make_frame
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cmap = TeamConfig.COLOR_MAP
+    rng = random.Random(3)
+    print(f"{os.cpu_count()} cœur(s)")
+    print(f"{'écran':>6} | {'version':>18} | {'froid (ms)':>10} | {'inchangé (ms)':>13} | {'3 traînées (ms)':>15} | {'tuiles recomptées':>17}")
+    for label, (width, height) in RESOLUTIONS.items():
+        frame = make_frame(width, height)
+        calcul_pourcentage_nuance(frame, cmap, width, height, seuil=2)  # table de couleurs construite
+        single = timed(lambda: calcul_pourcentage_nuance(frame, cmap, width, height, seuil=2), args.repeat)
+        print(f"{label:>6} | {'une passe':>18} | {single * 1000:>10.2f} | {single * 1000:>13.2f} | {single * 1000:>15.2f} | {'-':>17}")
+
+        for workers in args.workers:
+            tiles = CouvertureTuiles(cmap, workers=workers, seuil=2)
+
+            def cold():
+                tiles._cache.clear()
+                tiles.compter(frame)
+
+            def dirty():
+                for _ in range(3):
+                    x, y = rng.randrange(width - 40), rng.randrange(height - 40)
+                    frame[x:x + 30, y:y + 30] = (237, 28, 36)
+                tiles.compter(frame)
+
+            cold_s = timed(cold, args.repeat)
+            unchanged_s = timed(lambda: tiles.compter(frame), args.repeat)
+            dirty_s = timed(dirty, args.repeat)
+            total = -(-frame.shape[0] // tiles.hauteur)
+            print(f"{label:>6} | {f'tuiles x{workers}':>18} | {cold_s * 1000:>10.2f} | {unchanged_s * 1000:>13.2f} | "
+                  f"{dirty_s * 1000:>15.2f} | {f'{tiles.recomptees}/{total}':>17}")
+            tiles.close()
+
+
+if __name__ == "__main__":
+    main()
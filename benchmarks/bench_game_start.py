@@ -0,0 +1,98 @@
+"""
+Microbenchmark : délai entre l'ordre de départ d'une partie et le premier snapshot publié,
+processus de jeu lancé à froid (mp.Process(real_game_logic), méthode spawn) comparé au
+processus de réserve déjà importé (game_worker) qui ne reçoit que les paramètres de la manche.
+
+Usage :
+    python -m benchmarks.bench_game_start --runs 3
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import multiprocessing as mp
+import statistics
+import time
+
+from game_core.paint_buffer import PaintBuffer
+from game_core.player_table import PlayerTable
+from game_core.real_game import game_worker, real_game_logic
+from game_core.snapshot import SnapshotChannel
+
+
+def first_snapshot(channel, since, timeout=60.0):
+    """Attend une publication plus récente que `since` ; retourne l'instant (perf_counter) où elle est vue."""
+    deadline = time.perf_counter() + timeout
+    while channel.latest.version == since:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Aucun snapshot publié")
+        time.sleep(0.0005)
+    return time.perf_counter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--standby-delay", type=float, default=5.0, help="secondes laissées à la réserve pour s'initialiser")
+    args = parser.parse_args()
+
+    mp.set_start_method("spawn")
+    manager = mp.Manager()
+    player_table = PlayerTable.create()
+    paint_buffer = PaintBuffer.create()
+    channel = SnapshotChannel.create()
+    for i in range(8):
+        player_table.register(f"Player{i}", i % 3)
+    shared = dict(
+        game_started=manager.Value("b", True),
+        friendly_collisions=manager.Value("b", True),
+        game_duration=manager.Value("i", 60),
+        speed_config=manager.dict({"neutre": 8, "allie": 12, "ennemi": 4}),
+        prepare_phase=manager.Value("b", False),
+        game_start_time=manager.Value("d", 0.0),
+    )
+
+    def game_args(*head):
+        return (*head, player_table, channel, shared["game_started"], shared["friendly_collisions"], paint_buffer,
+                shared["game_duration"], shared["speed_config"], shared["prepare_phase"], shared["game_start_time"])
+
+    def stop(proc):
+        shared["game_started"].value = False
+        proc.join()
+        shared["game_started"].value = True
+
+    results = {"à froid": [], "réserve": []}
+    try:
+        for _ in range(args.runs):
+            since = channel.latest.version
+            shared["game_start_time"].value = time.time()
+            start = time.perf_counter()
+            proc = mp.Process(target=real_game_logic, args=game_args())
+            proc.start()
+            results["à froid"].append(first_snapshot(channel, since) - start)
+            stop(proc)
+
+            start_recv, start_send = mp.Pipe(duplex=False)
+            proc = mp.Process(target=game_worker, args=game_args(start_recv))
+            proc.start()
+            time.sleep(args.standby_delay)
+            since = channel.latest.version
+            shared["game_start_time"].value = time.time()
+            start = time.perf_counter()
+            start_send.send({"duration": 60})
+            results["réserve"].append(first_snapshot(channel, since) - start)
+            stop(proc)
+    finally:
+        channel.close()
+        channel.unlink()
+        paint_buffer.close()
+        paint_buffer.unlink()
+        player_table.close()
+        player_table.unlink()
+
+    print(f"{'lancement':>9} | {'médiane (ms)':>12} | {'min (ms)':>8} | {'max (ms)':>8}")
+    for label, times in results.items():
+        print(f"{label:>9} | {statistics.median(times) * 1000:>12.1f} | {min(times) * 1000:>8.1f} | {max(times) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
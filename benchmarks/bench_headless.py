@@ -0,0 +1,207 @@
+"""
+Banc de charge sans écran ni téléphones : débit de la boucle de jeu pour N joueurs synthétiques,
+pour dimensionner la machine d'un événement.
+
+Chaque tour reproduit le travail d'un tour de real_game_logic en phase de jeu, sans les attentes de
+l'horloge à pas fixe (on mesure ce que la machine peut tenir) : pas de simulation (simulation_tick),
+construction du snapshot (SnapshotEncoder) et dépôt dans la boîte « dernière valeur ». Les joueurs
+sont dans une PlayerTable en mémoire privée à la place de la table partagée par le manager ; leurs
+entrées sont poussées dans la file d'entrées comme le ferait la webapp :
+- joystick : chaque joueur décrit un cercle, à sa propre phase, une nouvelle direction par tour ;
+- tir : rafale de `--burst` tirs toutes les `--burst-every` tours, dans la direction de visée (tournante).
+
+Chaque valeur de N tourne dans un processus neuf (mémoire mesurée sans les essais précédents).
+Résultat en JSON (tours/s, p50/p99 du tour, étapes, mémoire) pour comparer les commits entre eux.
+
+Usage :
+    python -m benchmarks.bench_headless --players 10 50 100 250 --seconds 5 --output bench.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import json
+import math
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from utils.config import GameConfig, PlayerConfig
+from game_core.input_ring import INPUT_AIM, INPUT_MOVE, INPUT_SHOOT
+from game_core.obstacle_grid import ObstacleGrid
+from game_core.paint_buffer import PaintBuffer
+from game_core.player_table import PlayerTable
+from game_core.projectiles import ProjectilePool
+from game_core.real_game import colonnes_joueurs, creer_obstacles, find_spawn_position, simulation_tick
+from game_core.snapshot import SnapshotChannel, SnapshotEncoder
+from game_core.tick_profiler import PUBLISH, SNAPSHOT, TickProfiler
+
+ROOT = Path(__file__).resolve().parent.parent
+SPEEDS = {"neutre": 8, "allie": 12, "ennemi": 4}
+
+
+def memory_mb():
+    """
+    (mémoire résidente courante, pic de mémoire résidente) du processus, en Mo (None hors Linux).
+    Lus ensemble dans /proc/self/status (VmRSS, VmHWM, en kB) : même source, même unité, pic >= courante.
+    """
+    values = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("VmRSS", "VmHWM"):
+                    values[name] = int(value.split()[0]) / 1024
+    except (OSError, ValueError):
+        pass
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def push_inputs(table, slots, tick, burst, burst_every):
+    """Entrées scriptées d'un tour : déplacement en cercle, visée tournante et rafales de tirs."""
+    for i, slot in enumerate(slots):
+        a = tick * 0.05 + i
+        table.inputs.push(slot, INPUT_MOVE, math.cos(a), math.sin(a))
+        aim = -a * 2
+        table.inputs.push(slot, INPUT_AIM, math.cos(aim), math.sin(aim))
+        if (tick + i) % burst_every < burst:
+            table.inputs.push(slot, INPUT_SHOOT, aim)
+
+
+def _silence():
+    """Les messages du jeu (touches, respawns, niveaux) ne doivent pas noyer le rapport ; ils restent écrits, donc comptés."""
+    sys.stdout = open(os.devnull, "w")
+    logging.disable(logging.INFO)
+
+
+def run(players, seconds, warmup, burst, burst_every, seed):
+    """Mesure pour `players` joueurs ; exécuté dans un processus dédié."""
+    random.seed(seed)
+    rss_start, _ = memory_mb()
+    table = PlayerTable.local(capacity=max(players, GameConfig.MAX_PLAYERS))
+    obstacles = ObstacleGrid(creer_obstacles())
+    for i in range(players):
+        slot = table.register(f"Bot{i}", i % 3)
+        table.x[slot], table.y[slot] = find_spawn_position(int(table.team[slot]), obstacles, table)
+        table.health[slot] = PlayerConfig.MAX_HEALTH
+    slots = table.active_slots()
+    paint_buffer = PaintBuffer.local()
+    projectiles = ProjectilePool()
+    channel = SnapshotChannel.local()
+    encoder = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL)
+    profiler = TickProfiler.local()
+    static = {"obstacles": [{"x": o.x, "y": o.y, "width": o.width, "height": o.height} for o in obstacles],
+              "start_time": time.time(), "duration": 180}
+    dt = 1.0 / GameConfig.SIM_HZ
+    sim_time = time.time()
+
+    durations = []
+    max_projectiles = 0
+    tick = 0
+    deadline = None
+    while deadline is None or time.perf_counter() < deadline:
+        if tick == warmup:
+            # Fin du préchauffage : seules les mesures suivantes comptent (start_match garderait les totaux)
+            durations.clear()
+            profiler = TickProfiler.local()
+            deadline = time.perf_counter() + seconds
+        push_inputs(table, slots, tick, burst, burst_every)
+        sim_time += dt
+
+        start = time.perf_counter()
+        profiler.begin()
+        simulation_tick(table, obstacles, projectiles, paint_buffer, sim_time, dt, SPEEDS, True, profiler)
+        message = encoder.encode(colonnes_joueurs(table), projectiles.snapshot(), static)
+        profiler.lap(SNAPSHOT)
+        channel.publish(message)
+        profiler.lap(PUBLISH)
+        profiler.end(players, len(projectiles))
+        durations.append(time.perf_counter() - start)
+
+        max_projectiles = max(max_projectiles, len(projectiles))
+        tick += 1
+
+    rss_end, rss_peak = memory_mb()
+    durations = np.array(durations)
+    stages = {name: seconds / runs * 1e3 for name, (runs, seconds) in profiler.totals().items()
+              if runs and name != "tick"}
+    # Les étapes sont mesurées à l'intérieur de chaque tour : leur somme ne peut dépasser la durée du tour
+    if sum(stages.values()) > durations.mean() * 1e3:
+        raise RuntimeError(f"Étapes ({sum(stages.values()):.3f} ms) plus longues que le tour "
+                           f"({durations.mean() * 1e3:.3f} ms) : mesures incohérentes")
+    return {
+        "players": players,
+        "ticks": int(durations.size),
+        "ticks_per_s": durations.size / durations.sum(),
+        "tick_ms": {
+            "mean": durations.mean() * 1e3,
+            "p50": float(np.percentile(durations, 50)) * 1e3,
+            "p99": float(np.percentile(durations, 99)) * 1e3,
+            "max": durations.max() * 1e3,
+        },
+        "budget_ms": dt * 1e3,
+        "overruns": int((durations > dt).sum()),
+        "stages_mean_ms": stages,
+        "projectiles_max": max_projectiles,
+        "memory_mb": {"rss_start": rss_start, "rss_end": rss_end, "rss_peak": rss_peak},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 50, 100, 250])
+    parser.add_argument("--seconds", type=float, default=5.0, help="durée mesurée par valeur de N")
+    parser.add_argument("--warmup", type=int, default=120, help="tours non mesurés avant chaque mesure")
+    parser.add_argument("--burst", type=int, default=3, help="tirs par rafale")
+    parser.add_argument("--burst-every", type=int, default=30, help="tours entre deux débuts de rafale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="fichier JSON (sortie standard par défaut)")
+    args = parser.parse_args()
+
+    results = []
+    for players in args.players:
+        # Un processus neuf par N : pic mémoire propre à chaque mesure
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"), initializer=_silence) as pool:
+            result = pool.submit(run, players, args.seconds, args.warmup, args.burst, args.burst_every, args.seed).result()
+        results.append(result)
+        print(f"[Bench] {players:>4} joueurs : {result['ticks_per_s']:>8.1f} tours/s, "
+              f"p50 {result['tick_ms']['p50']:.2f} ms, p99 {result['tick_ms']['p99']:.2f} ms, "
+              f"pic {result['memory_mb']['rss_peak']:.0f} Mo", file=sys.stderr)
+
+    report = {
+        "benchmark": "headless",
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sim_hz": GameConfig.SIM_HZ,
+        "screen": [GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT],
+        "params": {"seconds": args.seconds, "warmup": args.warmup, "burst": args.burst,
+                   "burst_every": args.burst_every, "seed": args.seed},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
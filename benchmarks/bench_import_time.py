@@ -0,0 +1,79 @@
+"""
+Microbenchmark : coût d'import du module d'entrée de chaque processus, mesuré dans un interpréteur neuf,
+puis coût du premier accès à GameConfig.BASE_WIDTH (résolution de l'écran) :
+- « transmis » : le manager a exporté la résolution (PAINTWAR_SCREEN), comme pour les processus enfants ;
+- « détecté » : la variable est absente, pygame ouvre l'affichage pour lire la résolution native.
+
+Pour chaque cas, indique si pygame a été importé et si son module display est resté initialisé
+(connexion au serveur d'affichage gardée ouverte). Avec la méthode spawn, chaque enfant réimporte
+aussi le module principal : la ligne « manager » donne ce coût commun.
+
+Usage :
+    python -m benchmarks.bench_import_time --runs 5
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from utils.config import SCREEN_ENV
+
+MODULES = {
+    "manager": "manager",
+    "webapp": "network.server_process",
+    "admin": "network.admin_process",
+    "affichage": "utils.display_process",
+    "lobby": "game_core.lobby_logic",
+    "jeu": "game_core.real_game",
+    "couleurs": "utils.recup_couleur",
+    "config": "utils.config",
+}
+
+_PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+imported = time.perf_counter() - start
+from utils.config import GameConfig
+start = time.perf_counter()
+GameConfig.BASE_WIDTH
+resolved = time.perf_counter() - start
+pygame = sys.modules.get("pygame")
+print(json.dumps({"import": imported, "resolve": resolved, "pygame": pygame is not None,
+                  "display": bool(pygame and pygame.display.get_init())}))
+"""
+
+
+def probe(module, shared_screen):
+    env = dict(os.environ)
+    if shared_screen:
+        env[SCREEN_ENV] = "1920x1080"
+    else:
+        env.pop(SCREEN_ENV, None)
+    out = subprocess.run([sys.executable, "-c", _PROBE, module], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES), choices=list(MODULES))
+    args = parser.parse_args()
+
+    print(f"{'processus':>9} | {'écran':>8} | {'import (ms)':>11} | {'résolution (ms)':>15} | {'pygame':>6} | {'display ouvert':>14}")
+    for label in args.modules:
+        for shared_screen in (True, False):
+            runs = [probe(MODULES[label], shared_screen) for _ in range(args.runs)]
+            imported = statistics.median(r["import"] for r in runs) * 1000
+            resolved = statistics.median(r["resolve"] for r in runs) * 1000
+            last = runs[-1]
+            print(f"{label:>9} | {'transmis' if shared_screen else 'détecté':>8} | {imported:>11.1f} | {resolved:>15.2f} | "
+                  f"{'oui' if last['pygame'] else 'non':>6} | {'oui' if last['display'] else 'non':>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark : temps de tick en fonction du nombre d'obstacles, parcours linéaire
+(une seule cellule couvrant toute l'arène, équivalent à l'ancien scan de la liste)
+comparé à la grille uniforme ObstacleGrid.
+
+Usage :
+    python -m benchmarks.bench_obstacle_grid --obstacles 20 200 2000 --players 40
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import random
+import time
+
+from utils.config import GameConfig, ObstacleConfig
+from game_core.input_ring import INPUT_MOVE, INPUT_SHOOT
+from game_core.obstacle_grid import ObstacleGrid
+from game_core.player_table import PlayerTable
+from game_core.projectiles import ProjectilePool
+from game_core.real_game import simulation_tick
+from benchmarks.bench_player_table import SPEEDS, make_obstacles, joystick
+
+
+def bench(grid, players, ticks):
+    random.seed(1)
+    table = PlayerTable.local()
+    for i in range(players):
+        slot = table.register(f"P{i}", i % 3)
+        table.x[slot] = random.randint(100, GameConfig.BASE_WIDTH - 100)
+        table.y[slot] = random.randint(100, GameConfig.BASE_HEIGHT - 100)
+        table.speed[slot] = SPEEDS["neutre"]
+    slots = table.active_slots()
+    projectiles = ProjectilePool()
+    durations = []
+    for tick in range(ticks):
+        for i, slot in enumerate(slots):
+            table.inputs.push(slot, INPUT_MOVE, *joystick(i, tick))
+            if (tick + i) % 30 == 0:
+                table.inputs.push(slot, INPUT_SHOOT, tick * 0.1 + i)
+        start = time.perf_counter()
+        simulation_tick(table, grid, projectiles, None, time.time(), 1 / GameConfig.SIM_HZ, SPEEDS, True)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return sum(durations) / len(durations), durations[len(durations) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--obstacles", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--ticks", type=int, default=30, help="ticks mesurés par configuration (parcours linéaire : ~0,4 s par tick à 2000 obstacles)")
+    args = parser.parse_args()
+
+    whole_arena = max(GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT)
+    print(f"cellule grille: {ObstacleConfig.GRID_CELL_SIZE}px, {args.players} joueurs, {args.ticks} ticks")
+    print(f"{'obstacles':>9} | {'linéaire (ms)':>14} | {'grille (ms)':>12} | {'gain':>7}")
+    for count in args.obstacles:
+        obstacles = make_obstacles(count)
+        linear_mean, _ = bench(ObstacleGrid(obstacles, cell_size=whole_arena), args.players, args.ticks)
+        grid_mean, _ = bench(ObstacleGrid(obstacles), args.players, args.ticks)
+        print(f"{count:>9} | {linear_mean * 1000:>14.3f} | {grid_mean * 1000:>12.3f} | {linear_mean / grid_mean:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
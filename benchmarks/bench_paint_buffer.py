@@ -0,0 +1,139 @@
+"""
+Microbenchmark : coût de la peinture côté jeu et calcul des couleurs.
+
+- lecture au sol : ancienne voie (array3d + pickle via paint_surface_queue + make_surface + get_at)
+  comparée à la grille de propriété partagée (owner_at) ;
+- couverture : ancien calcul RGB (version d'origine de calcul_pourcentage_nuance sur array3d) comparé au np.bincount de la grille
+  et à la lecture des compteurs incrémentaux (live_coverage) ;
+- calque d'affichage : mise à l'échelle de toute la grille à chaque génération comparée
+  au rafraîchissement des seules tuiles sales (dirty_rects), avec 40 joueurs en mouvement.
+
+Usage :
+    python -m benchmarks.bench_paint_buffer --frames 20
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import pickle
+import random
+import time
+
+import numpy as np
+import pygame
+
+from utils.config import PlayerConfig, TeamConfig
+from benchmarks.bench_coverage_kernel import calcul_historique
+from game_core.paint_buffer import PaintBuffer
+
+RESOLUTIONS = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+
+
+def trails(width, height, count=400, seed=1):
+    rng = random.Random(seed)
+    teams = list(TeamConfig.COLOR_MAP)
+    return [(rng.randrange(width), rng.randrange(height), rng.choice(teams)) for _ in range(count)]
+
+
+def lookups(width, height, count=60, seed=2):
+    rng = random.Random(seed)
+    return [(rng.randrange(width), rng.randrange(height)) for _ in range(count)]
+
+
+def timed(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames
+
+
+def bench_surface(width, height, frames):
+    """Ce que faisaient l'affichage puis le jeu (toutes les 100 ms) et le processus couleurs (toutes les 2 s)."""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for x, y, team in trails(width, height):
+        pygame.draw.circle(surface, TeamConfig.COLOR_MAP[team], (x, y), PlayerConfig.RADIUS)
+    points = lookups(width, height)
+
+    def lookup():
+        received = pygame.surfarray.make_surface(pickle.loads(pickle.dumps(pygame.surfarray.array3d(surface))))
+        for x, y in points:
+            received.get_at((x, y))
+
+    def coverage():
+        arr = pickle.loads(pickle.dumps(pygame.surfarray.array3d(surface)))
+        calcul_historique(arr, TeamConfig.COLOR_MAP, width, height)
+
+    return timed(lookup, frames), timed(coverage, frames)
+
+
+def bench_grid(width, height, frames):
+    paint = PaintBuffer.local(width, height)
+    xs, ys, teams = (np.array(col) for col in zip(*trails(width, height)))
+    paint.paint_trails(xs, ys, xs, ys, teams, PlayerConfig.RADIUS)
+    points = lookups(width, height)
+
+    def lookup():
+        for x, y in points:
+            paint.owner_at(x, y)
+
+    def coverage():
+        paint.coverage(list(TeamConfig.COLOR_MAP))
+
+    def live():
+        paint.live_coverage(list(TeamConfig.COLOR_MAP))
+
+    return timed(lookup, frames), timed(coverage, frames), timed(live, frames)
+
+
+def bench_layer(width, height, frames, players=40, seed=4):
+    paint = PaintBuffer.local(width, height)
+    surface = paint.surface()
+    cs = paint.cell_size
+    size = (paint.cols * cs, paint.rows * cs)
+    layer = pygame.transform.scale(surface, size)
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, width, players), rng.uniform(0, height, players)
+    teams = rng.integers(0, 3, players)
+    full = tiles = 0.0
+    dirty = 0
+    for _ in range(frames):
+        generation = paint.generation
+        nx = np.clip(x + rng.uniform(-12, 12, players), 0, width - 1)
+        ny = np.clip(y + rng.uniform(-12, 12, players), 0, height - 1)
+        paint.paint_trails(x, y, nx, ny, teams, PlayerConfig.RADIUS)
+        x, y = nx, ny
+
+        start = time.perf_counter()
+        pygame.transform.scale(surface, size)
+        full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        rects = paint.dirty_rects(generation)
+        for c0, r0, w, h in rects:
+            pygame.transform.scale(surface.subsurface((c0, r0, w, h)), (w * cs, h * cs),
+                                   layer.subsurface((c0 * cs, r0 * cs, w * cs, h * cs)))
+        tiles += time.perf_counter() - start
+        dirty += len(rects)
+    return full / frames, tiles / frames, dirty / frames / (paint.tiles_x * paint.tiles_y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'écran':>6} | {'sol RGB (ms)':>12} | {'sol grille (ms)':>15} | {'couv. RGB (ms)':>14} | "
+          f"{'couv. grille (ms)':>17} | {'couv. direct (ms)':>17}")
+    for label, (width, height) in RESOLUTIONS.items():
+        surface_lookup, surface_cov = bench_surface(width, height, args.frames)
+        grid_lookup, grid_cov, live_cov = bench_grid(width, height, args.frames)
+        print(f"{label:>6} | {surface_lookup * 1000:>12.2f} | {grid_lookup * 1000:>15.3f} | "
+              f"{surface_cov * 1000:>14.2f} | {grid_cov * 1000:>17.3f} | {live_cov * 1000:>17.4f}")
+
+    print(f"{'écran':>6} | {'calque plein (ms)':>17} | {'tuiles sales (ms)':>17} | {'part sale':>9}")
+    for label, (width, height) in RESOLUTIONS.items():
+        full, tiles, share = bench_layer(width, height, args.frames)
+        print(f"{label:>6} | {full * 1000:>17.2f} | {tiles * 1000:>17.2f} | {share * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
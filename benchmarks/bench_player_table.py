@@ -0,0 +1,179 @@
+"""
+Benchmark : ticks par seconde du jeu avec la table partagée (PlayerTable) comparé
+au chemin historique par proxy mp.Manager().dict().
+
+Le chemin proxy reproduit le schéma d'accès de l'ancienne boucle de jeu : chaque étape
+(respawn, déplacement, collisions, dépénétration, projectiles, snapshot) relit
+connected_players[pseudo] puis réécrit l'entrée complète, soit un aller-retour picklé
+vers le processus Manager par accès.
+
+Usage :
+    python -m benchmarks.bench_player_table --players 10 20 40 60 --seconds 2
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import math
+import multiprocessing as mp
+import random
+import time
+
+from utils.config import GameConfig, PlayerConfig
+from game_core.obstacle import Obstacle
+from game_core.obstacle_grid import ObstacleGrid
+from game_core.player import Player
+from game_core.player_table import PlayerTable
+from game_core.projectiles import ProjectilePool
+from game_core.input_ring import INPUT_MOVE
+from game_core.real_game import (
+    collides_with_any_obstacle, player_obstacle_collisions, simulation_tick, snapshot_joueurs, distance,
+)
+
+SPEEDS = {"neutre": 8, "allie": 12, "ennemi": 4}
+
+
+def make_obstacles(count, seed=0):
+    rng = random.Random(seed)
+    obstacles = []
+    for _ in range(count):
+        x = rng.randint(80, GameConfig.BASE_WIDTH - 80)
+        y = rng.randint(80, GameConfig.BASE_HEIGHT - 80)
+        if rng.choice([True, False]):
+            obstacles.append(Obstacle(x, y, rng.randint(10, 15), rng.randint(60, 100)))
+        else:
+            obstacles.append(Obstacle(x, y, rng.randint(60, 100), rng.randint(10, 15)))
+    return obstacles
+
+
+def joystick(i, tick):
+    """Entrée joystick scriptée : chaque joueur tourne en rond à sa propre phase."""
+    a = tick * 0.05 + i
+    return math.cos(a), math.sin(a)
+
+
+# ------------------------------------------------------
+# Chemin historique : dict partagé via Manager
+# ------------------------------------------------------
+def proxy_populate(connected_players, n):
+    for i in range(n):
+        pseudo = f"P{i}"
+        p = Player(pseudo=pseudo, team=i % 3, x=random.randint(100, GameConfig.BASE_WIDTH - 100),
+                   y=random.randint(100, GameConfig.BASE_HEIGHT - 100))
+        p.speed = SPEEDS["neutre"]
+        connected_players[pseudo] = {
+            "id": i + 1,
+            "player": p.to_dict(),
+            "inputs": {"dx": 0.0, "dy": 0.0, "aim_dx": 0.0, "aim_dy": 0.0, "shoot_angle": None},
+        }
+
+
+def proxy_tick(connected_players, speed_config, friendly_collisions, obstacles, tick):
+    # Écriture des entrées (équivalent du serveur web)
+    for i, (pseudo, data) in enumerate(list(connected_players.items())):
+        data["inputs"]["dx"], data["inputs"]["dy"] = joystick(i, tick)
+        connected_players[pseudo] = data
+
+    # Respawn
+    for pseudo, data in list(connected_players.items()):
+        connected_players[pseudo] = data
+
+    # Déplacement
+    for pseudo, data in list(connected_players.items()):
+        p, inp = data["player"], data["inputs"]
+        p["speed"] = speed_config["neutre"]
+        new_x = p["x"] + p["speed"] * inp["dx"]
+        new_y = p["y"] + p["speed"] * inp["dy"]
+        if not collides_with_any_obstacle(new_x, new_y, PlayerConfig.RADIUS, obstacles):
+            p["x"] = max(0, min(GameConfig.BASE_WIDTH, new_x))
+            p["y"] = max(0, min(GameConfig.BASE_HEIGHT, new_y))
+        connected_players[pseudo] = data
+
+    # Collisions joueurs
+    players_list = list(connected_players.items())
+    for i in range(len(players_list)):
+        pseudo1, d1 = players_list[i]
+        for j in range(i + 1, len(players_list)):
+            pseudo2, d2 = players_list[j]
+            p1, p2 = d1["player"], d2["player"]
+            if (not friendly_collisions.value) and (p1["team"] == p2["team"]):
+                continue
+            if distance(p1["x"], p1["y"], p2["x"], p2["y"]) < PlayerConfig.RADIUS * 2:
+                connected_players[pseudo1] = d1
+                connected_players[pseudo2] = d2
+
+    # Dépénétration obstacles
+    for pseudo, data in connected_players.items():
+        p = data["player"]
+        p["x"], p["y"] = player_obstacle_collisions(p["x"], p["y"], obstacles)
+        connected_players[pseudo] = data
+
+    # Snapshot
+    snapshot = {}
+    for pseudo, data in connected_players.items():
+        p = data["player"]
+        snapshot[pseudo] = {"id": data.get("id", 0), "x": p["x"], "y": p["y"], "team": p["team"]}
+    return snapshot
+
+
+def bench_proxy(n, seconds, obstacles):
+    manager = mp.Manager()
+    try:
+        connected_players = manager.dict()
+        speed_config = manager.dict(SPEEDS)
+        friendly_collisions = manager.Value("b", True)
+        proxy_populate(connected_players, n)
+        ticks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            proxy_tick(connected_players, speed_config, friendly_collisions, obstacles, ticks)
+            ticks += 1
+        return ticks / (time.perf_counter() - start)
+    finally:
+        manager.shutdown()
+
+
+# ------------------------------------------------------
+# Nouveau chemin : table en mémoire partagée
+# ------------------------------------------------------
+def bench_table(n, seconds, obstacles):
+    table = PlayerTable.create()
+    try:
+        for i in range(n):
+            slot = table.register(f"P{i}", i % 3)
+            table.x[slot] = random.randint(100, GameConfig.BASE_WIDTH - 100)
+            table.y[slot] = random.randint(100, GameConfig.BASE_HEIGHT - 100)
+            table.speed[slot] = SPEEDS["neutre"]
+        slots = table.active_slots()
+        projectiles = ProjectilePool()
+        ticks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for i, slot in enumerate(slots):
+                table.inputs.push(slot, INPUT_MOVE, *joystick(i, ticks))
+            now = time.time()
+            simulation_tick(table, obstacles, projectiles, None, now, 1 / GameConfig.SIM_HZ, SPEEDS, True)
+            snapshot_joueurs(table)
+            ticks += 1
+        return ticks / (time.perf_counter() - start)
+    finally:
+        table.close()
+        table.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 20, 40, 60])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    random.seed(0)
+    obstacles = ObstacleGrid(make_obstacles(20))
+    print(f"{'joueurs':>8} | {'proxy (ticks/s)':>16} | {'table (ticks/s)':>16} | {'gain':>7}")
+    for n in args.players:
+        proxy = bench_proxy(n, args.seconds, obstacles)
+        table = bench_table(n, args.seconds, obstacles)
+        print(f"{n:>8} | {proxy:>16.1f} | {table:>16.1f} | {table / proxy:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark : coût d'un tick de projectiles (avance, portée, obstacles, sortie d'écran)
+en fonction du nombre de projectiles en vol, dictionnaire de dictionnaires avancé un par un
+(ancien gestion_projectiles) comparé au ProjectilePool vectorisé.
+
+Usage :
+    python -m benchmarks.bench_projectiles --projectiles 100 1000 5000
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import math
+import random
+import time
+
+from utils.config import GameConfig, ProjectileConfig
+from game_core.obstacle_grid import ObstacleGrid
+from game_core.projectiles import ProjectilePool
+from benchmarks.bench_player_table import make_obstacles
+
+
+def random_shots(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, GameConfig.BASE_WIDTH), rng.uniform(0, GameConfig.BASE_HEIGHT),
+             rng.uniform(-math.pi, math.pi)) for _ in range(count)]
+
+
+def dict_tick(projectiles, grid):
+    """Boucle historique : un dict par projectile, suppression via to_remove."""
+    to_remove = []
+    for pid, proj in projectiles.items():
+        proj["x"] += proj["vx"]
+        proj["y"] += proj["vy"]
+        proj["dist_travelled"] += math.hypot(proj["vx"], proj["vy"])
+        if proj["dist_travelled"] >= proj["range"]:
+            to_remove.append(pid)
+            continue
+        if grid.collides(proj["x"], proj["y"], proj["radius"]):
+            to_remove.append(pid)
+            continue
+        if proj["x"] < 0 or proj["x"] > GameConfig.BASE_WIDTH or proj["y"] < 0 or proj["y"] > GameConfig.BASE_HEIGHT:
+            to_remove.append(pid)
+    for pid in to_remove:
+        del projectiles[pid]
+
+
+def bench_dict(shots, grid, ticks):
+    total = 0.0
+    for _ in range(ticks):
+        projectiles = {
+            i: {"x": x, "y": y, "vx": ProjectileConfig.SPEED * math.cos(a), "vy": ProjectileConfig.SPEED * math.sin(a),
+                "radius": ProjectileConfig.RADIUS, "range": ProjectileConfig.RANGE, "dist_travelled": 0.0}
+            for i, (x, y, a) in enumerate(shots)
+        }
+        start = time.perf_counter()
+        dict_tick(projectiles, grid)
+        total += time.perf_counter() - start
+    return total / ticks
+
+
+def bench_pool(shots, grid, ticks):
+    pool = ProjectilePool()
+    total = 0.0
+    for _ in range(ticks):
+        pool.clear()
+        for x, y, a in shots:
+            pool.spawn(x, y, a, 1, 0)
+        start = time.perf_counter()
+        pool.advance(grid)
+        pool.snapshot()
+        total += time.perf_counter() - start
+    return total / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projectiles", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--obstacles", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    grid = ObstacleGrid(make_obstacles(args.obstacles))
+    print(f"{args.obstacles} obstacles, {args.ticks} ticks")
+    print(f"{'projectiles':>11} | {'dict (ms)':>10} | {'pool (ms)':>10} | {'gain':>7}")
+    for count in args.projectiles:
+        shots = random_shots(count)
+        d = bench_dict(shots, grid, args.ticks)
+        p = bench_pool(shots, grid, args.ticks)
+        print(f"{count:>11} | {d * 1000:>10.3f} | {p * 1000:>10.3f} | {d / p:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Microbenchmark : débit de décodage des messages manette côté serveur,
+JSON historique (json.loads + lookups) comparé à la trame binaire (Struct précompilée).
+
+Usage :
+    python -m benchmarks.bench_protocol --messages 200000
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import json
+import time
+
+from game_core.input_ring import INPUT_MOVE, INPUT_AIM, INPUT_SHOOT
+from network.protocol import FLAG_MOVE, FLAG_AIM, FLAG_SHOOT, encode_frame, decode_frame
+
+
+def decode_json(raw):
+    """Même travail que la branche TEXT de ws_handler, sans la table des joueurs."""
+    data = json.loads(raw)
+    data.get("pseudo", "Guest")
+    cmd = data.get("command")
+    if cmd == "MOVE_VECTOR":
+        return [(INPUT_MOVE, float(data.get("dx", 0)), float(data.get("dy", 0)))]
+    elif cmd == "AIM_VECTOR":
+        return [(INPUT_AIM, float(data.get("dx", 0)), float(data.get("dy", 0)))]
+    elif cmd == "SHOOT_ANGLE":
+        return [(INPUT_SHOOT, float(data.get("angle", 0)), 0.0)]
+    return []
+
+
+def make_messages():
+    """Un mélange représentatif : surtout des déplacements, un peu de visée et de tirs."""
+    json_msgs = [
+        json.dumps({"pseudo": "Player123", "command": "MOVE_VECTOR", "dx": 0.7071067811865476, "dy": -0.7071067811865476}),
+        json.dumps({"pseudo": "Player123", "command": "MOVE_VECTOR", "dx": 0.12345678, "dy": 0.98765432}),
+        json.dumps({"pseudo": "Player123", "command": "AIM_VECTOR", "dx": 31.5, "dy": -12.25}),
+        json.dumps({"pseudo": "Player123", "command": "SHOOT_ANGLE", "angle": 2.356194490192345}),
+    ]
+    binary_msgs = [
+        encode_frame(FLAG_MOVE, 0.7071067811865476, -0.7071067811865476),
+        encode_frame(FLAG_MOVE, 0.12345678, 0.98765432),
+        encode_frame(FLAG_AIM, aim_dx=0.45, aim_dy=-0.175),
+        encode_frame(FLAG_SHOOT, angle=2.356194490192345),
+    ]
+    return json_msgs, binary_msgs
+
+
+def run(decode, messages, count):
+    n = len(messages)
+    start = time.perf_counter()
+    for i in range(count):
+        decode(messages[i % n])
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+
+    json_msgs, binary_msgs = make_messages()
+    json_size = sum(len(m.encode("utf-8")) for m in json_msgs) / len(json_msgs)
+    binary_size = sum(len(m) for m in binary_msgs) / len(binary_msgs)
+
+    json_rate = run(decode_json, json_msgs, args.messages)
+    binary_rate = run(decode_frame, binary_msgs, args.messages)
+
+    print(f"{'format':>8} | {'octets/msg':>10} | {'msg/s':>12} | {'us/msg':>7}")
+    print(f"{'json':>8} | {json_size:>10.1f} | {json_rate:>12.0f} | {1e6 / json_rate:>7.2f}")
+    print(f"{'binaire':>8} | {binary_size:>10.1f} | {binary_rate:>12.0f} | {1e6 / binary_rate:>7.2f}")
+    print(f"gain décodage: {binary_rate / json_rate:.1f}x, gain taille: {json_size / binary_size:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
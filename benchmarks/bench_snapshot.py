@@ -0,0 +1,103 @@
+"""
+Microbenchmark : taille et coût des snapshots jeu -> affichage,
+display_data complet picklé à chaque publication (ancienne Queue) comparé aux images clés + deltas
+(SnapshotEncoder/Decoder), puis à la publication/lecture dans la boîte « dernière valeur » (SnapshotChannel).
+
+Les joueurs sont dans une PlayerTable comme en jeu : ils bougent tous (x, y) mais ne changent que
+rarement de munitions, de visée ou de vie. Les coûts sont séparés entre le processus de jeu
+(construction de l'état, encodage, pickle) et l'affichage (unpickle, décodage) ; l'état reconstruit
+par le décodeur est vérifié contre l'état complet à chaque publication.
+
+Usage :
+    python -m benchmarks.bench_snapshot --players 10 50 100 250 --ticks 600
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from utils.config import GameConfig, PlayerConfig
+from game_core.player_table import PlayerTable
+from game_core.real_game import colonnes_joueurs, creer_obstacles, snapshot_joueurs
+from game_core.snapshot import SnapshotChannel, SnapshotDecoder, SnapshotEncoder
+
+
+def make_table(count, rng):
+    table = PlayerTable.local(capacity=count)
+    for i in range(count):
+        slot = table.register(f"Player{i}", i % 3)
+        table.health[slot] = PlayerConfig.MAX_HEALTH
+    table.x[:] = rng.uniform(0, 1000, count)
+    table.y[:] = rng.uniform(0, 700, count)
+    return table
+
+
+def step(table, rng):
+    """Un pas de simulation : tout le monde bouge, quelques visées et munitions changent."""
+    n = table.capacity
+    table.x += rng.uniform(-3, 3, n)
+    table.y += rng.uniform(-3, 3, n)
+    aim = rng.random(n) < 0.05
+    table.aim_angle[aim] = rng.uniform(-3.14, 3.14, int(aim.sum()))
+    shot = rng.random(n) < 0.02
+    table.ammo[shot] = np.maximum(0, table.ammo[shot] - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 50, 100, 250])
+    parser.add_argument("--ticks", type=int, default=600)
+    args = parser.parse_args()
+
+    obstacles = [{"x": o.x, "y": o.y, "width": o.width, "height": o.height} for o in creer_obstacles()]
+    static = {"obstacles": obstacles, "start_time": time.time(), "duration": 180}
+    print(f"{len(obstacles)} obstacles, image clé toutes les {GameConfig.SNAPSHOT_KEYFRAME_INTERVAL} publications")
+    print(f"{'':>7} | {'taille (o)':^21} | {'jeu (µs)':^21} | {'affichage (µs)':^21} |")
+    print(f"{'joueurs':>7} | {'complet':>10} {'delta':>10} | {'complet':>10} {'delta':>10} | "
+          f"{'complet':>10} {'delta':>10} | {'boîte (µs)':>10}")
+    for count in args.players:
+        rng = np.random.default_rng(count)
+        table = make_table(count, rng)
+        projectiles = np.zeros((count // 2, 3), dtype=np.float32)
+        encoder, decoder = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL), SnapshotDecoder()
+        channel = SnapshotChannel.local()
+        reader, channel_encoder = channel.reader(), SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL)
+        full_bytes = delta_bytes = 0
+        full_game = delta_game = full_display = delta_display = channel_time = 0.0
+        for _ in range(args.ticks):
+            step(table, rng)
+
+            start = time.perf_counter()
+            raw = pickle.dumps({"players": snapshot_joueurs(table), "projectiles": projectiles, **static})
+            middle = time.perf_counter()
+            expected = pickle.loads(raw)["players"]
+            full_display += time.perf_counter() - middle
+            full_game += middle - start
+            full_bytes += len(raw)
+
+            start = time.perf_counter()
+            raw = pickle.dumps(encoder.encode(colonnes_joueurs(table), projectiles, static))
+            middle = time.perf_counter()
+            state = decoder.apply(pickle.loads(raw))
+            delta_display += time.perf_counter() - middle
+            delta_game += middle - start
+            delta_bytes += len(raw)
+            assert state["players"] == expected and state["obstacles"] == obstacles
+
+            start = time.perf_counter()
+            channel.publish(channel_encoder.encode(colonnes_joueurs(table), projectiles, static))
+            state = reader.poll()
+            channel_time += time.perf_counter() - start
+            assert state["players"] == expected
+
+        n = args.ticks
+        print(f"{count:>7} | {full_bytes / n:>10.0f} {delta_bytes / n:>10.0f} | "
+              f"{full_game / n * 1e6:>10.1f} {delta_game / n * 1e6:>10.1f} | "
+              f"{full_display / n * 1e6:>10.1f} {delta_display / n * 1e6:>10.1f} | {channel_time / n * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
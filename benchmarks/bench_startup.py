@@ -0,0 +1,75 @@
+"""
+Macrobenchmark : temps de démarrage de `python manager.py` selon la méthode de lancement des processus,
+du lancement de l'interpréteur du manager jusqu'à ce que chaque processus (serveur du Manager, webapp,
+admin, affichage, lobby, couleurs, jeu de réserve) se soit déclaré prêt.
+
+Le manager est lancé tel quel (affichage SDL factice) avec PAINTWAR_START_METHOD, son rapport de démarrage
+est relevé puis il est arrêté par Ctrl+C (SIGINT) avant l'essai suivant.
+
+Usage :
+    python -m benchmarks.bench_startup --methods spawn forkserver --runs 3
+"""
+import argparse
+import os
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from utils.startup import START_METHOD_ENV, START_METHODS
+
+ROOT = Path(__file__).resolve().parent.parent
+_REPORT = re.compile(r"\[Manager\] Démarrage \((\w+)\) : tous les processus prêts en ([\d.]+)s \((.*)\)")
+
+
+def run_manager(method, timeout):
+    """{processus: secondes} relevé dans le rapport de démarrage d'un manager lancé avec `method`."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYTHONUNBUFFERED="1")
+    env[START_METHOD_ENV] = method
+    proc = subprocess.Popen([sys.executable, "manager.py"], cwd=ROOT, env=env, text=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    try:
+        for line in proc.stdout:
+            match = _REPORT.search(line)
+            if match:
+                times = {name: float(value) for name, value in re.findall(r"(\w+)=([\d.]+)s", match.group(3))}
+                times["total"] = float(match.group(2))
+                return times
+            if time.monotonic() > deadline:
+                break
+        raise RuntimeError(f"Pas de rapport de démarrage ({method})")
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.communicate(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--methods", nargs="+", default=list(START_METHODS), choices=START_METHODS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    results = {}
+    for _ in range(args.runs):
+        # Méthodes alternées : le cache disque profite également à chacune
+        for method in args.methods:
+            for name, seconds in run_manager(method, args.timeout).items():
+                results.setdefault(method, {}).setdefault(name, []).append(seconds)
+
+    names = ["total"] + sorted({name for times in results.values() for name in times} - {"total"})
+    print(f"{'processus':>9} | " + " | ".join(f"{method + ' (s)':>14}" for method in args.methods))
+    for name in names:
+        print(f"{name:>9} | " + " | ".join(f"{statistics.median(results[method][name]):>14.2f}" for method in args.methods))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""
+Test de charge des manettes : essaim de clients WebSocket asyncio sur /ws, en boucle locale,
+pour trouver le nombre de joueurs à partir duquel le serveur décroche.
+
+Le banc lance la webapp (network.server_process.webapp_main sur 127.0.0.1) et le processus de jeu
+(real_game_logic, partie sans fin) sur une table des joueurs de la taille du plus grand palier.
+Pour chaque palier de N joueurs, un processus client ouvre N connexions et, comme telecommande.js :
+- envoie HELLO (pseudo + protocole binaire), puis le vecteur de déplacement toutes les 50 ms (20 Hz) ;
+- tire des rafales de SHOOT_ANGLE (`--burst` tirs espacés de 100 ms toutes les `--burst-every` s) ;
+- envoie de temps en temps une visée (AIM) d'angle unique, la sonde de latence.
+
+Mesures, sur la fenêtre où toutes les manettes sont connectées :
+- débit envoyé par les clients et débit accepté par le serveur (entrées déposées dans les files
+  de la table partagée), et entrées perdues faute de place dans une file ;
+- retard de la boucle asyncio de la webapp (p50/p99/max sur les 10 dernières secondes, /metrics) ;
+- latence entrée -> snapshot : délai entre l'envoi d'une sonde et la première publication du jeu où
+  l'aim_angle du joueur vaut l'angle envoyé (lu ici dans la boîte « dernière valeur ») ;
+- retard du générateur lui-même : s'il prend du retard sur son horaire, le palier mesure la
+  machine de test plutôt que le serveur (serveur, jeu et clients partagent la même machine).
+
+Usage :
+    python -m benchmarks.bench_ws_load --players 50 100 200 400 --duration 10 --output ws_load.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing as mp
+import random
+import re
+import sys
+import time
+import urllib.request
+from queue import Empty
+
+import aiohttp
+import numpy as np
+
+from utils.config import share_screen
+from game_core.paint_buffer import PaintBuffer
+from game_core.player_table import PlayerTable
+from game_core.real_game import real_game_logic
+from game_core.snapshot import SnapshotChannel
+from game_core.tick_profiler import TickProfiler
+from network.protocol import FLAG_AIM, FLAG_MOVE, FLAG_SHOOT, PROTOCOL_VERSION, encode_frame
+from network.server_process import webapp_main
+
+HOST = "127.0.0.1"
+# Connexions ouvertes simultanément pendant la montée en charge (file d'attente d'accept du serveur)
+CONNECT_CONCURRENCY = 50
+# Seuils de décrochage
+MIN_ACCEPTED_RATIO = 0.98
+MAX_LOOP_LAG = 0.050
+MAX_LATENCY_P99 = 0.100
+MAX_GENERATOR_LAG = 0.020
+# Écart toléré entre l'angle envoyé et celui publié (quantification du protocole binaire)
+ANGLE_TOLERANCE = 1e-3
+
+
+# ------------------------------------------------------
+# Processus client : l'essaim
+# ------------------------------------------------------
+def probe_angle(pseudo_index, k):
+    """Angle unique de la k-ième sonde d'un joueur (suite de Weyl, deux sondes successives diffèrent)."""
+    return ((pseudo_index * 0.137 + k * 0.6180339887) % 1.0) * 2 * math.pi - math.pi
+
+
+class Client:
+    def __init__(self, index, args, rng):
+        self.index = index
+        self.pseudo = f"Load{index}"
+        self.args = args
+        self.rng = rng
+        self.binary = not args.json
+        self.sent = 0
+        self.probes = []  # (angle, instant d'envoi)
+        self.lateness = []  # retard des réveils sur l'horaire prévu
+
+    async def send(self, ws, flags, command, **fields):
+        if self.binary:
+            await ws.send_bytes(encode_frame(flags, fields.get("dx", 0.0), fields.get("dy", 0.0),
+                                             fields.get("aim_dx", 0.0), fields.get("aim_dy", 0.0),
+                                             fields.get("angle", 0.0)))
+        else:
+            await ws.send_str(json.dumps({"pseudo": self.pseudo, "command": command, **fields}))
+
+    async def handshake(self, ws):
+        """HELLO puis attente de la réponse de protocole ; sans elle, les commandes restent en JSON."""
+        await ws.send_json({"pseudo": self.pseudo, "command": "HELLO", "protocols": [PROTOCOL_VERSION]})
+        negotiated = False
+        try:
+            while not negotiated:
+                msg = await asyncio.wait_for(ws.receive(), timeout=5.0)
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = json.loads(msg.data)
+                negotiated = data.get("type") == "protocol" and data.get("version") == PROTOCOL_VERSION
+        except asyncio.TimeoutError:
+            pass
+        self.binary = self.binary and negotiated
+
+    async def play(self, ws, start, stop):
+        """Horaire d'une manette entre `start` et `stop` (time.monotonic)."""
+        args, rng = self.args, self.rng
+        move_period = 1.0 / args.move_hz
+        next_move = start + rng.uniform(0, move_period)
+        next_burst = start + rng.uniform(0, args.burst_every)
+        shots_left = 0
+        next_probe = start + rng.uniform(0, args.probe_every)
+        phase = rng.uniform(0, 2 * math.pi)
+        while True:
+            due = min(next_move, next_burst, next_probe)
+            if due >= stop:
+                return
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            now = time.monotonic()
+            self.lateness.append(now - due)
+            if now >= next_move:
+                a = phase + now * 1.5
+                await self.send(ws, FLAG_MOVE, "MOVE_VECTOR", dx=math.cos(a), dy=math.sin(a))
+                self.sent += 1
+                next_move += move_period
+            if now >= next_burst:
+                if shots_left == 0:
+                    shots_left = args.burst
+                await self.send(ws, FLAG_SHOOT, "SHOOT_ANGLE", angle=rng.uniform(-math.pi, math.pi))
+                self.sent += 1
+                shots_left -= 1
+                next_burst += 0.1 if shots_left else args.burst_every
+            if now >= next_probe:
+                angle = probe_angle(self.index, len(self.probes))
+                self.probes.append((angle, time.monotonic()))
+                await self.send(ws, FLAG_AIM, "AIM_VECTOR", aim_dx=math.cos(angle), aim_dy=math.sin(angle),
+                                dx=math.cos(angle), dy=math.sin(angle))
+                self.sent += 1
+                next_probe += args.probe_every
+
+
+async def swarm(url, players, args, results):
+    rng = random.Random(players)
+    clients = [Client(i, args, random.Random(rng.random())) for i in range(players)]
+    connected = []
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    all_ready = asyncio.Event()
+    window = {}
+    pending = [players]
+
+    async def run(client, session):
+        try:
+            async with gate:
+                ws = await session.ws_connect(url, timeout=10.0)
+                await client.handshake(ws)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            ws = None
+        else:
+            connected.append(client)
+        pending[0] -= 1
+        if pending[0] == 0:
+            # Toutes les manettes sont connectées (ou ont échoué) : début de la fenêtre mesurée
+            window["start"] = time.monotonic()
+            window["stop"] = window["start"] + args.duration
+            results.put(("start", window["start"]))
+            all_ready.set()
+        if ws is None:
+            return
+        await all_ready.wait()
+        try:
+            await client.play(ws, window["start"], window["stop"])
+        except (aiohttp.ClientError, ConnectionResetError):
+            pass
+        await ws.close()
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(run(client, session) for client in clients))
+
+    lateness = np.array([x for c in connected for x in c.lateness] or [0.0])
+    results.put(("end", {
+        "connected": len(connected),
+        "failed": players - len(connected),
+        "binary": all(c.binary for c in connected),
+        "window": (window["start"], window["stop"]),
+        "sent": sum(c.sent for c in connected),
+        "probes": [(c.pseudo, angle, sent_at) for c in connected for angle, sent_at in c.probes],
+        "generator_lag_p99": float(np.percentile(lateness, 99)),
+    }))
+
+
+def swarm_main(url, players, args, results):
+    asyncio.run(swarm(url, players, args, results))
+
+
+# ------------------------------------------------------
+# Orchestrateur : mesures côté serveur et côté jeu
+# ------------------------------------------------------
+def scrape(base_url):
+    """Valeurs de /metrics : {(nom, étiquettes): valeur}."""
+    with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+        text = response.read().decode("utf-8")
+    values = {}
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(\{[^}]*\})? (\S+)$", line)
+        if match:
+            values[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return values
+
+
+def quiet(target, *args, **kwargs):
+    """Processus serveur et jeu sans leurs messages (connexions, touches, journal d'accès) dans le rapport."""
+    sys.stdout = open(os.devnull, "w")
+    logging.disable(logging.INFO)
+    return target(*args, **kwargs)
+
+
+def wait_for_server(base_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{base_url}/status", timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+class AimObserver:
+    """Suit, dans les snapshots publiés par le jeu, les changements d'aim_angle de chaque manette."""
+
+    def __init__(self, channel):
+        self.reader = channel.reader()
+        self.last = {}
+        self.changes = {}  # pseudo -> [(instant, angle)]
+
+    def poll(self):
+        state = self.reader.poll()
+        if not state or "players" not in state:
+            return
+        now = time.monotonic()
+        for pseudo, entry in state["players"].items():
+            angle = entry.get("aim_angle")
+            if angle is not None and angle != self.last.get(pseudo):
+                self.last[pseudo] = angle
+                self.changes.setdefault(pseudo, []).append((now, angle))
+
+    def latencies(self, probes):
+        """Latences des sondes vues dans un snapshot, et nombre de sondes jamais vues."""
+        found, lost = [], 0
+        for pseudo, angle, sent_at in probes:
+            for seen_at, value in self.changes.get(pseudo, ()):
+                diff = (value - angle + math.pi) % (2 * math.pi) - math.pi
+                if seen_at >= sent_at and abs(diff) < ANGLE_TOLERANCE:
+                    found.append(seen_at - sent_at)
+                    break
+            else:
+                lost += 1
+        return found, lost
+
+
+def run_level(players, args, base_url, player_table, observer):
+    results = mp.Queue()
+    proc = mp.Process(target=swarm_main, args=(f"{base_url}/ws", players, args, results), name=f"Swarm{players}")
+    proc.start()
+    start_heads = start_dropped = None
+    summary = None
+    while summary is None:
+        observer.poll()
+        try:
+            kind, payload = results.get_nowait()
+        except Empty:
+            time.sleep(0.001)
+            continue
+        if kind == "start":
+            start_heads = int(player_table.inputs.head.sum())
+            start_dropped = int(player_table.inputs.dropped.sum())
+            start_metrics = scrape(base_url)
+        else:
+            summary = payload
+    accepted = int(player_table.inputs.head.sum()) - start_heads
+    dropped = int(player_table.inputs.dropped.sum()) - start_dropped
+    # Laisser le temps aux dernières sondes d'atteindre un snapshot
+    settle = time.monotonic() + 0.5
+    while time.monotonic() < settle:
+        observer.poll()
+        time.sleep(0.001)
+    metrics = scrape(base_url)
+    proc.join()
+
+    elapsed = summary["window"][1] - summary["window"][0]
+    latencies, lost = observer.latencies(summary["probes"])
+    latencies = np.array(latencies or [math.nan])
+    sent_rate = summary["sent"] / elapsed
+    accepted_rate = accepted / elapsed
+    tick_overruns = (metrics.get(("paintwar_tick_overruns_total", ""), 0.0)
+                     - start_metrics.get(("paintwar_tick_overruns_total", ""), 0.0))
+    level = {
+        "players": players,
+        "connected": summary["connected"],
+        "failed": summary["failed"],
+        "binary": summary["binary"],
+        "sent_per_s": sent_rate,
+        "accepted_per_s": accepted_rate,
+        "accepted_ratio": accepted_rate / sent_rate if sent_rate else math.nan,
+        "dropped_inputs": dropped,
+        "loop_lag_ms": {q: metrics.get(("paintwar_webapp_loop_lag_seconds", f'{{quantile="{v}"}}'), math.nan) * 1e3
+                        for q, v in (("p50", 0.5), ("p99", 0.99), ("max", 1.0))},
+        "latency_ms": {"p50": float(np.percentile(latencies, 50)) * 1e3,
+                       "p99": float(np.percentile(latencies, 99)) * 1e3,
+                       "probes": len(summary["probes"]), "lost": lost},
+        "game_tick_p99_ms": metrics.get(("paintwar_stage_window_quantile_seconds", '{stage="tick",quantile="0.99"}'),
+                                        math.nan) * 1e3,
+        "game_tick_overruns": int(tick_overruns),
+        "generator_lag_p99_ms": summary["generator_lag_p99"] * 1e3,
+    }
+    level["behind"] = [reason for reason, bad in (
+        ("débit", level["accepted_ratio"] < MIN_ACCEPTED_RATIO or summary["failed"] > 0),
+        ("boucle", level["loop_lag_ms"]["p99"] > MAX_LOOP_LAG * 1e3),
+        ("latence", not level["latency_ms"]["p99"] <= MAX_LATENCY_P99 * 1e3 or lost > 0),
+    ) if bad]
+    level["generator_saturated"] = level["generator_lag_p99_ms"] > MAX_GENERATOR_LAG * 1e3
+    return level
+
+
+def print_report(levels):
+    print(f"{'joueurs':>7} | {'envoyés/s':>9} | {'acceptés/s':>10} | {'ratio':>6} | {'boucle p99 (ms)':>15} | "
+          f"{'latence p50/p99 (ms)':>20} | {'tour p99 (ms)':>13} | {'générateur p99 (ms)':>19} | verdict")
+    for level in levels:
+        verdict = "décroche (" + ", ".join(level["behind"]) + ")" if level["behind"] else "tient"
+        if level["generator_saturated"]:
+            verdict += " ; générateur saturé, mesure douteuse"
+        latency = f"{level['latency_ms']['p50']:.1f} / {level['latency_ms']['p99']:.1f}"
+        print(f"{level['players']:>7} | {level['sent_per_s']:>9.0f} | {level['accepted_per_s']:>10.0f} | "
+              f"{level['accepted_ratio']:>6.3f} | {level['loop_lag_ms']['p99']:>15.1f} | {latency:>20} | "
+              f"{level['game_tick_p99_ms']:>13.1f} | {level['generator_lag_p99_ms']:>19.1f} | {verdict}")
+    first_behind = next((level["players"] for level in levels if level["behind"]), None)
+    if first_behind is None:
+        print(f"Aucun décrochage jusqu'à {levels[-1]['players']} joueurs.")
+    else:
+        print(f"Le serveur décroche à partir de {first_behind} joueurs.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--duration", type=float, default=10.0, help="secondes mesurées par palier")
+    parser.add_argument("--move-hz", type=float, default=20.0)
+    parser.add_argument("--burst", type=int, default=3, help="tirs par rafale")
+    parser.add_argument("--burst-every", type=float, default=2.0, help="secondes entre deux rafales")
+    parser.add_argument("--probe-every", type=float, default=1.0, help="secondes entre deux sondes de latence")
+    parser.add_argument("--json", action="store_true", help="commandes JSON au lieu du protocole binaire")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--output", help="rapport JSON")
+    args = parser.parse_args()
+
+    mp.set_start_method("spawn")
+    share_screen()
+    base_url = f"http://{HOST}:{args.port}"
+    manager = mp.Manager()
+    player_table = PlayerTable.create(capacity=max(args.players))
+    state_channel = SnapshotChannel.create()
+    paint_buffer = PaintBuffer.create()
+    profiler = TickProfiler.create()
+    game_started = manager.Value("b", True)
+    friendly_collisions = manager.Value("b", True)
+    game_duration = manager.Value("i", 24 * 3600)
+    speed_config = manager.dict({"neutre": 8, "allie": 12, "ennemi": 4})
+    prepare_phase = manager.Value("b", False)
+    game_start_time = manager.Value("d", time.time())
+
+    webapp = mp.Process(target=quiet, args=(webapp_main, player_table, game_started, profiler, HOST, args.port),
+                        name="WebApp")
+    game = mp.Process(target=quiet,
+                      args=(real_game_logic, player_table, state_channel, game_started, friendly_collisions, paint_buffer, game_duration,
+                            speed_config, prepare_phase, game_start_time),
+                      kwargs={"profiler": profiler}, name="RealGame")
+    levels = []
+    try:
+        webapp.start()
+        game.start()
+        wait_for_server(base_url)
+        observer = AimObserver(state_channel)
+        for players in sorted(args.players):
+            level = run_level(players, args, base_url, player_table, observer)
+            levels.append(level)
+            print(f"[Bench] {players} joueurs : {level['accepted_per_s']:.0f} entrées/s acceptées, "
+                  f"boucle p99 {level['loop_lag_ms']['p99']:.1f} ms, latence p99 {level['latency_ms']['p99']:.1f} ms")
+    finally:
+        game_started.value = False
+        game.join(5)
+        webapp.terminate()
+        webapp.join(5)
+        for proc in (game, webapp):
+            if proc.is_alive():
+                proc.kill()
+        for shared in (player_table, state_channel, paint_buffer, profiler):
+            shared.close()
+            shared.unlink()
+
+    print_report(levels)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "ws_load", "params": vars(args), "levels": levels}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Module Clock
+Horloges de la boucle de jeu : pas de simulation fixe avec accumulateur, et cadence de publication.
+
+La simulation avance toujours par pas de 1/SIM_HZ secondes quel que soit le rythme réel de la
+boucle ; si la machine prend du retard, au plus `max_steps` pas sont rattrapés par itération et
+le reste est abandonné (le jeu ralentit au lieu de partir en spirale).
+"""
+import time
+
+
+class FixedTimestep:
+    def __init__(self, hz, max_steps, clock=time.monotonic):
+        self.dt = 1.0 / hz
+        self.max_steps = max_steps
+        self._clock = clock
+        self.accumulator = 0.0
+        self.last = clock()
+        self.dropped_time = 0.0  # temps abandonné par le plafond de rattrapage
+
+    def reset(self):
+        """Repart de maintenant sans pas en attente (fin de pause, phase de préparation)."""
+        self.accumulator = 0.0
+        self.last = self._clock()
+
+    def advance(self):
+        """Ajoute le temps écoulé à l'accumulateur et retourne le nombre de pas à simuler."""
+        now = self._clock()
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator // self.dt)
+        if steps > self.max_steps:
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+            self.accumulator = self.accumulator % self.dt
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    def time_to_next(self):
+        """Secondes avant que le prochain pas ne soit dû."""
+        return max(0.0, self.dt - self.accumulator - (self._clock() - self.last))
+
+
+class Cadence:
+    """Déclenchement régulier à `hz` (ex: publication des snapshots), indépendant du pas de simulation."""
+
+    def __init__(self, hz, clock=time.monotonic):
+        self.interval = 1.0 / hz
+        self._clock = clock
+        self.next = clock()
+
+    def due(self):
+        """True (et programme l'échéance suivante) si l'échéance est passée."""
+        now = self._clock()
+        if now < self.next:
+            return False
+        # Sans rattrapage : après un retard on repart de maintenant
+        self.next = max(self.next + self.interval, now)
+        return True
+
+    def time_to_next(self):
+        return max(0.0, self.next - self._clock())
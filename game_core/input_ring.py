@@ -0,0 +1,106 @@
+"""
+Module InputRing
+Files circulaires d'entrées manette en mémoire partagée, une par slot de joueur.
+
+Chaque file a un seul producteur (le serveur web, qui ajoute) et un seul consommateur
+(le lobby ou le jeu, qui vident la file à chaque tick) : aucun verrou n'est nécessaire.
+Le producteur n'écrit que `head`, le consommateur n'écrit que `tail` ; un enregistrement
+n'est visible qu'une fois `head` avancé, après l'écriture complète de ses champs.
+"""
+import logging
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger("InputRing")
+
+# Nombre d'enregistrements par joueur (~1 s de joystick à 60 événements/s)
+RING_SIZE = 64
+
+# Types d'enregistrements
+INPUT_MOVE = 1   # a, b = dx, dy
+INPUT_AIM = 2    # a, b = aim_dx, aim_dy
+INPUT_SHOOT = 3  # a = angle
+
+RECORD_DTYPE = np.dtype([("t", np.float64), ("a", np.float64), ("b", np.float64), ("cmd", np.uint8)], align=True)
+
+
+def _layout(capacity):
+    counters = 3 * capacity * 8  # head, tail, dropped (uint64)
+    return counters, counters + capacity * RING_SIZE * RECORD_DTYPE.itemsize
+
+
+class InputRings:
+    """Une file SPSC de RING_SIZE enregistrements horodatés par slot."""
+
+    def __init__(self, capacity, buffer, shm=None):
+        self.capacity = capacity
+        self._shm = shm
+        records_offset, _ = _layout(capacity)
+        self.head = np.ndarray((capacity,), dtype=np.uint64, buffer=buffer, offset=0)
+        self.tail = np.ndarray((capacity,), dtype=np.uint64, buffer=buffer, offset=capacity * 8)
+        self.dropped = np.ndarray((capacity,), dtype=np.uint64, buffer=buffer, offset=2 * capacity * 8)
+        self.records = np.ndarray((capacity, RING_SIZE), dtype=RECORD_DTYPE, buffer=buffer, offset=records_offset)
+
+    @classmethod
+    def create(cls, capacity):
+        _, size = _layout(capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        return cls(capacity, shm.buf, shm)
+
+    @classmethod
+    def attach(cls, name, capacity):
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(capacity, shm.buf, shm)
+
+    @classmethod
+    def local(cls, capacity):
+        _, size = _layout(capacity)
+        return cls(capacity, bytearray(size))
+
+    @property
+    def name(self):
+        return self._shm.name if self._shm else None
+
+    # ------------------------------------------------------
+    # Producteur (serveur web)
+    # ------------------------------------------------------
+    def push(self, slot, cmd, a, b=0.0, t=None):
+        """Ajoute un enregistrement. Retourne False (et compte la perte) si la file est pleine."""
+        head = int(self.head[slot])
+        if head - int(self.tail[slot]) >= RING_SIZE:
+            self.dropped[slot] += 1
+            return False
+        self.records[slot, head % RING_SIZE] = (time.time() if t is None else t, a, b, cmd)
+        # Publication : l'enregistrement est complet avant que head n'avance
+        self.head[slot] = head + 1
+        return True
+
+    # ------------------------------------------------------
+    # Consommateur (lobby / jeu)
+    # ------------------------------------------------------
+    def drain(self, slot):
+        """Retire et retourne tous les enregistrements publiés, du plus ancien au plus récent."""
+        tail = int(self.tail[slot])
+        head = int(self.head[slot])
+        if head == tail:
+            return []
+        start, end = tail % RING_SIZE, head % RING_SIZE
+        ring = self.records[slot]
+        if start < end:
+            batch = ring[start:end].tolist()
+        else:
+            batch = ring[start:].tolist() + ring[:end].tolist()
+        self.tail[slot] = head
+        return batch
+
+    def close(self):
+        if self._shm is not None:
+            self.head = self.tail = self.dropped = self.records = None
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
@@ -1,9 +1,10 @@
-import random
+import math
 import signal
 import time
 import logging
 import sys
 from utils.config import PlayerConfig, GameConfig
+from utils import startup
 
 # Configuration du logger
 logger = logging.getLogger("Lobby")
@@ -22,42 +23,13 @@ def handle_exit(signum, frame):
     running = False
     logger.info("Signal d'arrêt reçu")
 
-def initialize_player(pseudo, player, team_id):
-    """Initialise les attributs d'un nouveau joueur"""
-    player["team"] = team_id
-    
-    # Position de départ selon l'équipe
-    if team_id == 1:  # Rouge
-        player["x"] = random.randint(100, 400)
-        player["y"] = random.randint(100, 300)
-    elif team_id == 2:  # Bleu
-        player["x"] = random.randint(600, 900) 
-        player["y"] = random.randint(400, 600)
-    else:  # Gris
-        player["x"] = random.randint(350, 650)
-        player["y"] = random.randint(250, 450)
-    
-    # Initialisation des attributs du joueur
-    player["radius"] = PlayerConfig.RADIUS
-    player["base_speed"] = PlayerConfig.BASE_SPEED
-    player["speed"] = PlayerConfig.BASE_SPEED
-    player["ammo"] = PlayerConfig.MAX_AMMO
-    player["max_ammo"] = PlayerConfig.MAX_AMMO
-    player["reload_time"] = PlayerConfig.RELOAD_TIME
-    player["reload_timer"] = 0.0
-    player["aim_angle"] = None
-    player["name"] = pseudo
-    
-    return player
-
-def assign_team(connected_players):
+def assign_team(player_table):
     """Détermine l'équipe pour un nouveau joueur en équilibrant les équipes"""
     # Comptage des joueurs par équipe
     team_counts = {team_id: 0 for team_id in range(0, GameConfig.TEAMS_COUNT)}
     
-    for data in connected_players.values():
-        player = data.get("player", {})
-        t = player.get("team")
+    for slot in player_table.active_slots():
+        t = int(player_table.team[slot])
         if t in team_counts:
             team_counts[t] += 1
 
@@ -65,91 +37,81 @@ def assign_team(connected_players):
     chosen = min(team_counts, key=lambda x: team_counts[x])
     return chosen
 
-def update_player_position(player, inputs):
+def update_player_position(player_table, slot):
     """Met à jour la position du joueur en fonction des entrées"""
+    t = player_table
+    # Entrées reçues depuis le dernier tick (les tirs sont ignorés dans le lobby)
+    t.drain_inputs(slot)
+
     # Déplacement via joystick (simulé ou réel)
-    dx, dy = inputs["dx"], inputs["dy"]
+    dx, dy = float(t.dx[slot]), float(t.dy[slot])
     
     # Mise à jour des positions
-    player["x"] += LOBBY_PLAYER_SPEED * dx
-    player["y"] += LOBBY_PLAYER_SPEED * dy
+    x = float(t.x[slot]) + LOBBY_PLAYER_SPEED * dx
+    y = float(t.y[slot]) + LOBBY_PLAYER_SPEED * dy
     
     # Limites de l'écran
-    player["x"] = max(50, min(GameConfig.BASE_WIDTH - 50, player["x"]))
-    player["y"] = max(50, min(GameConfig.BASE_HEIGHT - 50, player["y"]))
+    t.x[slot] = max(50, min(GameConfig.BASE_WIDTH - 50, x))
+    t.y[slot] = max(50, min(GameConfig.BASE_HEIGHT - 50, y))
     
     # Calcul angle de visée (pour l'affichage de la flèche)
-    ax, ay = inputs["aim_dx"], inputs["aim_dy"]
+    ax, ay = float(t.aim_dx[slot]), float(t.aim_dy[slot])
     dist_aim = (ax**2 + ay**2)**0.5
     if dist_aim > 0.01:
-        player["aim_angle"] = time.time() % (2*3.14159)  # Animation rotation
+        t.aim_angle[slot] = time.time() % (2*3.14159)  # Animation rotation
     else:
-        player["aim_angle"] = None
-    
-    # Direction (pour l'affichage)
-    player["direction"] = player.get("aim_angle", 0)
-    
-    return player
+        t.aim_angle[slot] = math.nan
 
-def create_display_state(connected_players):
+def create_display_state(player_table):
     """Crée un état simplifié pour l'affichage"""
     state_for_display = {}
     
-    for pseudo, data in connected_players.items():
-        p = data["player"]
-        pid = data.get("id", 0)
+    for slot in player_table.active_slots():
+        pseudo = player_table.pseudo_of(slot)
+        # Direction (pour l'affichage) : angle de visée, 0 par défaut
+        direction = float(player_table.aim_angle[slot])
         state_for_display[pseudo] = {
-            "id":        pid,
-            "x":         p.get("x", 0),
-            "y":         p.get("y", 0),
-            "team":      p.get("team", 0),
-            "name":      p.get("name", pseudo),
-            "direction": p.get("direction", 0),
-            "radius":    p.get("radius", PlayerConfig.RADIUS)
+            "id":        int(player_table.id[slot]),
+            "x":         float(player_table.x[slot]),
+            "y":         float(player_table.y[slot]),
+            "team":      int(player_table.team[slot]),
+            "name":      pseudo,
+            "direction": direction if direction == direction else 0,
+            "radius":    PlayerConfig.RADIUS
         }
     
     return state_for_display
 
-def count_teams(connected_players):
+def count_teams(player_table):
     """Compte les joueurs par équipe et retourne les statistiques"""
     team_counts = {0: 0, 1: 0, 2: 0}
     players_by_team = {0: [], 1: [], 2: []}
     
-    for pseudo, data in connected_players.items():
-        p = data["player"]
-        if "team" in p:
-            team = p["team"]
-            if team in team_counts:
-                team_counts[team] += 1
-                players_by_team[team].append(pseudo)
+    for slot in player_table.active_slots():
+        team = int(player_table.team[slot])
+        if team in team_counts:
+            team_counts[team] += 1
+            players_by_team[team].append(player_table.pseudo_of(slot))
     
     return team_counts, players_by_team
 
-def send_display_state(state, queue):
-    """Envoie l'état à l'affichage en vidant d'abord la queue"""
+def send_display_state(state, state_channel):
+    """Publie l'état dans la boîte « dernière valeur » de l'affichage (remplace l'état précédent non lu)"""
     try:
-        # Vider la queue avant de mettre le nouvel état
-        while not queue.empty():
-            try:
-                queue.get_nowait()
-            except:
-                pass
-        
-        # Envoyer le nouvel état
-        queue.put(state)
+        state_channel.publish(state)
         return True
     except Exception as e:
         logger.error(f"Erreur lors de l'envoi de l'état du lobby: {e}")
         return False
 
-def lobby_logic(connected_players, lobby_state_queue, game_started):
+def lobby_logic(player_table, state_channel, game_started):
     """
     Gère la logique du lobby avant le début d'une partie.
     Gère le déplacement des joueurs et la synchronisation de leur état.
     
     Args:
-        connected_players: Dictionnaire partagé des joueurs connectés
-        lobby_state_queue: Queue pour envoyer l'état au processus d'affichage
+        player_table: Table partagée des joueurs connectés (PlayerTable)
+        state_channel: SnapshotChannel pour publier l'état au processus d'affichage
         game_started: Flag pour indiquer si le jeu a commencé
     """
     global running
@@ -162,6 +124,7 @@ def lobby_logic(connected_players, lobby_state_queue, game_started):
     last_display_time = time.time()
     update_interval = 1/UPDATE_RATE
     display_interval = 1/DISPLAY_RATE
+    startup.ready()
     
     while running and not game_started.value:
         now = time.time()
@@ -175,40 +138,21 @@ def lobby_logic(connected_players, lobby_state_queue, game_started):
         last_time = now
         
         # Compter et logger les équipes
-        team_counts, _ = count_teams(connected_players)
+        team_counts, _ = count_teams(player_table)
         
         # Mise à jour des positions des joueurs dans le lobby
-        for pseudo, data in list(connected_players.items()):
+        for slot in player_table.active_slots():
             try:
-                p = data["player"]
-                inp = data["inputs"]
-                
-                # Si nouveau joueur ou joueur sans équipe, assigner à une équipe
-                if "team" not in p:
-                    assigned_team = assign_team(connected_players)
-                    p = initialize_player(pseudo, p, assigned_team)
-                    logger.info(f"Joueur {pseudo} assigné à l'équipe {assigned_team}")
-                
-                # S'assurer que x et y existent
-                if "x" not in p or "y" not in p:
-                    p["x"] = random.randint(100, 900)
-                    p["y"] = random.randint(100, 600)
-                
-                # Mise à jour de la position du joueur
-                p = update_player_position(p, inp)
-                
-                # Mettre à jour les données du joueur
-                data["player"] = p
-                connected_players[pseudo] = data
+                update_player_position(player_table, slot)
             except Exception as e:
-                logger.error(f"Erreur lors de la mise à jour du joueur {pseudo}: {e}")
+                logger.error(f"Erreur lors de la mise à jour du joueur {player_table.pseudo_of(slot)}: {e}")
         
         # Créer un état simplifié pour l'affichage
-        state_for_display = create_display_state(connected_players)
+        state_for_display = create_display_state(player_table)
         
         # Envoyer l'état à intervalle régulier
         if now - last_display_time >= display_interval:
-            if send_display_state(state_for_display, lobby_state_queue):
+            if send_display_state(state_for_display, state_channel):
                 last_display_time = now
     
     logger.info("Sortie propre du processus de logique du lobby")
\ No newline at end of file
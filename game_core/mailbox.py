@@ -0,0 +1,110 @@
+"""
+Module Mailbox
+Boîte aux lettres « dernière valeur » en mémoire partagée : un producteur publie, les lecteurs lisent
+toujours la valeur la plus récente, sans file d'attente.
+
+Deux emplacements (double tampon) : le producteur écrit l'objet picklé dans l'emplacement inactif,
+puis publie le nouveau numéro de version, dont la parité désigne l'emplacement à lire. Chaque
+emplacement porte un compteur de séquence (impair pendant l'écriture) que le lecteur relit après
+sa copie : une lecture recouverte par une écriture est recommencée, jamais rendue déchirée.
+
+Le producteur ne bloque jamais et rien ne s'accumule : une valeur non lue est simplement remplacée.
+Un seul producteur à la fois (le lobby et le jeu ne tournent jamais ensemble) ; un producteur tué
+en pleine écriture laisse la version précédente intacte.
+"""
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.config import GameConfig
+
+# En-tête : version (uint64), longueurs (int64 x 2), séquences des emplacements (uint64 x 2)
+_HEADER = 64
+# Nouvelles tentatives de lecture quand le producteur réécrit l'emplacement pendant la copie
+_READ_RETRIES = 8
+
+
+class Mailbox:
+    def __init__(self, capacity, buffer, shm=None):
+        self.capacity = capacity
+        self._shm = shm
+        self._buffer = buffer
+        self._version = np.ndarray((1,), dtype=np.uint64, buffer=buffer, offset=0)
+        self._lengths = np.ndarray((2,), dtype=np.int64, buffer=buffer, offset=8)
+        self._seqs = np.ndarray((2,), dtype=np.uint64, buffer=buffer, offset=24)
+        self._slots = np.ndarray((2, capacity), dtype=np.uint8, buffer=buffer, offset=_HEADER)
+
+    @classmethod
+    def create(cls, capacity=GameConfig.MAILBOX_CAPACITY):
+        """Alloue la boîte en mémoire partagée (appelé par le manager)."""
+        size = _HEADER + 2 * capacity
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:_HEADER] = bytes(_HEADER)
+        return cls(capacity, shm.buf, shm)
+
+    @classmethod
+    def attach(cls, name, capacity):
+        """Se rattache à une boîte existante depuis un processus enfant."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(capacity, shm.buf, shm)
+
+    @classmethod
+    def local(cls, capacity=GameConfig.MAILBOX_CAPACITY):
+        """Boîte en mémoire privée, même interface (benchmarks)."""
+        return cls(capacity, bytearray(_HEADER + 2 * capacity))
+
+    def __reduce__(self):
+        # Transmise aux processus enfants par son nom de segment
+        if self._shm is None:
+            raise TypeError("Une Mailbox locale ne peut pas être partagée entre processus")
+        return Mailbox.attach, (self._shm.name, self.capacity)
+
+    @property
+    def version(self):
+        """Nombre de publications (0 : rien publié)."""
+        return int(self._version[0])
+
+    def publish(self, obj):
+        """Remplace la valeur publiée. ValueError si l'objet picklé dépasse la capacité d'un emplacement."""
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(payload)
+        if size > self.capacity:
+            raise ValueError(f"Message de {size} octets trop grand pour la boîte ({self.capacity} octets)")
+        version = int(self._version[0]) + 1
+        slot = version & 1
+        # Impair pendant l'écriture (| 1 : reste impair si un producteur précédent est mort en écrivant)
+        self._seqs[slot] |= np.uint64(1)
+        self._slots[slot, :size] = np.frombuffer(payload, dtype=np.uint8)
+        self._lengths[slot] = size
+        self._seqs[slot] += np.uint64(1)
+        self._version[0] = version
+
+    def read(self, since=None):
+        """
+        (version, objet) de la dernière publication, ou None si rien de nouveau depuis la version `since`
+        (ou si la lecture a été recouverte plusieurs fois de suite par le producteur).
+        """
+        for _ in range(_READ_RETRIES):
+            version = int(self._version[0])
+            if version == 0 or version == since:
+                return None
+            slot = version & 1
+            seq = int(self._seqs[slot])
+            if seq & 1:
+                continue
+            payload = self._slots[slot, :int(self._lengths[slot])].tobytes()
+            if int(self._seqs[slot]) == seq:
+                return version, pickle.loads(payload)
+        return None
+
+    def close(self):
+        if self._shm is not None:
+            # Les vues NumPy doivent être libérées avant de fermer le segment
+            self._version = self._lengths = self._seqs = self._slots = None
+            self._buffer = None
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
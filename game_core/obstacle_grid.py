@@ -0,0 +1,108 @@
+"""
+Module ObstacleGrid
+Index spatial statique des obstacles : grille uniforme dont chaque cellule liste les obstacles qui la recouvrent.
+
+Construit une fois par partie ; une requête cercle/rectangle ne teste que les obstacles
+des cellules couvertes par le cercle au lieu de parcourir toute la liste.
+"""
+import numpy as np
+
+from utils.config import GameConfig, ObstacleConfig
+
+
+class ObstacleGrid:
+    def __init__(self, obstacles, cell_size=ObstacleConfig.GRID_CELL_SIZE, width=None, height=None):
+        self.obstacles = list(obstacles)
+        self.cell_size = cell_size
+        width = width or GameConfig.BASE_WIDTH
+        height = height or GameConfig.BASE_HEIGHT
+        self.cols = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+
+        # Chaque cellule contient (left, top, right, bottom, index) des obstacles qui la touchent,
+        # dans l'ordre de la liste d'origine
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for index, o in enumerate(self.obstacles):
+            left, top, right, bottom = o.get_rect()
+            c0, c1 = self._col(left), self._col(right)
+            r0, r1 = self._row(top), self._row(bottom)
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    cells[row * self.cols + col].append((left, top, right, bottom, index))
+        self.cells = [tuple(c) for c in cells]
+        self._batched = {}  # rayon -> tableau (cellules, K, 4) pour collides_many
+
+    def _col(self, x):
+        return min(self.cols - 1, max(0, int(x // self.cell_size)))
+
+    def _row(self, y):
+        return min(self.rows - 1, max(0, int(y // self.cell_size)))
+
+    def _cells_for(self, x, y, radius):
+        c0, c1 = self._col(x - radius), self._col(x + radius)
+        r0, r1 = self._row(y - radius), self._row(y + radius)
+        cols, cells = self.cols, self.cells
+        if c0 == c1 and r0 == r1:
+            return (cells[r0 * cols + c0],)
+        return [cells[row * cols + col] for row in range(r0, r1 + 1) for col in range(c0, c1 + 1)]
+
+    def collides(self, x, y, radius):
+        """True si le cercle (x, y, radius) touche au moins un obstacle."""
+        r2 = radius * radius
+        for cell in self._cells_for(x, y, radius):
+            for left, top, right, bottom, _ in cell:
+                dx = x - max(left, min(x, right))
+                dy = y - max(top, min(y, bottom))
+                if dx * dx + dy * dy < r2:
+                    return True
+        return False
+
+    def _rects_by_cell(self, radius):
+        """
+        Rectangles rangés par cellule après gonflement de `radius` : un cercle de ce rayon ne peut toucher
+        que les rectangles de la cellule de son centre. Complété par des rectangles à l'infini (jamais touchés).
+        """
+        cached = self._batched.get(radius)
+        if cached is not None:
+            return cached
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for o in self.obstacles:
+            left, top, right, bottom = o.get_rect()
+            for row in range(self._row(top - radius), self._row(bottom + radius) + 1):
+                for col in range(self._col(left - radius), self._col(right + radius) + 1):
+                    cells[row * self.cols + col].append((left, top, right, bottom))
+        depth = max(1, max(len(c) for c in cells))
+        rects = np.full((len(cells), depth, 4), np.inf)
+        for i, c in enumerate(cells):
+            if c:
+                rects[i, :len(c)] = c
+        self._batched[radius] = rects
+        return rects
+
+    def collides_many(self, xs, ys, radius):
+        """Version vectorisée de collides pour des tableaux de centres de même rayon."""
+        rects = self._rects_by_cell(radius)
+        cols = np.clip(np.floor_divide(xs, self.cell_size).astype(np.int64), 0, self.cols - 1)
+        rows = np.clip(np.floor_divide(ys, self.cell_size).astype(np.int64), 0, self.rows - 1)
+        r = rects[rows * self.cols + cols]
+        px = xs[:, None]
+        py = ys[:, None]
+        dx = px - np.maximum(r[..., 0], np.minimum(px, r[..., 2]))
+        dy = py - np.maximum(r[..., 1], np.minimum(py, r[..., 3]))
+        with np.errstate(invalid="ignore"):
+            return ((dx * dx + dy * dy) < radius * radius).any(axis=1)
+
+    def near(self, x, y, radius):
+        """Obstacles des cellules couvertes par le cercle, sans doublon, dans l'ordre de la liste d'origine."""
+        found = self._cells_for(x, y, radius)
+        if len(found) == 1:
+            indices = [entry[4] for entry in found[0]]
+        else:
+            indices = sorted({entry[4] for cell in found for entry in cell})
+        return [self.obstacles[i] for i in indices]
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def __iter__(self):
+        return iter(self.obstacles)
@@ -0,0 +1,245 @@
+"""
+Module PaintBuffer
+Peinture en mémoire partagée : grille uint8 de propriété par équipe, précédée d'un compteur de génération
+et des compteurs de cellules par propriétaire.
+
+La grille (une cellule = GameConfig.PAINT_CELL_SIZE pixels de côté) est la référence : le jeu y peint
+le long des traces des joueurs, la vitesse au sol est une simple lecture de cellule et la couverture
+un np.bincount. L'affichage ne fait que la coloriser (Surface 8 bits à palette sur le même buffer).
+Le jeu incrémente la génération après chaque modification, ce qui permet aux lecteurs
+de savoir si la peinture a changé depuis leur dernière lecture.
+
+Les compteurs sont tenus à jour par le peintre à partir des deltas de chaque tampon
+(ancien propriétaire -> nouveau) : la couverture en direct se lit sans parcourir la grille,
+le recomptage complet (rescan) ne sert plus que de contrôle de cohérence.
+
+La grille est aussi découpée en tuiles de GameConfig.PAINT_TILE_CELLS cellules de côté, chacune marquée
+de la génération de sa dernière modification : un lecteur qui a traité la génération g ne retraite
+que les tuiles sales depuis g (dirty_tiles), quel que soit le nombre de lecteurs.
+"""
+import math
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from utils.config import GameConfig, TeamConfig
+
+# Valeur d'une cellule jamais peinte ; une cellule peinte vaut team + 1
+UNPAINTED = 0
+# Nombre de compteurs de propriétaires (UNPAINTED + équipes)
+MAX_OWNERS = 8
+
+# En-tête : génération (uint64) puis compteurs (int64 x MAX_OWNERS), complété à 128 octets pour aligner la grille
+_HEADER = 128
+_ALIGN = 8
+
+
+class PaintBuffer:
+    def __init__(self, width, height, buffer, shm=None, cell_size=GameConfig.PAINT_CELL_SIZE):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols, self.rows = self._shape(width, height, cell_size)
+        self.tile = GameConfig.PAINT_TILE_CELLS
+        self.tiles_x, self.tiles_y = -(-self.cols // self.tile), -(-self.rows // self.tile)
+        self._shm = shm
+        self._buffer = buffer
+        self._generation = np.ndarray((1,), dtype=np.uint64, buffer=buffer, offset=0)
+        # Cellules possédées par chaque valeur de la grille (écrits par le peintre uniquement)
+        self.counts = np.ndarray((MAX_OWNERS,), dtype=np.int64, buffer=buffer, offset=8)
+        # Indexé [ligne, colonne]
+        self.owners = np.ndarray((self.rows, self.cols), dtype=np.uint8, buffer=buffer, offset=_HEADER)
+        # Génération de la dernière modification de chaque tuile, indexé [tuile ligne, tuile colonne]
+        self.tile_generations = np.ndarray((self.tiles_y, self.tiles_x), dtype=np.uint64, buffer=buffer,
+                                           offset=self._tiles_offset(self.cols, self.rows))
+        self._stamps = {}  # rayon -> décalages (lignes, colonnes) du disque
+
+    @staticmethod
+    def _shape(width, height, cell_size):
+        return -(-width // cell_size), -(-height // cell_size)
+
+    @staticmethod
+    def _tiles_offset(cols, rows):
+        return (_HEADER + cols * rows + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    @classmethod
+    def _size(cls, width, height, cell_size):
+        cols, rows = cls._shape(width, height, cell_size)
+        tile = GameConfig.PAINT_TILE_CELLS
+        return cls._tiles_offset(cols, rows) + (-(-cols // tile)) * (-(-rows // tile)) * 8
+
+    @classmethod
+    def create(cls, width=None, height=None, cell_size=GameConfig.PAINT_CELL_SIZE):
+        """Alloue la grille de peinture en mémoire partagée (appelé par le manager)."""
+        width = width or GameConfig.BASE_WIDTH
+        height = height or GameConfig.BASE_HEIGHT
+        size = cls._size(width, height, cell_size)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        paint = cls(width, height, shm.buf, shm, cell_size)
+        paint.counts[UNPAINTED] = paint.owners.size
+        return paint
+
+    @classmethod
+    def attach(cls, name, width, height, cell_size):
+        """Se rattache à une grille existante depuis un processus enfant."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(width, height, shm.buf, shm, cell_size)
+
+    @classmethod
+    def local(cls, width=None, height=None, cell_size=GameConfig.PAINT_CELL_SIZE):
+        """Grille en mémoire privée, même interface (benchmarks, simulation sans manager)."""
+        width = width or GameConfig.BASE_WIDTH
+        height = height or GameConfig.BASE_HEIGHT
+        paint = cls(width, height, bytearray(cls._size(width, height, cell_size)), cell_size=cell_size)
+        paint.counts[UNPAINTED] = paint.owners.size
+        return paint
+
+    @property
+    def name(self):
+        return self._shm.name if self._shm else None
+
+    def __reduce__(self):
+        # Transmis aux processus enfants par son nom de segment
+        if self._shm is None:
+            raise TypeError("Un PaintBuffer local ne peut pas être partagé entre processus")
+        return PaintBuffer.attach, (self._shm.name, self.width, self.height, self.cell_size)
+
+    # ------------------------------------------------------
+    # Écriture (processus de jeu)
+    # ------------------------------------------------------
+    def touch(self, tiles=None):
+        """
+        Signale une modification de la peinture aux lecteurs. `tiles` : (lignes, colonnes) des tuiles
+        modifiées, toutes si None. Les tuiles sont marquées avant la publication de la nouvelle génération.
+        """
+        generation = self._generation[0] + 1
+        if tiles is None:
+            self.tile_generations[:] = generation
+        else:
+            self.tile_generations[tiles] = generation
+        self._generation[0] = generation
+
+    def clear(self):
+        self.owners[:] = UNPAINTED
+        self.counts[:] = 0
+        self.counts[UNPAINTED] = self.owners.size
+        self.touch()
+
+    def _stamp(self, radius):
+        """Décalages (lignes, colonnes) des cellules dont le centre est dans le disque, autour de la cellule du centre."""
+        stamp = self._stamps.get(radius)
+        if stamp is None:
+            k = math.ceil(radius / self.cell_size)
+            dr, dc = np.mgrid[-k:k + 1, -k:k + 1]
+            inside = (dr * self.cell_size) ** 2 + (dc * self.cell_size) ** 2 <= radius * radius
+            stamp = self._stamps[radius] = (dr[inside], dc[inside])
+        return stamp
+
+    def paint_trails(self, x0, y0, x1, y1, teams, radius):
+        """
+        Peint, pour chaque joueur, des disques de `radius` le long du segment (x0, y0) -> (x1, y1),
+        espacés d'au plus une cellule. Le point de départ n'est pas repeint (il l'a été au pas précédent).
+        Tous les arguments sauf radius sont des tableaux de même longueur.
+        """
+        x0, y0, x1, y1 = (np.asarray(a, dtype=np.float64) for a in (x0, y0, x1, y1))
+        if len(x0) == 0:
+            return
+        cs = self.cell_size
+        n = (np.hypot(x1 - x0, y1 - y0) // cs).astype(np.int64) + 1
+        seg = np.repeat(np.arange(len(n)), n)
+        k = np.arange(len(seg)) - np.repeat(np.cumsum(n) - n, n)
+        t = (k + 1) / n[seg]
+        cx = np.floor_divide(x0[seg] + t * (x1 - x0)[seg], cs).astype(np.int64)
+        cy = np.floor_divide(y0[seg] + t * (y1 - y0)[seg], cs).astype(np.int64)
+
+        dr, dc = self._stamp(radius)
+        rows = (cy[:, None] + dr[None, :]).ravel()
+        cols = (cx[:, None] + dc[None, :]).ravel()
+        values = np.repeat(np.asarray(teams, dtype=np.uint8)[seg] + 1, len(dr))
+        valid = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        cells = rows[valid] * self.cols + cols[valid]
+
+        # Deltas : ancien propriétaire -> propriétaire final, une fois par cellule modifiée
+        flat = self.owners.reshape(-1)
+        old = flat[cells]
+        flat[cells] = values[valid]
+        new = flat[cells]
+        changed = old != new
+        if changed.any():
+            unique, first = np.unique(cells[changed], return_index=True)
+            self.counts -= np.bincount(old[changed][first], minlength=MAX_OWNERS)[:MAX_OWNERS]
+            self.counts += np.bincount(new[changed][first], minlength=MAX_OWNERS)[:MAX_OWNERS]
+            self.touch((unique // self.cols // self.tile, unique % self.cols // self.tile))
+
+    # ------------------------------------------------------
+    # Lecture (jeu, calcul des couleurs, affichage)
+    # ------------------------------------------------------
+    @property
+    def generation(self):
+        return int(self._generation[0])
+
+    def owner_at(self, x, y):
+        """Équipe propriétaire de la cellule sous (x, y) ; -1 si non peinte ou hors de l'écran."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.owners[int(y // self.cell_size), int(x // self.cell_size)]) - 1
+        return -1
+
+    def dirty_tiles(self, since):
+        """Carte booléenne (tiles_y, tiles_x) des tuiles modifiées après la génération `since` (None : toutes)."""
+        if since is None:
+            return np.ones((self.tiles_y, self.tiles_x), dtype=np.bool_)
+        return self.tile_generations > since
+
+    def tile_rect(self, ty, tx):
+        """Rectangle (colonne, ligne, largeur, hauteur) en cellules de la tuile (ty, tx)."""
+        c0, r0 = tx * self.tile, ty * self.tile
+        return c0, r0, min(self.tile, self.cols - c0), min(self.tile, self.rows - r0)
+
+    def dirty_rects(self, since):
+        """Rectangles (en cellules) des tuiles modifiées après la génération `since`."""
+        return [self.tile_rect(int(ty), int(tx)) for ty, tx in zip(*np.nonzero(self.dirty_tiles(since)))]
+
+    def dirty_rows(self, since):
+        """Booléen par ligne de cellules : True si la ligne appartient à une rangée de tuiles modifiée après `since`."""
+        return np.repeat(self.dirty_tiles(since).any(axis=1), self.tile)[:self.rows]
+
+    def live_coverage(self, teams):
+        """Part de la grille possédée par chaque équipe, lue dans les compteurs (sans parcours)."""
+        size = self.owners.size
+        return {team: float(self.counts[team + 1]) / size for team in teams}
+
+    def rescan(self):
+        """Recomptage complet de la grille (un np.bincount), pour contrôler les compteurs."""
+        return np.bincount(self.owners.ravel(), minlength=MAX_OWNERS)[:MAX_OWNERS]
+
+    def coverage(self, teams):
+        """Part de la grille possédée par chaque équipe, recomptée exactement."""
+        counts = self.rescan()
+        return {team: float(counts[team + 1]) / self.owners.size for team in teams}
+
+    def surface(self):
+        """Surface 8 bits à palette (une cellule = un pixel) dont les pixels sont ceux de la grille ; non peint = transparent."""
+        view = memoryview(self._buffer)[_HEADER:_HEADER + self.cols * self.rows]
+        surface = pygame.image.frombuffer(view, (self.cols, self.rows), "P")
+        palette = [(0, 0, 0)] * 256
+        for team, color in TeamConfig.COLOR_MAP.items():
+            palette[team + 1] = color
+        surface.set_palette(palette)
+        surface.set_colorkey(UNPAINTED)
+        return surface
+
+    def close(self):
+        if self._shm is not None:
+            # Les vues NumPy doivent être libérées avant de fermer le segment
+            self._generation = None
+            self.counts = None
+            self.owners = None
+            self.tile_generations = None
+            self._buffer = None
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
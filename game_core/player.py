@@ -108,7 +108,7 @@ class Player:
         """
         Fait monter le joueur d'un niveau et prépare les powerups à choisir
         """
-        from powerup import get_random_powerups
+        from game_core.powerup import get_random_powerups
         
         self.level += 1
         self.xp -= self.xp_to_next_level
@@ -0,0 +1,268 @@
+"""
+Module PlayerTable
+Table des joueurs en mémoire partagée : une ligne (slot) par joueur, une colonne typée par champ numérique.
+
+Le processus de jeu, le serveur web, le lobby et l'admin lisent et écrivent directement dans les colonnes
+NumPy, sans passer par le proxy de mp.Manager() (un aller-retour picklé par accès).
+"""
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.config import GameConfig, PlayerConfig
+from game_core.player import Player
+from game_core.input_ring import InputRings, INPUT_MOVE, INPUT_AIM, INPUT_SHOOT
+
+logger = logging.getLogger("PlayerTable")
+
+# Taille maximale d'un pseudo encodé en UTF-8
+PSEUDO_BYTES = 32
+
+# (nom, dtype) — chaque colonne est un tableau contigu de `capacity` éléments
+COLUMNS = (
+    # État du slot
+    ("active", np.uint8),
+    ("id", np.int32),
+    ("team", np.int8),
+    ("dead", np.uint8),
+    ("respawn_time", np.float64),
+    # Joueur
+    ("x", np.float64),
+    ("y", np.float64),
+    ("speed", np.float64),
+    ("health", np.float64),
+    ("paint_power", np.float64),
+    ("damage", np.float64),
+    ("ammo", np.int32),
+    ("reload_time", np.float64),
+    ("reload_timer", np.float64),
+    ("aim_angle", np.float64),  # NaN <=> None
+    ("level", np.int32),
+    ("xp", np.float64),
+    ("xp_to_next_level", np.float64),
+    ("projectile_count", np.int32),
+    ("levelup_pending", np.uint8),
+    # Entrées manette
+    ("dx", np.float64),
+    ("dy", np.float64),
+    ("aim_dx", np.float64),
+    ("aim_dy", np.float64),
+)
+
+# Champs de Player.to_dict() stockés dans la table (les powerups restent hors table)
+PLAYER_FIELDS = (
+    "x", "y", "team", "speed", "paint_power", "damage", "ammo", "reload_time", "reload_timer",
+    "aim_angle", "level", "xp", "xp_to_next_level", "health", "projectile_count", "levelup_pending",
+)
+
+# Colonnes où NaN représente None côté dict
+_NULLABLE = ("aim_angle",)
+
+_ALIGN = 8
+
+
+def _layout(capacity):
+    """Calcule l'offset de chaque colonne et la taille totale du bloc."""
+    offsets = {}
+    offset = 0
+    for name, dtype in COLUMNS + (("pseudo", np.dtype(f"S{PSEUDO_BYTES}")),):
+        offsets[name] = offset
+        offset += np.dtype(dtype).itemsize * capacity
+        offset = (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+    return offsets, offset
+
+
+class PlayerTable:
+    """
+    Table de capacité fixe. Chaque colonne est exposée comme attribut NumPy (ex: table.x[slot]).
+
+    Un slot est réservé par le serveur web (register) puis n'est jamais libéré pendant la session,
+    comme les entrées de l'ancien dictionnaire partagé.
+
+    Les entrées manette n'y sont pas écrites directement : le serveur les ajoute dans
+    `inputs` (une file SPSC par slot) et le lobby ou le jeu les appliquent via drain_inputs.
+    """
+
+    def __init__(self, capacity, buffer, shm=None, inputs=None):
+        self.capacity = capacity
+        self._shm = shm
+        self.inputs = inputs if inputs is not None else InputRings.local(capacity)
+        offsets, _ = _layout(capacity)
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.ndarray((capacity,), dtype=dtype, buffer=buffer, offset=offsets[name]))
+        self.pseudo = np.ndarray((capacity,), dtype=f"S{PSEUDO_BYTES}", buffer=buffer, offset=offsets["pseudo"])
+        self._slots = {}  # cache local pseudo -> slot
+
+    @classmethod
+    def create(cls, capacity=GameConfig.MAX_PLAYERS):
+        """Alloue une nouvelle table en mémoire partagée (appelé par le manager)."""
+        _, size = _layout(capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        table = cls(capacity, shm.buf, shm, InputRings.create(capacity))
+        table.aim_angle[:] = np.nan
+        return table
+
+    @classmethod
+    def attach(cls, name, capacity, inputs_name):
+        """Se rattache à une table existante depuis un processus enfant."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(capacity, shm.buf, shm, InputRings.attach(inputs_name, capacity))
+
+    @classmethod
+    def local(cls, capacity=GameConfig.MAX_PLAYERS):
+        """Table en mémoire privée, même interface (benchmarks, simulation sans manager)."""
+        _, size = _layout(capacity)
+        table = cls(capacity, bytearray(size))
+        table.aim_angle[:] = np.nan
+        return table
+
+    @property
+    def name(self):
+        return self._shm.name if self._shm else None
+
+    def __reduce__(self):
+        # Transmis aux processus enfants par son nom de segment
+        if self._shm is None:
+            raise TypeError("Une PlayerTable locale ne peut pas être partagée entre processus")
+        return PlayerTable.attach, (self._shm.name, self.capacity, self.inputs.name)
+
+    # ------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------
+    def active_slots(self):
+        """Liste des slots occupés, dans l'ordre d'arrivée des joueurs."""
+        return np.flatnonzero(self.active).tolist()
+
+    def count(self):
+        return int(np.count_nonzero(self.active))
+
+    def slot_of(self, pseudo):
+        """Retourne le slot du joueur, ou -1 s'il n'est pas inscrit."""
+        key = pseudo.encode("utf-8")[:PSEUDO_BYTES]
+        slot = self._slots.get(key)
+        if slot is not None and self.active[slot] and self.pseudo[slot] == key:
+            return slot
+        found = np.flatnonzero((self.pseudo == key) & (self.active == 1))
+        if len(found) == 0:
+            return -1
+        slot = int(found[0])
+        self._slots[key] = slot
+        return slot
+
+    def pseudo_of(self, slot):
+        return self.pseudo[slot].decode("utf-8", errors="replace")
+
+    def register(self, pseudo, team, player_id=None):
+        """
+        Réserve un slot pour un nouveau joueur et l'initialise avec les valeurs par défaut de Player.
+        Retourne le slot, ou -1 si la table est pleine.
+        """
+        free = np.flatnonzero(self.active == 0)
+        if len(free) == 0:
+            logger.warning(f"Table des joueurs pleine ({self.capacity}), {pseudo} refusé")
+            return -1
+        slot = int(free[0])
+        self.store(slot, Player(pseudo=pseudo, team=team).to_dict())
+        self.id[slot] = player_id if player_id is not None else self.count() + 1
+        self.dead[slot] = 0
+        self.respawn_time[slot] = 0.0
+        # Côté producteur (serveur web) : la file du slot n'est pas touchée, seul le consommateur
+        # écrit `tail` ; un slot jamais actif a une file vide (segment créé à zéro)
+        self.dx[slot] = 0.0
+        self.dy[slot] = 0.0
+        self.aim_dx[slot] = 0.0
+        self.aim_dy[slot] = 0.0
+        self.pseudo[slot] = pseudo.encode("utf-8")[:PSEUDO_BYTES]
+        # Le slot n'est visible des autres processus qu'une fois entièrement écrit
+        self.active[slot] = 1
+        return slot
+
+    # ------------------------------------------------------
+    # Conversion dict <-> ligne
+    # ------------------------------------------------------
+    def load(self, slot):
+        """Retourne la ligne sous forme de dict compatible avec Player.from_dict."""
+        data = {"pseudo": self.pseudo_of(slot)}
+        for name in PLAYER_FIELDS:
+            value = getattr(self, name)[slot].item()
+            if name in _NULLABLE and value != value:
+                value = None
+            data[name] = value
+        data["levelup_pending"] = bool(data["levelup_pending"])
+        return data
+
+    def store(self, slot, data):
+        """Écrit dans la ligne les champs numériques présents dans le dict (ex: Player.to_dict())."""
+        for name in PLAYER_FIELDS:
+            if name not in data:
+                continue
+            value = data[name]
+            if value is None:
+                value = np.nan if name in _NULLABLE else 0
+            getattr(self, name)[slot] = value
+
+    def reset_inputs(self, slot):
+        """Remet les entrées à zéro et jette les enregistrements en attente (consommateur uniquement : lobby, jeu)."""
+        self.inputs.drain(slot)
+        self.dx[slot] = 0.0
+        self.dy[slot] = 0.0
+        self.aim_dx[slot] = 0.0
+        self.aim_dy[slot] = 0.0
+
+    def drain_inputs(self, slot):
+        """
+        Applique les entrées reçues depuis le dernier tick : les vecteurs déplacement/visée
+        prennent leur valeur la plus récente, et chaque tir est conservé.
+
+        Returns:
+            list: angles de tir dans l'ordre de réception
+        """
+        shots = []
+        for _, a, b, cmd in self.inputs.drain(slot):
+            if cmd == INPUT_MOVE:
+                self.dx[slot] = a
+                self.dy[slot] = b
+            elif cmd == INPUT_AIM:
+                self.aim_dx[slot] = a
+                self.aim_dy[slot] = b
+            elif cmd == INPUT_SHOOT:
+                shots.append(a)
+        return shots
+
+    def reset_player(self, slot):
+        """Remet les statistiques du joueur aux valeurs de départ (retour au lobby)."""
+        self.paint_power[slot] = PlayerConfig.PAINT_POWER
+        self.health[slot] = PlayerConfig.MAX_HEALTH
+        self.speed[slot] = 0.0
+        self.damage[slot] = PlayerConfig.DAMAGE
+        self.ammo[slot] = PlayerConfig.MAX_AMMO
+        self.reload_time[slot] = PlayerConfig.RELOAD_TIME
+        self.reload_timer[slot] = 0.0
+        self.aim_angle[slot] = np.nan
+        self.level[slot] = 1
+        self.xp[slot] = 0.0
+        self.xp_to_next_level[slot] = PlayerConfig.BASE_XP_LEVEL
+        self.projectile_count[slot] = 1
+        self.levelup_pending[slot] = 0
+        self.dead[slot] = 0
+        self.respawn_time[slot] = 0.0
+        self.reset_inputs(slot)
+
+    # ------------------------------------------------------
+    # Cycle de vie du segment
+    # ------------------------------------------------------
+    def close(self):
+        if self._shm is not None:
+            # Les vues NumPy doivent être libérées avant de fermer le segment
+            for name, _ in COLUMNS:
+                setattr(self, name, None)
+            self.pseudo = None
+            self._shm.close()
+        self.inputs.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
+        self.inputs.unlink()
@@ -0,0 +1,110 @@
+"""
+Module Projectiles
+Moteur de projectiles en structure de tableaux : positions, vitesses, équipe, tireur, distance
+parcourue et portée sont stockées dans des tableaux NumPy préalloués, avec une liste de slots libres.
+
+L'avance, l'expiration de portée, la sortie d'écran et les impacts sur obstacles sont calculés
+en une passe vectorisée par tick ; seuls les projectiles proches d'un joueur repassent en Python.
+"""
+import math
+
+import numpy as np
+
+from utils.config import GameConfig, ProjectileConfig
+
+
+class ProjectilePool:
+    def __init__(self, capacity=ProjectileConfig.POOL_CAPACITY, radius=ProjectileConfig.RADIUS):
+        self.radius = radius
+        self.capacity = 0
+        self.next_id = 0  # numéro de tir croissant : ordre de traitement des impacts
+        self._free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Agrandit les tableaux (copie des projectiles existants) et ajoute les nouveaux slots à la liste libre."""
+        old = self.capacity
+
+        def resize(name, dtype):
+            arr = np.zeros(capacity, dtype=dtype)
+            if old:
+                arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+
+        for name in ("x", "y", "vx", "vy", "step", "dist", "range"):
+            resize(name, np.float64)
+        resize("team", np.int8)
+        resize("shooter", np.int32)
+        resize("seq", np.int64)
+        resize("alive", np.bool_)
+        # pop() rend le plus petit indice libre en premier
+        self._free = list(range(capacity - 1, old - 1, -1)) + self._free
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+    def spawn(self, x, y, angle, team, shooter, range_=ProjectileConfig.RANGE, speed=ProjectileConfig.SPEED):
+        """Ajoute un projectile et retourne son indice."""
+        if not self._free:
+            self._grow(self.capacity * 2)
+        i = self._free.pop()
+        vx = speed * math.cos(angle)
+        vy = speed * math.sin(angle)
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.step[i] = math.hypot(vx, vy)
+        self.dist[i] = 0.0
+        self.range[i] = range_
+        self.team[i] = team
+        self.shooter[i] = shooter
+        self.seq[i] = self.next_id
+        self.next_id += 1
+        self.alive[i] = True
+        return i
+
+    def release(self, indices):
+        """Libère un ou plusieurs projectiles."""
+        indices = np.atleast_1d(indices)
+        self.alive[indices] = False
+        self._free.extend(indices.tolist())
+
+    def clear(self):
+        self.release(np.flatnonzero(self.alive))
+
+    def advance(self, obstacle_grid, width=None, height=None, scale=1.0):
+        """
+        Avance tous les projectiles d'un pas (`scale` fois leur vitesse par pas de référence) et supprime ceux qui dépassent leur portée,
+        touchent un obstacle ou sortent de l'écran (dans cet ordre de priorité).
+
+        Returns:
+            np.ndarray: indices des projectiles toujours en vol, dans l'ordre des tirs
+        """
+        width = width or GameConfig.BASE_WIDTH
+        height = height or GameConfig.BASE_HEIGHT
+        idx = np.flatnonzero(self.alive)
+        if len(idx) == 0:
+            return idx
+
+        x = self.x[idx] + self.vx[idx] * scale
+        y = self.y[idx] + self.vy[idx] * scale
+        dist = self.dist[idx] + self.step[idx] * scale
+        self.x[idx] = x
+        self.y[idx] = y
+        self.dist[idx] = dist
+
+        dead = dist >= self.range[idx]
+        dead |= obstacle_grid.collides_many(x, y, self.radius)
+        dead |= (x < 0) | (x > width) | (y < 0) | (y > height)
+        if dead.any():
+            self.release(idx[dead])
+
+        flying = idx[~dead]
+        return flying[np.argsort(self.seq[flying], kind="stable")]
+
+    def snapshot(self, limit=None):
+        """Tableau (n, 3) float32 [x, y, team] des projectiles en vol (au plus `limit`), prêt pour l'affichage."""
+        idx = np.flatnonzero(self.alive)[:limit]
+        return np.column_stack((self.x[idx], self.y[idx], self.team[idx])).astype(np.float32)
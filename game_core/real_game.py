@@ -5,17 +5,32 @@ import random
 import sys
 import time
 import math
-import pygame
-from utils.config import PlayerConfig, TeamConfig, GameConfig, ProjectileConfig
-from queue import Empty
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+from utils.config import PlayerConfig, TeamConfig, GameConfig, ProjectileConfig, ObstacleConfig
 from game_core.obstacle import Obstacle
+from game_core.obstacle_grid import ObstacleGrid
+from game_core.spatial_hash import SpatialHash
+from game_core.projectiles import ProjectilePool
+from game_core.clock import FixedTimestep, Cadence
+from game_core.snapshot import PlayerColumns, SnapshotEncoder
+from game_core import tick_profiler as stages
+from game_core.tick_profiler import TickProfiler
 from game_core.player import Player
+from utils import startup
 
 running = True
 
 PLAYER_RADIUS = PlayerConfig.RADIUS
 RESPAWN_TIME = 4.0  # Temps de respawn en secondes
 
+# Phases de la manche (PREPARE -> PLAYING -> SCORING -> PODIUM -> LOBBY)
+PREPARE = "PREPARE"
+PLAYING = "PLAYING"
+SCORING = "SCORING"
+PODIUM = "PODIUM"
+LOBBY = "LOBBY"
+
 def handle_exit(signum, frame):
     global running
     running = False
@@ -23,32 +38,26 @@ def handle_exit(signum, frame):
 def distance(x1, y1, x2, y2):
     return math.hypot(x2 - x1, y2 - y1)
 
-def get_pixel_color(paint_surface, x, y):
-    """Retourne la couleur du pixel à la position (x,y)"""
-    try:
-        return paint_surface.get_at((int(x), int(y)))
-    except:
-        return (0, 0, 0)  # Noir par défaut si hors écran
-
-def collides_with_any_obstacle(x, y, radius, obstacles):
-    for o in obstacles:
-        left = o.x
-        top = o.y
-        right = o.x + o.width - 1  # corrige dépassement à droite
-        bottom = o.y + o.height - 1  # corrige dépassement en bas
-
-        closest_x = max(left, min(x, right))
-        closest_y = max(top, min(y, bottom))
-
-        dx = x - closest_x
-        dy = y - closest_y
-        dist_squared = dx * dx + dy * dy
+def collides_with_any_obstacle(x, y, radius, obstacle_grid):
+    # Seuls les obstacles des cellules voisines sont testés (voir ObstacleGrid)
+    return obstacle_grid.collides(x, y, radius)
 
-        if dist_squared < radius * radius:
-            return True
-    return False
+def creer_obstacles(count=ObstacleConfig.BASE_COUNT):
+    """Génère les murs aléatoires d'une partie."""
+    obstacles = []
+    for _ in range(count):
+        x = random.randint(80, GameConfig.BASE_WIDTH - 80)
+        y = random.randint(80, GameConfig.BASE_HEIGHT - 80)
+        if random.choice([True, False]):
+            width = random.randint(10, 15)
+            height = random.randint(60, 100)
+        else:
+            width = random.randint(60, 100)
+            height = random.randint(10, 15)
+        obstacles.append(Obstacle(x, y, width, height))
+    return obstacles
 
-def find_spawn_position(team, obstacles, connected_players):
+def find_spawn_position(team, obstacles, player_table):
     """Trouve une position de spawn en fonction de l'équipe sans overlap entre joueurs"""
     MIN_DISTANCE = PlayerConfig.RADIUS * 3  # Distance minimale entre joueurs au spawn
 
@@ -62,6 +71,9 @@ def find_spawn_position(team, obstacles, connected_players):
         x_range = (200, GameConfig.BASE_WIDTH - 200)
         y_range = (100, 300)
 
+    xs, ys, dead = player_table.x, player_table.y, player_table.dead
+    slots = player_table.active_slots()
+
     for _ in range(50):  # Augmente les essais
         x = random.randint(*x_range)
         y = random.randint(*y_range)
@@ -72,12 +84,11 @@ def find_spawn_position(team, obstacles, connected_players):
 
         # Vérifie la distance avec tous les autres joueurs actifs
         overlap = False
-        for other_data in connected_players.values():
-            other_p = other_data["player"]
+        for slot in slots:
             # Ignore les joueurs en respawn
-            if "dead" in other_data and other_data["dead"]:
+            if dead[slot]:
                 continue
-            dist = distance(x, y, other_p["x"], other_p["y"])
+            dist = distance(x, y, xs[slot], ys[slot])
             if dist < MIN_DISTANCE:
                 overlap = True
                 break
@@ -88,24 +99,24 @@ def find_spawn_position(team, obstacles, connected_players):
     # Si aucune position safe trouvée
     return (x_range[0] + x_range[1]) // 2, (y_range[0] + y_range[1]) // 2
 
-def player_obstacle_collisions(p, obstacles):
+def player_obstacle_collisions(x, y, obstacle_grid):
     """Force le joueur à sortir des obstacles même en cas d'encastrement léger, en utilisant une approche cercle/rectangle propre."""
     MAX_ITERATIONS = 15
     PUSH_FORCE = 2  # Force minimale appliquée à chaque itération
 
     for _ in range(MAX_ITERATIONS):
         collided = False
-        for o in obstacles:
-            if o.collides_with(p["x"], p["y"], PLAYER_RADIUS):
+        for o in obstacle_grid.near(x, y, PLAYER_RADIUS):
+            if o.collides_with(x, y, PLAYER_RADIUS):
                 collided = True
                 # Calcul du point le plus proche
                 left, top, right, bottom = o.get_rect()
-                closest_x = max(left, min(p["x"], right))
-                closest_y = max(top, min(p["y"], bottom))
+                closest_x = max(left, min(x, right))
+                closest_y = max(top, min(y, bottom))
 
                 # Vecteur de déplacement depuis l'obstacle
-                dx = p["x"] - closest_x
-                dy = p["y"] - closest_y
+                dx = x - closest_x
+                dy = y - closest_y
                 dist = math.hypot(dx, dy)
 
                 if dist == 0:
@@ -114,522 +125,454 @@ def player_obstacle_collisions(p, obstacles):
 
                 # Pousse le joueur à l'extérieur de l'obstacle (sur le bord + PUSH_FORCE)
                 correction = (PLAYER_RADIUS - dist) + PUSH_FORCE
-                p["x"] += (dx / dist) * correction
-                p["y"] += (dy / dist) * correction
+                x += (dx / dist) * correction
+                y += (dy / dist) * correction
                 break
         if not collided:
             break
-    return p
-
-def gestion_respawn(connected_players, player_respawns, now, obstacles):
-    for pseudo, data in list(connected_players.items()):
-        p = data["player"]
-        inp = data["inputs"]
+    return x, y
 
+def gestion_respawn(player_table, now, obstacles):
+    t = player_table
+    for slot in t.active_slots():
         # Vérification du respawn si le joueur est mort
-        if pseudo in player_respawns and player_respawns[pseudo]["dead"]:
-            if now >= player_respawns[pseudo]["respawn_time"]:
+        if t.dead[slot]:
+            if now >= t.respawn_time[slot]:
                 # Le joueur respawn
-                player_respawns[pseudo]["dead"] = False
+                t.dead[slot] = 0
                 # Trouver une position de spawn
-                p["x"], p["y"] = find_spawn_position(p["team"], obstacles,connected_players)
-                p["ammo"] = PlayerConfig.MAX_AMMO  # Reset des munitions
-                p["health"] = PlayerConfig.MAX_HEALTH  # Reset des PV
-                print(f"[Game] Le joueur {pseudo} a respawn!")
+                t.x[slot], t.y[slot] = find_spawn_position(int(t.team[slot]), obstacles, player_table)
+                t.ammo[slot] = PlayerConfig.MAX_AMMO  # Reset des munitions
+                t.health[slot] = PlayerConfig.MAX_HEALTH  # Reset des PV
+                print(f"[Game] Le joueur {t.pseudo_of(slot)} a respawn!")
             else:
-                p["ammo"] = 0
-                # Le joueur est toujours mort, passer au joueur suivant
-                continue
+                # Le joueur est toujours mort
+                t.ammo[slot] = 0
 
-        data["player"] = p
-        data["inputs"] = inp
-        connected_players[pseudo] = data
+def update_joueur(player_table, obstacles, paint_buffer, projectiles, dt, speeds):
+    """Déplacement, visée, recharge et tirs (ajoutés au ProjectilePool)."""
+    t = player_table
+    for slot in t.active_slots():
+        # Entrées reçues depuis le dernier tick (aucun tir perdu)
+        shots = t.drain_inputs(slot)
 
-def update_joueur(connected_players, obstacles, current_paint_surface, next_proj_id, projectiles, dt, speed_config):
-    for pseudo, data in list(connected_players.items()):
-        p = data["player"]
-        inp = data["inputs"]
+        team_color = int(t.team[slot])
+        x = float(t.x[slot])
+        y = float(t.y[slot])
 
         # Déplacement via joystick
-        dx, dy = inp["dx"], inp["dy"]
+        dx, dy = float(t.dx[slot]), float(t.dy[slot])
 
         # Vérifier la couleur sous le joueur pour modifier la vitesse
-        if isinstance(current_paint_surface, pygame.Surface):
-            pixel_color = get_pixel_color(current_paint_surface, p["x"] + PLAYER_RADIUS, p["y"] + PLAYER_RADIUS)
-            team_color = p["team"]
-
-            # Conversion des couleurs pour comparaison
-            pixel_rgb = (pixel_color[0], pixel_color[1], pixel_color[2])
-            team_rgb = TeamConfig.COLOR_MAP.get(team_color)
-
-            # Détermination si c'est la couleur d'une équipe
-            is_team_color = False
-            matched_team = None
-
-            for team_id, color in TeamConfig.COLOR_MAP.items():
-                if color == pixel_rgb:
-                    is_team_color = True
-                    matched_team = team_id
-                    break
+        if paint_buffer is not None:
+            # Équipe propriétaire de la cellule au sol (-1 : non peinte ou hors écran)
+            owner = paint_buffer.owner_at(x + PLAYER_RADIUS, y + PLAYER_RADIUS)
 
             # Ajustement de la vitesse
-            if is_team_color:
-                if matched_team == team_color:
-                    # Sur sa propre couleur -> boost de vitesse
-                    p["speed"] = speed_config["allie"]
-                else:
-                    # Sur la couleur ennemie -> ralentissement
-                    p["speed"] = speed_config["ennemi"]
+            if owner == team_color:
+                # Sur sa propre couleur -> boost de vitesse
+                t.speed[slot] = speeds["allie"]
+            elif owner >= 0:
+                # Sur la couleur ennemie -> ralentissement
+                t.speed[slot] = speeds["ennemi"]
             else:
                 # Sur surface neutre -> vitesse normale
-                p["speed"] = speed_config["neutre"]
+                t.speed[slot] = speeds["neutre"]
 
+        # Vitesse en px par pas de référence, ramenée au pas de simulation
+        speed = float(t.speed[slot]) * dt * GameConfig.SPEED_REFERENCE_HZ
         radius = PlayerConfig.RADIUS
-        new_x = p["x"] + p["speed"] * dx
-        new_y = p["y"] + p["speed"] * dy
+        new_x = x + speed * dx
+        new_y = y + speed * dy
 
         # Gestion des collisions avec les obstacles
         collision = collides_with_any_obstacle(new_x, new_y, radius, obstacles)
         # Essai complet (diagonale)
         if not collision:
-            p["x"] = max(0, min(GameConfig.BASE_WIDTH, new_x))
-            p["y"] = max(0, min(GameConfig.BASE_HEIGHT, new_y))
+            x = max(0, min(GameConfig.BASE_WIDTH, new_x))
+            y = max(0, min(GameConfig.BASE_HEIGHT, new_y))
         # Essai horizontal uniquement
         else:
-            collision_x = collides_with_any_obstacle(new_x, p["y"], radius, obstacles)
+            collision_x = collides_with_any_obstacle(new_x, y, radius, obstacles)
             if not collision_x:
-                p["x"] = max(0, min(GameConfig.BASE_WIDTH, new_x))
+                x = max(0, min(GameConfig.BASE_WIDTH, new_x))
 
             # Essai vertical uniquement
-            collision_y = collides_with_any_obstacle(p["x"], new_y, radius, obstacles)
+            collision_y = collides_with_any_obstacle(x, new_y, radius, obstacles)
             if not collision_y:
-                p["y"] = max(0, min(GameConfig.BASE_HEIGHT, new_y))
+                y = max(0, min(GameConfig.BASE_HEIGHT, new_y))
+
+        t.x[slot] = x
+        t.y[slot] = y
 
         # Calcul angle de visée (pour l'affichage de la flèche)
-        ax, ay = inp["aim_dx"], inp["aim_dy"]
+        ax, ay = float(t.aim_dx[slot]), float(t.aim_dy[slot])
         dist_aim = math.hypot(ax, ay)
         if dist_aim > 0.01:
-            p["aim_angle"] = math.atan2(ay, ax)
+            t.aim_angle[slot] = math.atan2(ay, ax)
         else:
-            p["aim_angle"] = None
+            t.aim_angle[slot] = math.nan
 
         # Recharge munitions
-        if p["ammo"] < PlayerConfig.MAX_AMMO:
-            p["reload_timer"] += dt
-            if p["reload_timer"] >= p["reload_time"]:
-                p["ammo"] += 1
-                p["reload_timer"] = 0.0
-
-        # Tir => SHOOT_ANGLE
-        if inp["shoot_angle"] is not None:
-            if p["ammo"] > 0:
-                angle = inp["shoot_angle"]
-                proj_id = next_proj_id
-                next_proj_id += 1
-
-                vx = ProjectileConfig.SPEED * math.cos(angle)
-                vy = ProjectileConfig.SPEED * math.sin(angle)
-
-                projectiles[proj_id] = {
-                    "x": p["x"],  # point de départ
-                    "y": p["y"],
-                    "vx": vx,
-                    "vy": vy,
-                    "team": p["team"],
-                    "shooter": pseudo,  # Pour savoir qui a tiré
-                    "radius": ProjectileConfig.RADIUS,
-                    "range": ProjectileConfig.RANGE,  # distance max
-                    "dist_travelled": 0.0  # distance parcourue
-                }
-                p["ammo"] -= 1
-
-            inp["shoot_angle"] = None
-
-        data["player"] = p
-        data["inputs"] = inp
-        connected_players[pseudo] = data
-
-def collision_joueur(connected_players, player_respawns, friendly_collisions):
-    players_list = list(connected_players.items())
-    for i in range(len(players_list)):
-        pseudo1, d1 = players_list[i]
-        # Ignorer si joueur en respawn
-        if pseudo1 in player_respawns and player_respawns[pseudo1]["dead"]:
+        if t.ammo[slot] < PlayerConfig.MAX_AMMO:
+            t.reload_timer[slot] += dt
+            if t.reload_timer[slot] >= t.reload_time[slot]:
+                t.ammo[slot] += 1
+                t.reload_timer[slot] = 0.0
+
+        # Tir => SHOOT_ANGLE, une salve par tir reçu tant qu'il reste des munitions
+        for angle in shots:
+            if t.ammo[slot] > 0:
+                # Multi-tir (TRIPLE_SHOT) : projectile_count projectiles en éventail autour de l'angle visé
+                count = max(1, int(t.projectile_count[slot]))
+                spread = ProjectileConfig.MULTI_SHOT_SPREAD
+                for k in range(count):
+                    projectiles.spawn(x, y, angle + (k - (count - 1) / 2) * spread, team_color, slot)
+                t.ammo[slot] -= 1
+
+
+def joueurs_vivants(player_table):
+    """Slots des joueurs actifs qui ne sont pas en respawn."""
+    dead = player_table.dead
+    return [s for s in player_table.active_slots() if not dead[s]]
+
+def collision_joueur(player_table, friendly_collisions, broadphase=None):
+    t = player_table
+    xs, ys, teams = t.x, t.y, t.team
+    # Broadphase : seules les paires de cellules voisines sont testées (joueurs en respawn ignorés)
+    broadphase = (broadphase or SpatialHash()).rebuild(joueurs_vivants(t), xs, ys)
+    for s1, s2 in broadphase.pairs():
+        # ignorer collisions amicales si param OFF + même team
+        if (not friendly_collisions) and (teams[s1] == teams[s2]):
             continue
 
-        for j in range(i + 1, len(players_list)):
-            pseudo2, d2 = players_list[j]
-            # Ignorer si joueur en respawn
-            if pseudo2 in player_respawns and player_respawns[pseudo2]["dead"]:
-                continue
-
-            p1 = d1["player"]
-            p2 = d2["player"]
-
-            # ignorer collisions amicales si param OFF + même team
-            if (not friendly_collisions.value) and (p1["team"] == p2["team"]):
-                continue
-
-            distp = distance(p1["x"], p1["y"], p2["x"], p2["y"])
-            if distp < (PLAYER_RADIUS * 2):
-                overlap = (PLAYER_RADIUS * 2) - distp
-                if distp != 0:
-                    nx = (p2["x"] - p1["x"]) / distp
-                    ny = (p2["y"] - p1["y"]) / distp
-                    p1["x"] -= nx * (overlap / 2)
-                    p1["y"] -= ny * (overlap / 2)
-                    p2["x"] += nx * (overlap / 2)
-                    p2["y"] += ny * (overlap / 2)
-
-                d1["player"] = p1
-                d2["player"] = p2
-                connected_players[pseudo1] = d1
-                connected_players[pseudo2] = d2
-
-def gestion_projectiles(projectiles, connected_players, player_respawns, obstacles, now, friendly_collisions):
-    to_remove = []
-    for pid, proj in projectiles.items():
-        old_x, old_y = proj["x"], proj["y"]
-        # Avance
-        proj["x"] += proj["vx"]
-        proj["y"] += proj["vy"]
-
-        # distance parcourue
-        step_dist = math.hypot(proj["vx"], proj["vy"])
-        proj["dist_travelled"] += step_dist
-
-        # Si on dépasse la portée, on supprime
-        if proj["dist_travelled"] >= proj["range"]:
-            to_remove.append(pid)
-            continue
-
-        # Collision avec obstacle
-        collision = collides_with_any_obstacle(proj["x"], proj["y"], proj["radius"], obstacles)
-        if collision:
-            # Le projectile s'arrête sur l'obstacle
-            proj["x"] = old_x
-            proj["y"] = old_y
-            to_remove.append(pid)
-            continue
-
-        # Sortie écran
-        if proj["x"] < 0 or proj["x"] > GameConfig.BASE_WIDTH or proj["y"] < 0 or proj["y"] > GameConfig.BASE_HEIGHT:
-            to_remove.append(pid)
-            continue
-
-        # Collision projectile ↔ joueurs (qui ne sont pas en respawn)
-        for pseudo, data in connected_players.items():
-            # Ignorer les joueurs en respawn
-            if pseudo in player_respawns and player_respawns[pseudo]["dead"]:
+        x1, y1, x2, y2 = float(xs[s1]), float(ys[s1]), float(xs[s2]), float(ys[s2])
+        distp = distance(x1, y1, x2, y2)
+        if distp < (PLAYER_RADIUS * 2):
+            overlap = (PLAYER_RADIUS * 2) - distp
+            if distp != 0:
+                nx = (x2 - x1) / distp
+                ny = (y2 - y1) / distp
+                xs[s1] = x1 - nx * (overlap / 2)
+                ys[s1] = y1 - ny * (overlap / 2)
+                xs[s2] = x2 + nx * (overlap / 2)
+                ys[s2] = y2 + ny * (overlap / 2)
+
+def gestion_projectiles(projectiles, player_table, obstacles, now, dt, friendly_collisions, broadphase=None):
+    t = player_table
+    # Avance, portée, obstacles et sortie d'écran : une passe vectorisée sur tout le pool
+    flying = projectiles.advance(obstacles, scale=dt * GameConfig.SPEED_REFERENCE_HZ)
+    if len(flying) == 0:
+        return
+
+    # Broadphase reconstruite sur les positions finales du tick (joueurs en respawn ignorés)
+    broadphase = (broadphase or SpatialHash()).rebuild(joueurs_vivants(t), t.x, t.y)
+
+    # Seuls les projectiles ayant un joueur dans leurs cellules voisines sont testés un par un
+    candidates = flying[broadphase.covers(projectiles.x[flying], projectiles.y[flying])]
+    radius = projectiles.radius
+    for i in candidates.tolist():
+        px, py = projectiles.x[i], projectiles.y[i]
+        shooter = int(projectiles.shooter[i])
+        team = projectiles.team[i]
+
+        # Collision projectile ↔ joueurs voisins (qui ne sont pas en respawn)
+        for slot in broadphase.near(px, py):
+            # Ignorer les joueurs tués plus tôt dans ce tick
+            if t.dead[slot]:
                 continue
 
             # Ignorer le tireur
-            if pseudo == proj["shooter"]:
+            if slot == shooter:
                 continue
 
-            p = data["player"]
-            distp = distance(proj["x"], proj["y"], p["x"], p["y"])
+            distp = distance(px, py, t.x[slot], t.y[slot])
 
-            if distp < (proj["radius"] + PLAYER_RADIUS):  # Collision détectée
+            if distp < (radius + PLAYER_RADIUS):  # Collision détectée
 
                 # Ignorer collisions amicales si param OFF + même team
-                if (not friendly_collisions.value) and (p["team"] == proj["team"]):
+                if (not friendly_collisions) and (t.team[slot] == team):
                     continue
 
                 # Joueur touché -> déclencher respawn
-                print(f"[Game] Le joueur {pseudo} a été touché par un projectile de {proj['shooter']}!")
+                print(f"[Game] Le joueur {t.pseudo_of(slot)} a été touché par un projectile de {t.pseudo_of(shooter)}!")
 
-                pseudo_t = projectiles[pid]["shooter"]
-                entree_t = connected_players[pseudo_t]
-                p_t = Player.from_dict(entree_t["player"])
-
-                entree = connected_players[pseudo]
-                p = Player.from_dict(entree["player"])
+                p_t = Player.from_dict(t.load(shooter))
+                p = Player.from_dict(t.load(slot))
 
                 p_t.add_xp(5)
                 p.take_damage(1)
                 if p.is_dead():
                     p_t.add_xp(20)
-                    entree["player"].update(p.to_dict())
-                    connected_players[pseudo] = entree
-                    player_respawns[pseudo] = {
-                        "dead": True,
-                        "respawn_time": now + RESPAWN_TIME
-                    }
-
-                entree_t["player"].update(p_t.to_dict())
-                connected_players[pseudo_t] = entree_t
+                    t.dead[slot] = 1
+                    t.respawn_time[slot] = now + RESPAWN_TIME
 
-                entree["player"].update(p.to_dict())
-                connected_players[pseudo] = entree
+                t.store(shooter, p_t.to_dict())
+                t.store(slot, p.to_dict())
 
                 # Supprimer le projectile
-                to_remove.append(pid)
+                projectiles.release(i)
                 break
 
-    for pid in to_remove:
-        if pid in projectiles:
-            del projectiles[pid]
-
-def real_game_logic(connected_players, lobby_state_queue, game_started, friendly_collisions, paint_surface_queue, to_couleur_queue, from_couleur_queue, game_duration, speed_config,prepare_phase,game_start_time):
+def peindre_traces(player_table, paint_buffer, prev_x, prev_y):
+    """Marque les cellules parcourues par chaque joueur vivant depuis (prev_x, prev_y) comme appartenant à son équipe."""
+    t = player_table
+    slots = joueurs_vivants(t)
+    if slots:
+        paint_buffer.paint_trails(prev_x[slots], prev_y[slots], t.x[slots], t.y[slots], t.team[slots], PLAYER_RADIUS)
+
+def _sans_mesure(stage):
+    pass
+
+def simulation_tick(player_table, obstacles, projectiles, paint_buffer, now, dt, speeds, friendly_collisions, profiler=None):
+    """Un pas de simulation complet (respawns, déplacements, collisions, projectiles), mesuré étape par étape si `profiler`."""
+    lap = profiler.lap if profiler is not None else _sans_mesure
+
+    # 1. Gestion des respawns et mise à jour des joueurs
+    gestion_respawn(player_table, now, obstacles)
+    lap(stages.RESPAWN)
+    # Positions de départ du pas (après respawn : pas de trace entre la mort et le point de réapparition)
+    prev_x, prev_y = player_table.x.copy(), player_table.y.copy()
+    update_joueur(player_table, obstacles, paint_buffer, projectiles, dt, speeds)
+    lap(stages.UPDATE_JOUEUR)
+
+    broadphase = SpatialHash()
+
+    # 2. Collisions Joueurs (ignorés si en respawn)
+    collision_joueur(player_table, friendly_collisions, broadphase)
+    lap(stages.COLLISION_JOUEUR)
+
+    # 2b. Correction : empêcher les joueurs d'être coincés dans les obstacles après collision
+    xs, ys = player_table.x, player_table.y
+    for slot in player_table.active_slots():
+        xs[slot], ys[slot] = player_obstacle_collisions(float(xs[slot]), float(ys[slot]), obstacles)
+    lap(stages.DEPENETRATION)
+
+    # 2c. Peinture le long des traces des joueurs vivants
+    if paint_buffer is not None:
+        peindre_traces(player_table, paint_buffer, prev_x, prev_y)
+        lap(stages.PEINTURE)
+
+    # 3. Projectiles
+    gestion_projectiles(projectiles, player_table, obstacles, now, dt, friendly_collisions, broadphase)
+    lap(stages.GESTION_PROJECTILES)
+
+def colonnes_joueurs(player_table, frozen=False):
+    """État des joueurs pour l'affichage, en colonnes lues dans la table (voir SnapshotEncoder)."""
+    t = player_table
+    slots = np.flatnonzero(t.active)
+    # Ajouter l'état de mort aux données du joueur (personne n'est mort pendant la préparation)
+    dead = t.dead[slots] != 0 if not frozen else np.zeros(len(slots), dtype=bool)
+    hot = np.column_stack((t.x[slots], t.y[slots], t.aim_angle[slots]))
+    cold = [t.id[slots], t.team[slots], t.ammo[slots], dead, np.where(dead, t.respawn_time[slots], 0.0)]
+    fields = ("id", "team", "ammo", "dead", "respawn_time")
+    if not frozen:
+        cold.append(t.health[slots])
+        fields += ("health",)
+    return PlayerColumns(slots, hot, np.column_stack(cold).astype(np.float64), fields,
+                         lambda: [t.pseudo_of(slot) for slot in slots.tolist()])
+
+def snapshot_joueurs(player_table, frozen=False):
+    """État des joueurs pour l'affichage, indexé par pseudo."""
+    return colonnes_joueurs(player_table, frozen).to_dict()
+
+def designer_gagnant(resultat):
+    """Libellé du gagnant à partir des parts de couverture par équipe."""
+    if not resultat:
+        print("[Game] Aucun résultat de score reçu.")
+        return "ÉGALITÉ"
+    gagnant = max(resultat.items(), key=lambda x: x[1])[0]
+    print(f"[Game] L'équipe gagnante est l'équipe {gagnant}")
+    return f"L'équipe {gagnant}"
+
+def game_worker(start_conn, player_table, state_channel, game_started, friendly_collisions, paint_buffer, game_duration, speed_config, prepare_phase, game_start_time,
+                profiler=None):
+    """
+    Processus de jeu de réserve, lancé par le manager pendant le lobby : modules importés, obstacles
+    créés et proxies du Manager connectés, il attend l'ordre de départ sur `start_conn`.
+    Le message de départ ne porte que les paramètres de la manche ({"duration": secondes}) ;
+    None ou la fermeture du tube l'arrêtent sans jouer.
+    """
+    obstacles = ObstacleGrid(creer_obstacles())
+    # Premier accès à chaque proxy : la connexion au Manager est ouverte maintenant plutôt qu'au premier pas
+    for proxy in (game_started, prepare_phase, game_start_time, friendly_collisions, game_duration):
+        proxy.value
+    dict(speed_config)
+
+    startup.ready()
+    try:
+        match = start_conn.recv()
+    except (EOFError, KeyboardInterrupt):
+        return
+    if match is None:
+        return
+    real_game_logic(player_table, state_channel, game_started, friendly_collisions, paint_buffer, game_duration,
+                    speed_config, prepare_phase, game_start_time, obstacles=obstacles, duration=match["duration"],
+                    profiler=profiler)
+
+def real_game_logic(player_table, state_channel, game_started, friendly_collisions, paint_buffer, game_duration, speed_config,prepare_phase,game_start_time,
+                    obstacles=None, duration=None, profiler=None):
     global running
     signal.signal(signal.SIGINT, handle_exit)
     signal.signal(signal.SIGTERM, handle_exit)
 
-    projectiles = {}
-    next_proj_id = 0
-    last_time = time.time()
-    GAME_DURATION = game_duration.value  # durée de la manche en secondes (variable partagé)
-
-    # Initialiser une surface de peinture par défaut
-    current_paint_surface = pygame.Surface((GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT), flags=pygame.SRCALPHA)
-    current_paint_surface.fill((0, 0, 0))  # Noir par défaut
-
-    # Création des obstacles
-    obstacles = []
-    for _ in range(20):
-        x = random.randint(80, GameConfig.BASE_WIDTH - 80)
-        y = random.randint(80, GameConfig.BASE_HEIGHT - 80)
-        if random.choice([True, False]):
-            width = random.randint(10, 15)
-            height = random.randint(60, 100)
-        else:
-            width = random.randint(60, 100)
-            height = random.randint(10, 15)
-        obstacles.append(Obstacle(x, y, width, height))
-
-        # À faire juste après la création des obstacles (avant toute boucle de jeu)
-        for pseudo, data in connected_players.items():
-            p = data["player"]
-            # Forcer un spawn initial propre par équipe
-            p["x"], p["y"] = find_spawn_position(p["team"], obstacles, connected_players)
-            p["health"] = PlayerConfig.MAX_HEALTH
-            data["player"] = p
-            connected_players[pseudo] = data
-
-
-    # Initialisation des états de respawn des joueurs
-    player_respawns = {}  # {pseudo: {"dead": bool, "respawn_time": float}}
-
-    while running and game_started.value:
-        now = time.time()
-        dt = now - last_time
-        last_time = now
-
-        # Blocage complet pendant prepare_phase
-        if prepare_phase.value:
-            # Figer les inputs à zéro
-            for pseudo, data in connected_players.items():
-                inp = data["inputs"]
-                inp["dx"] = 0.0
-                inp["dy"] = 0.0
-                inp["aim_dx"] = 0.0
-                inp["aim_dy"] = 0.0
-                inp["shoot_angle"] = None
-                data["inputs"] = inp
-                connected_players[pseudo] = data
-
-            # Envoyer uniquement un snapshot "figé"
-            temp_players = {}
-            for pseudo, data in connected_players.items():
-                p = data["player"]
-                pid = data.get("id", 0)
-                temp_players[pseudo] = {
-                    "id": pid,
-                    "x": p["x"],
-                    "y": p["y"],
-                    "team": p["team"],
-                    "ammo": p["ammo"],
-                    "aim_angle": p["aim_angle"],
-                    "dead": False,
-                    "respawn_time": 0
-                }
+    projectiles = ProjectilePool()
+    # Durées des étapes de chaque tour, lues par /metrics (compteurs privés si le manager n'en fournit pas)
+    if profiler is None:
+        profiler = TickProfiler.local()
+    profiler.start_match()
+    # durée de la manche en secondes (paramètre de départ, sinon variable partagée)
+    GAME_DURATION = duration if duration is not None else game_duration.value
+
+    # Création des obstacles (sauf s'ils ont été préparés par le processus de réserve), indexés une fois pour toute la partie
+    if obstacles is None:
+        obstacles = ObstacleGrid(creer_obstacles())
+
+    # À faire juste après la création des obstacles (avant toute boucle de jeu)
+    for slot in player_table.active_slots():
+        # Forcer un spawn initial propre par équipe
+        player_table.x[slot], player_table.y[slot] = find_spawn_position(int(player_table.team[slot]), obstacles, player_table)
+        player_table.health[slot] = PlayerConfig.MAX_HEALTH
+        player_table.dead[slot] = 0
+
+    temp_obstacles = [
+        {"x": o.x, "y": o.y, "width": o.width, "height": o.height}
+        for o in obstacles
+    ]
+
+    # Nouvelle partie : grille de peinture vierge, puis une tache sous chaque joueur à son point de départ
+    paint_buffer.clear()
+    peindre_traces(player_table, paint_buffer, player_table.x.copy(), player_table.y.copy())
+
+    # Physique à pas fixe (horloge monotone), snapshots publiés à leur propre cadence
+    sim_clock = FixedTimestep(GameConfig.SIM_HZ, GameConfig.MAX_CATCHUP_STEPS)
+    snapshot_cadence = Cadence(GameConfig.SNAPSHOT_HZ)
+    dt = sim_clock.dt
+    # Temps de simulation en secondes « murales » (respawn_time est comparé à time.time() par l'affichage)
+    sim_time = time.time()
+    temp_players = colonnes_joueurs(player_table)
+    encoder = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL)
+    prepare_static = None
+
+    # Machine à états de la manche, avancée par la boucle de pas (aucune attente bloquante)
+    phase = PREPARE
+    scoring = None  # Future du score final
+    podium_end = 0.0
+    scorer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Score")
+
+    while running and phase != LOBBY:
+        # Arrêt par l'admin pendant la préparation ou le jeu : sortie immédiate
+        if phase in (PREPARE, PLAYING) and not game_started.value:
+            break
 
-            temp_projectiles = {}
-            temp_obstacles = [
-                {"x": o.x, "y": o.y, "width": o.width, "height": o.height}
-                for o in obstacles
-            ]
-
-            display_data = {
-                "players": temp_players,
-                "projectiles": temp_projectiles,
-                "obstacles": temp_obstacles,
-                "start_time": now,  # moment actuel juste pour afficher quelque chose
-                "duration": GAME_DURATION
-            }
-
-            lobby_state_queue.put(display_data)
-            time.sleep(0.016)
-            continue  # saute toute la boucle, rien ne bouge ni ne progresse
-
-
-        # Récupération de la surface de peinture
-        try:
-            surface_data = paint_surface_queue.get_nowait()
-            if not isinstance(surface_data, pygame.Surface):
-                surface_data = pygame.surfarray.make_surface(surface_data)
-            current_paint_surface = surface_data
-        except Empty:
-            pass
-
-        # 1. Gestion des respawns et mise à jour des joueurs
-        gestion_respawn(connected_players, player_respawns, now, obstacles)
-        update_joueur(connected_players, obstacles, current_paint_surface, next_proj_id, projectiles, dt, speed_config)
-
-        # 2. Collisions Joueurs (ignorés si en respawn)
-        collision_joueur(connected_players, player_respawns, friendly_collisions)
-
-        # 2b. Correction : empêcher les joueurs d'être coincés dans les obstacles après collision
-        for pseudo, data in connected_players.items():
-            p = data["player"]
-            p = player_obstacle_collisions(p, obstacles)
-            data["player"] = p
-            connected_players[pseudo] = data
-
-        # 3. Projectiles
-        gestion_projectiles(projectiles, connected_players, player_respawns, obstacles, now, friendly_collisions)
-
-        # 4. Préparer l'état pour affichage
-        temp_players = {}
-        for pseudo, data in connected_players.items():
-            p = data["player"]
-            pid = data.get("id", 0)
-
-            # Ajouter l'état de mort aux données du joueur
-            is_dead = pseudo in player_respawns and player_respawns[pseudo]["dead"]
-            respawn_time = player_respawns.get(pseudo, {}).get("respawn_time", 0) if is_dead else 0
-
-            temp_players[pseudo] = {
-                "id": pid,
-                "x": p["x"],
-                "y": p["y"],
-                "health": p["health"],
-                "team": p["team"],
-                "ammo": p["ammo"],
-                "aim_angle": p["aim_angle"],
-                "dead": is_dead,
-                "respawn_time": respawn_time
-            }
-
-        temp_projectiles = {}
-        for pid, proj in projectiles.items():
-            temp_projectiles[pid] = {
-                "x": proj["x"],
-                "y": proj["y"],
-                "team": proj["team"]
-            }
-
-        temp_obstacles = [
-            {"x": o.x, "y": o.y, "width": o.width, "height": o.height}
-            for o in obstacles
-        ]
-
-        display_data = {
-            "players": temp_players,
-            "projectiles": temp_projectiles,
-            "obstacles": temp_obstacles,
-            "start_time": game_start_time.value,  # début de la partie
-            "duration": GAME_DURATION
-        }
-
-        # Envoi à la queue
-        lobby_state_queue.put(display_data)
-
-        # Vérifie si le temps est écoulé
-        if time.time() - game_start_time.value >= GAME_DURATION:
-            print("[Game] Fin du temps de jeu.")
-
-            # Demande le calcul des couleurs finales
-            import pickle
-            try:
-                arr = pygame.surfarray.array3d(current_paint_surface)
-                to_couleur_queue.put(pickle.dumps(arr))
-                time.sleep(1)  # attend un peu le traitement
-                resultat = from_couleur_queue.get(timeout=2)
-            except:
-                resultat = {}
-
-            print("[Game] Score final:", resultat)
-
-           # Déterminer le gagnant
-            gagnant_str = ""
-            if resultat:
-                gagnant = max(resultat.items(), key=lambda x: x[1])[0]
-                print(f"[Game] L'équipe gagnante est l'équipe {gagnant}")
-                gagnant_str = f"L'équipe {gagnant}"
-            else:
-                gagnant_str = "ÉGALITÉ"
-                print("[Game] Aucun résultat de score reçu.")
-
-            # Affichage du gagnant PENDANT 5 SECONDES
-            print(f"[Game] Affichage du gagnant : {gagnant_str}")
-
-            # Envoyer un état à afficher avec le gagnant
-            display_data = {
-                "players": temp_players,
-                "projectiles": {},
-                "obstacles": temp_obstacles,
-                "winner": gagnant_str,
-                "show_winner": True  # Indicateur explicite
-            }
-
-            # Envoyer plusieurs fois pour garantir que l'affichage le reçoit
-            for _ in range(3):
-                lobby_state_queue.put(display_data)
-                time.sleep(0.1)
-
-            # Afficher le gagnant pendant 5 secondes
-            time.sleep(5)
-
-            # Remise à zéro des joueurs avant retour lobby
-            p["x"] = 200
-            p["y"] = 150
-            p["team"] = (p["team"]+1)%3
-            p["paint_power"] = PlayerConfig.PAINT_POWER
-            p["health"] = PlayerConfig.MAX_HEALTH
-            p["speed"] = 0.0
-            p["damage"] = PlayerConfig.DAMAGE
-            p["ammo"] = PlayerConfig.MAX_AMMO
-            p["reload_time"] = PlayerConfig.RELOAD_TIME
-            p["reload_timer"] = 0.0
-            p["aim_angle"] = None
-            p["level"] = 1
-            p["xp"] = 0.0
-            p["xp_to_next_level"] = 100
-            p["powerups"] = []
-            p["projectile_count"] = 1
-            p["levelup_pending"] = False
-
-            data["inputs"]["dx"] = 0.0
-            data["inputs"]["dy"] = 0.0
-            data["inputs"]["aim_dx"] = 0.0
-            data["inputs"]["aim_dy"] = 0.0
-            data["inputs"]["shoot_angle"] = None
-            connected_players[pseudo] = data
-
-            # Affichage de l'équipe gagnante pendant 5s avant retour lobby
-            gagnant_str = f"L'équipe {gagnant}" if resultat else "ÉGALITÉ"
-            print(f"[Game] Affichage du gagnant : {gagnant_str}")
-
-            display_data = {
-                "players": temp_players,
-                "projectiles": {},
-                "obstacles": temp_obstacles,
-                "winner": gagnant_str
+        if phase == PREPARE:
+            # Blocage complet pendant prepare_phase (fin décidée par le manager)
+            if prepare_phase.value:
+                now = time.time()
+                # Figer les inputs à zéro
+                for slot in player_table.active_slots():
+                    player_table.reset_inputs(slot)
+
+                # Envoyer uniquement un snapshot "figé" (début de la préparation comme start_time, non affiché)
+                if prepare_static is None:
+                    prepare_static = {"obstacles": temp_obstacles, "start_time": now, "duration": GAME_DURATION}
+                state_channel.publish(encoder.encode(colonnes_joueurs(player_table, frozen=True), [], prepare_static))
+                time.sleep(snapshot_cadence.interval)
+                continue
+            # La préparation ne compte pas comme du temps à rattraper
+            sim_clock.reset()
+            sim_time = time.time()
+            phase = PLAYING
+
+        if phase == PLAYING:
+            profiler.begin()
+            steps = sim_clock.advance()
+            if steps:
+                # Paramètres partagés lus une seule fois par itération (un aller-retour Manager chacun)
+                speeds = dict(speed_config)
+                friendly = friendly_collisions.value
+                profiler.lap(stages.PARAMETRES)
+
+                # 1-3. Respawns, joueurs, collisions et projectiles, pas de durée fixe
+                for _ in range(steps):
+                    sim_time += dt
+                    simulation_tick(player_table, obstacles, projectiles, paint_buffer, sim_time, dt, speeds, friendly, profiler)
+
+            # 4. Préparer l'état pour affichage, à la cadence des snapshots
+            if snapshot_cadence.due():
+                temp_players = colonnes_joueurs(player_table)
+
+                # Tableau (n, 3) [x, y, team] lu directement dans le pool, borné pour tenir dans la boîte
+                temp_projectiles = projectiles.snapshot(GameConfig.SNAPSHOT_MAX_PROJECTILES)
+
+                # Image clé (obstacles, début, durée) ou delta (positions, visées et champs lents modifiés)
+                match_static = {"obstacles": temp_obstacles, "start_time": game_start_time.value, "duration": GAME_DURATION}
+                message = encoder.encode(temp_players, temp_projectiles, match_static)
+                profiler.lap(stages.SNAPSHOT)
+                try:
+                    state_channel.publish(message)
+                except ValueError as e:
+                    # Message trop grand pour la boîte : image clé sans projectiles plutôt qu'un arrêt de la manche
+                    print(f"[Game] Snapshot trop grand, publié sans projectiles: {e}")
+                    encoder.force_keyframe()
+                    state_channel.publish(encoder.encode(temp_players, temp_projectiles[:0], match_static))
+                profiler.lap(stages.PUBLISH)
+            profiler.end(len(temp_players), len(projectiles))
+
+            # Vérifie si le temps est écoulé
+            if time.time() - game_start_time.value >= GAME_DURATION:
+                print("[Game] Fin du temps de jeu.")
+                # Score final exact, recompté dans la grille partagée sans bloquer la boucle
+                scoring = scorer.submit(paint_buffer.coverage, list(TeamConfig.COLOR_MAP))
+                phase = SCORING
+
+        elif phase == SCORING:
+            # Attente passive du score, bornée pour rester réactif à l'arrêt (running)
+            wait([scoring], timeout=snapshot_cadence.interval)
+            if scoring.done():
+                resultat = scoring.result()
+                print("[Game] Score final:", resultat)
+                gagnant_str = designer_gagnant(resultat)
+                print(f"[Game] Affichage du gagnant : {gagnant_str}")
+
+                # Dernier état de la manche avec le gagnant (conservé par la boîte « dernière valeur »)
+                display_data = {
+                    "players": temp_players.to_dict(),
+                    "projectiles": [],
+                    "obstacles": temp_obstacles,
+                    "winner": gagnant_str,
+                    "show_winner": True  # Indicateur explicite
                 }
+                state_channel.publish(display_data)
+
+                # La manche est finie : l'admin peut déjà programmer la suivante pendant le podium
+                game_started.value = False
+                podium_end = time.monotonic() + GameConfig.PODIUM_DURATION
+                phase = PODIUM
+
+        elif phase == PODIUM:
+            # Les commandes reçues pendant le podium ne doivent pas se reporter sur la manche suivante
+            for slot in player_table.active_slots():
+                player_table.reset_inputs(slot)
+            if time.monotonic() >= podium_end:
+                # Remise à zéro des joueurs avant retour lobby (changement d'équipe)
+                for slot in player_table.active_slots():
+                    player_table.x[slot] = 200
+                    player_table.y[slot] = 150
+                    player_table.team[slot] = (player_table.team[slot] + 1) % 3
+                    player_table.reset_player(slot)
+                phase = LOBBY
+                continue
 
-            lobby_state_queue.put(display_data)
-
-            # Pause d'affichage 5s
-            time.sleep(5)
-
-
-            game_started.value = False  # revenir en mode lobby
-            running = False  # Pour sortir de la boucle proprement
-            break
-
-        time.sleep(max(0.001, 0.016 - (time.time() - now)))
+        # Dormir jusqu'à la prochaine échéance (pas de simulation, snapshot ou fin de podium)
+        if phase == PLAYING:
+            delay = min(sim_clock.time_to_next(), snapshot_cadence.time_to_next())
+        elif phase == PODIUM:
+            delay = min(snapshot_cadence.interval, podium_end - time.monotonic())
+        else:
+            delay = 0.0
+        time.sleep(max(0.001, delay))
 
+    scorer.shutdown(wait=False)
     print("[Game] Arrêt propre.")
-    sys.exit(0)
\ No newline at end of file
+    sys.exit(0)
@@ -0,0 +1,200 @@
+"""
+Module Snapshot
+Protocole des snapshots entre le processus de jeu et l'affichage : images clés et deltas.
+
+Le jeu fournit l'état des joueurs en colonnes (PlayerColumns, lues dans la table partagée) et non
+en dicts, coûteux à construire, comparer et pickler à chaque publication.
+
+Une image clé ("keyframe") porte tout l'état : données statiques de la manche (obstacles, début,
+durée), joueurs au format display_data ({pseudo: {champ: valeur}}) et projectiles. Les messages
+suivants ("delta") portent :
+- les champs qui changent à presque chaque pas (HOT_FIELDS : position et visée), en un tableau
+  float64 (n, 3) dans l'ordre des joueurs de l'image clé (NaN <=> visée None) ;
+- les champs lents (vie, munitions, mort...) des seuls joueurs dont une valeur diffère de l'image
+  clé, comparés d'un bloc par NumPy (indices des lignes et sous-tableau) ;
+- le tableau compact des projectiles (tous se déplacent à chaque pas).
+
+Un delta ne dépend que de son image clé (champ "base") et pas des deltas précédents : un lecteur
+qui ne voit que la dernière valeur publiée (SnapshotChannel) reconstruit l'état complet, et celui
+qui a manqué l'image clé attend la suivante. Une image clé est envoyée toutes les `keyframe_interval`
+publications, dès que les données statiques changent et dès que les joueurs ou leurs champs
+changent (arrivée d'un joueur, fin de la préparation).
+
+Les messages sans champ "type" (état du lobby, annonce du gagnant) passent tels quels.
+"""
+import numpy as np
+
+from utils.config import GameConfig
+from game_core.mailbox import Mailbox
+
+KEYFRAME = "keyframe"
+DELTA = "delta"
+
+# Champs envoyés en tableau dans chaque delta, dans l'ordre des colonnes de PlayerColumns.hot
+HOT_FIELDS = ("x", "y", "aim_angle")
+# Type Python des champs lents hors float, pour reconstruire les dicts
+_FIELD_TYPES = {"id": np.int64, "team": np.int64, "ammo": np.int64, "dead": np.bool_}
+
+
+def _cold_lists(fields, cold):
+    """Colonnes des champs lents en listes de valeurs Python (int, bool ou float selon le champ)."""
+    return [cold[:, j].astype(_FIELD_TYPES.get(name, np.float64)).tolist() for j, name in enumerate(fields)]
+
+
+class PlayerColumns:
+    """
+    État des joueurs d'un tour, une ligne par joueur. `rows` identifie les joueurs (slots de la table),
+    `hot` (n, 3) porte HOT_FIELDS, `cold` (n, len(fields)) les champs lents `fields` en float64,
+    `names` retourne les pseudos (appelé seulement quand il faut les dicts).
+    """
+
+    def __init__(self, rows, hot, cold, fields, names):
+        self.rows = rows
+        self.hot = hot
+        self.cold = cold
+        self.fields = fields
+        self.names = names
+
+    def __len__(self):
+        return len(self.rows)
+
+    def to_dict(self):
+        """{pseudo: {champ: valeur}} au format display_data."""
+        aims = [a if a == a else None for a in self.hot[:, 2].tolist()]
+        columns = [self.hot[:, 0].tolist(), self.hot[:, 1].tolist(), aims] + _cold_lists(self.fields, self.cold)
+        keys = HOT_FIELDS + self.fields
+        return {pseudo: dict(zip(keys, values)) for pseudo, values in zip(self.names(), zip(*columns))}
+
+
+class SnapshotEncoder:
+    def __init__(self, keyframe_interval):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self._base = None  # PlayerColumns de la dernière image clé
+        self._base_seq = 0
+        self._static = None
+        self._since_keyframe = 0
+
+    def force_keyframe(self):
+        """La prochaine publication sera une image clé (ex: nouveau lecteur)."""
+        self._base = None
+
+    def encode(self, players, projectiles, static):
+        """
+        Message à publier pour l'état courant. `players` : PlayerColumns,
+        `projectiles` : tableau compact, `static` : dict des données fixes de la manche.
+        """
+        self.seq += 1
+        base = self._base
+        if (base is None or static != self._static or self._since_keyframe >= self.keyframe_interval
+                or players.fields != base.fields or not np.array_equal(players.rows, base.rows)):
+            self._base = players
+            self._base_seq = self.seq
+            self._static = static
+            self._since_keyframe = 0
+            return {"type": KEYFRAME, "seq": self.seq, "static": static, "fields": players.fields,
+                    "players": players.to_dict(), "projectiles": projectiles}
+
+        changed = np.flatnonzero((players.cold != base.cold).any(axis=1))
+        self._since_keyframe += 1
+        return {"type": DELTA, "seq": self.seq, "base": self._base_seq, "hot": players.hot,
+                "changed": changed, "cold": players.cold[changed], "projectiles": projectiles}
+
+
+class SnapshotDecoder:
+    def __init__(self):
+        self.base_seq = None  # None : en attente d'une image clé
+        self.static = {}
+        self.base = {}
+        self.fields = ()
+        self.dropped = 0  # deltas ignorés faute d'image clé
+
+    def apply(self, message):
+        """
+        Intègre un message et retourne l'état reconstruit au format display_data
+        (players, projectiles, obstacles, start_time, duration...), ou None si rien à afficher.
+        """
+        kind = message.get("type")
+        if kind not in (KEYFRAME, DELTA):
+            return message
+        if kind == KEYFRAME:
+            self.base_seq = message["seq"]
+            self.static = message["static"]
+            self.fields = message["fields"]
+            self.base = message["players"]
+            players = self.base
+        elif message["base"] != self.base_seq:
+            self.dropped += 1
+            return None
+        else:
+            entries = list(self.base.values())
+            changed = message["changed"].tolist()
+            if changed:
+                for i, values in zip(changed, zip(*_cold_lists(self.fields, message["cold"]))):
+                    entries[i] = {**entries[i], **dict(zip(self.fields, values))}
+            players = {
+                pseudo: {**entry, "x": x, "y": y, "aim_angle": aim if aim == aim else None}
+                for pseudo, entry, (x, y, aim) in zip(self.base, entries, message["hot"].tolist())
+            }
+        state = dict(self.static)
+        state["players"] = players
+        state["projectiles"] = message["projectiles"]
+        return state
+
+
+class SnapshotChannel:
+    """
+    Canal jeu/lobby -> affichage sur deux boîtes « dernière valeur » : la dernière publication
+    (image clé, delta ou message du lobby) et la dernière image clé, conservée pour les deltas suivants.
+    """
+
+    def __init__(self, latest, keyframes):
+        self.latest = latest
+        self.keyframes = keyframes
+
+    @classmethod
+    def create(cls, capacity=GameConfig.MAILBOX_CAPACITY):
+        return cls(Mailbox.create(capacity), Mailbox.create(capacity))
+
+    @classmethod
+    def local(cls, capacity=GameConfig.MAILBOX_CAPACITY):
+        return cls(Mailbox.local(capacity), Mailbox.local(capacity))
+
+    def publish(self, message):
+        """Publie sans jamais bloquer ; l'image clé est déposée avant que des deltas puissent s'y référer."""
+        if message.get("type") == KEYFRAME:
+            self.keyframes.publish(message)
+        self.latest.publish(message)
+
+    def reader(self):
+        return SnapshotReader(self)
+
+    def close(self):
+        self.latest.close()
+        self.keyframes.close()
+
+    def unlink(self):
+        self.latest.unlink()
+        self.keyframes.unlink()
+
+
+class SnapshotReader:
+    """Côté affichage : état le plus récent reconstruit, en O(1) quel que soit le retard pris."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.decoder = SnapshotDecoder()
+        self._keyframe_version = None
+        self._latest_version = None
+
+    def poll(self):
+        """Nouvel état depuis le dernier appel, ou None."""
+        keyframe = self.channel.keyframes.read(self._keyframe_version)
+        if keyframe is not None:
+            self._keyframe_version, message = keyframe
+            self.decoder.apply(message)
+        latest = self.channel.latest.read(self._latest_version)
+        if latest is None:
+            return None
+        self._latest_version, message = latest
+        return self.decoder.apply(message)
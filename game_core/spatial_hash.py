@@ -0,0 +1,89 @@
+"""
+Module SpatialHash
+Broadphase des joueurs : hachage spatial reconstruit à chaque tick à partir des positions.
+
+Seuls les joueurs des cellules voisines (3x3) sont proposés comme candidats ; la taille de
+cellule doit donc être au moins égale à la plus grande distance d'interaction testée
+(2 rayons joueur pour joueur/joueur, rayon projectile + rayon joueur pour projectile/joueur).
+"""
+import numpy as np
+
+from utils.config import PlayerConfig
+
+# Cellules voisines « en avant » : chaque paire de cellules n'est visitée qu'une fois
+_FORWARD = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class SpatialHash:
+    def __init__(self, cell_size=PlayerConfig.BROADPHASE_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, slots, xs, ys):
+        """Range les slots donnés dans leurs cellules (positions lues dans les colonnes xs/ys)."""
+        cs = self.cell_size
+        cells = {}
+        for slot in slots:
+            key = (int(xs[slot] // cs), int(ys[slot] // cs))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [slot]
+            else:
+                bucket.append(slot)
+        self.cells = cells
+        return self
+
+    def pairs(self):
+        """Paires candidates (s1, s2), s1 < s2, triées comme la double boucle qu'elles remplacent."""
+        cells = self.cells
+        found = []
+        for (cx, cy), bucket in cells.items():
+            n = len(bucket)
+            for i in range(n):
+                for j in range(i + 1, n):
+                    a, b = bucket[i], bucket[j]
+                    found.append((a, b) if a < b else (b, a))
+            for ox, oy in _FORWARD:
+                other = cells.get((cx + ox, cy + oy))
+                if other is None:
+                    continue
+                for a in bucket:
+                    for b in other:
+                        found.append((a, b) if a < b else (b, a))
+        found.sort()
+        return found
+
+    def near(self, x, y):
+        """Slots des cellules voisines du point (x, y), triés."""
+        cs = self.cell_size
+        cx, cy = int(x // cs), int(y // cs)
+        cells = self.cells
+        found = []
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                bucket = cells.get((cx + ox, cy + oy))
+                if bucket is not None:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+    def covers(self, xs, ys):
+        """
+        Version vectorisée du test « near() n'est pas vide » : True pour chaque point dont
+        les cellules voisines contiennent au moins un joueur.
+        """
+        result = np.zeros(len(xs), dtype=np.bool_)
+        if not self.cells or len(xs) == 0:
+            return result
+        keys = np.array(list(self.cells.keys()), dtype=np.int64)
+        origin = keys.min(axis=0) - 1
+        shape = keys.max(axis=0) - origin + 2
+        occupied = np.zeros(shape, dtype=np.bool_)
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                occupied[keys[:, 0] - origin[0] + ox, keys[:, 1] - origin[1] + oy] = True
+        cx = np.floor_divide(xs, self.cell_size).astype(np.int64) - origin[0]
+        cy = np.floor_divide(ys, self.cell_size).astype(np.int64) - origin[1]
+        inside = (cx >= 0) & (cx < shape[0]) & (cy >= 0) & (cy < shape[1])
+        result[inside] = occupied[cx[inside], cy[inside]]
+        return result
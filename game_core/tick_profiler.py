@@ -0,0 +1,243 @@
+"""
+Module TickProfiler
+Mesure, étape par étape, du temps passé dans chaque tour de la boucle de jeu, publiée en mémoire partagée.
+
+Le processus de jeu marque la fin de chaque étape (`lap`) ; les durées d'un tour sont cumulées
+(plusieurs pas de rattrapage comptent dans le même tour), puis enregistrées à la fin du tour (`end`) :
+- un histogramme glissant par étape, sur les `window` dernières mesures de cette étape ;
+- les totaux cumulés depuis le début de la session (nombre de mesures, somme des durées) ;
+- le nombre de tours dont la durée totale dépasse le budget d'un pas (1 / SIM_HZ) ;
+- le nombre de joueurs et de projectiles au dernier tour.
+
+Le serveur web lit ces valeurs sans verrou pour /metrics (format texte Prometheus) : une lecture
+peut mêler deux tours consécutifs, ce qui est sans conséquence pour des métriques.
+"""
+from bisect import bisect_left
+from multiprocessing import shared_memory
+from time import perf_counter
+
+import numpy as np
+
+from utils.config import GameConfig
+
+# Étapes mesurées, dans l'ordre de la boucle (l'indice sert de clé à lap)
+STAGES = (
+    "parametres",           # lecture des réglages partagés (proxies du Manager)
+    "respawn",
+    "update_joueur",
+    "collision_joueur",
+    "depenetration",        # joueurs repoussés hors des obstacles
+    "peinture",
+    "gestion_projectiles",
+    "snapshot",             # construction du message (joueurs, projectiles, image clé ou delta)
+    "publish",              # dépôt dans la boîte « dernière valeur »
+)
+(PARAMETRES, RESPAWN, UPDATE_JOUEUR, COLLISION_JOUEUR, DEPENETRATION, PEINTURE,
+ GESTION_PROJECTILES, SNAPSHOT, PUBLISH) = range(len(STAGES))
+# Durée totale du tour, enregistrée comme une étape supplémentaire
+TICK = len(STAGES)
+_SERIES = STAGES + ("tick",)
+
+# Bornes supérieures des classes de l'histogramme, en secondes (dernière classe : au-delà)
+BUCKETS = (50e-6, 100e-6, 250e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3)
+
+# En-tête : tours, dépassements, joueurs, projectiles, budget (float64 x 8)
+_HEADER = 8
+_TICKS, _OVERRUNS, _PLAYERS, _PROJECTILES, _BUDGET = range(5)
+
+
+def _size():
+    series = len(_SERIES)
+    return 8 * (_HEADER + series * (len(BUCKETS) + 1) + 2 * series)
+
+
+class TickProfiler:
+    def __init__(self, window, buffer, shm=None):
+        self.window = window
+        self._shm = shm
+        self._buffer = buffer
+        series = len(_SERIES)
+        offset = 0
+        self._header = np.ndarray((_HEADER,), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += 8 * _HEADER
+        # Histogramme glissant : nombre de mesures de la fenêtre dans chaque classe
+        self._buckets = np.ndarray((series, len(BUCKETS) + 1), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += self._buckets.nbytes
+        self._count = np.ndarray((series,), dtype=np.float64, buffer=buffer, offset=offset)
+        offset += self._count.nbytes
+        self._sum = np.ndarray((series,), dtype=np.float64, buffer=buffer, offset=offset)
+
+        # Côté jeu uniquement : classes des mesures de la fenêtre (pour les retirer de l'histogramme),
+        # et copies des totaux, recopiées d'un bloc en mémoire partagée à la fin de chaque tour
+        self._ring = [[0] * window for _ in _SERIES]
+        self._filled = [0] * len(_SERIES)  # mesures enregistrées depuis start_match
+        self._counts = [0] * len(_SERIES)
+        self._sums = [0.0] * len(_SERIES)
+        self._acc = [0.0] * len(STAGES)
+        self._seen = [False] * len(STAGES)
+        self._start = self._last = 0.0
+
+    @classmethod
+    def create(cls, window=GameConfig.PROFILER_WINDOW):
+        """Alloue les compteurs en mémoire partagée (appelé par le manager)."""
+        shm = shared_memory.SharedMemory(create=True, size=_size())
+        shm.buf[:_size()] = bytes(_size())
+        profiler = cls(window, shm.buf, shm)
+        profiler._header[_BUDGET] = 1.0 / GameConfig.SIM_HZ
+        return profiler
+
+    @classmethod
+    def attach(cls, name, window):
+        """Se rattache aux compteurs existants depuis un processus enfant."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(window, shm.buf, shm)
+
+    @classmethod
+    def local(cls, window=GameConfig.PROFILER_WINDOW):
+        """Compteurs en mémoire privée, même interface (benchmarks, jeu lancé sans manager)."""
+        profiler = cls(window, bytearray(_size()))
+        profiler._header[_BUDGET] = 1.0 / GameConfig.SIM_HZ
+        return profiler
+
+    def __reduce__(self):
+        # Transmis aux processus enfants par son nom de segment
+        if self._shm is None:
+            raise TypeError("Un TickProfiler local ne peut pas être partagé entre processus")
+        return TickProfiler.attach, (self._shm.name, self.window)
+
+    # ------------------------------------------------------
+    # Côté jeu (un seul écrivain)
+    # ------------------------------------------------------
+    def start_match(self):
+        """
+        Appelé par le processus de jeu avant sa première mesure : les totaux cumulés reprennent ceux des
+        manches précédentes (autre processus), l'histogramme glissant repart de zéro.
+        """
+        self._counts = [int(n) for n in self._count]
+        self._sums = [float(n) for n in self._sum]
+        self._ring = [[0] * self.window for _ in _SERIES]
+        self._filled = [0] * len(_SERIES)
+        self._buckets[:] = 0
+
+    def begin(self):
+        """Début d'un tour de boucle."""
+        self._start = self._last = perf_counter()
+
+    def lap(self, stage):
+        """Fin de l'étape `stage` : le temps écoulé depuis la marque précédente lui est attribué."""
+        now = perf_counter()
+        self._acc[stage] += now - self._last
+        self._seen[stage] = True
+        self._last = now
+
+    def end(self, players, projectiles):
+        """Fin du tour : enregistre les étapes exécutées ; sans effet si aucune ne l'a été (tour d'attente)."""
+        if not any(self._seen):
+            return
+        tick = self._last - self._start
+        for stage, seen in enumerate(self._seen):
+            if seen:
+                self._record(stage, self._acc[stage])
+                self._acc[stage] = 0.0
+                self._seen[stage] = False
+        self._record(TICK, tick)
+        self._count[:] = self._counts
+        self._sum[:] = self._sums
+        header = self._header
+        header[_TICKS] += 1
+        if tick > header[_BUDGET]:
+            header[_OVERRUNS] += 1
+        header[_PLAYERS] = players
+        header[_PROJECTILES] = projectiles
+
+    def _record(self, series, seconds):
+        filled = self._filled[series]
+        ring = self._ring[series]
+        pos = filled % self.window
+        bucket = bisect_left(BUCKETS, seconds)
+        if filled >= self.window:
+            # Fenêtre pleine : la mesure la plus ancienne sort de l'histogramme
+            self._buckets[series, ring[pos]] -= 1
+        ring[pos] = bucket
+        self._buckets[series, bucket] += 1
+        self._filled[series] = filled + 1
+        self._counts[series] += 1
+        self._sums[series] += seconds
+
+    # ------------------------------------------------------
+    # Côté lecteurs
+    # ------------------------------------------------------
+    def quantile(self, series, q):
+        """Borne supérieure de la classe contenant le quantile `q` de la fenêtre (inf au-delà de la dernière, None si vide)."""
+        buckets = self._buckets[series]
+        total = buckets.sum()
+        if total == 0:
+            return None
+        index = int(np.searchsorted(np.cumsum(buckets), q * total))
+        return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+
+    def totals(self):
+        """{étape: (mesures, secondes)} cumulés, durée totale du tour comprise ("tick")."""
+        return {name: (int(self._count[i]), float(self._sum[i])) for i, name in enumerate(_SERIES)}
+
+    def metrics_text(self):
+        """Toutes les mesures au format texte d'exposition Prometheus (version 0.0.4)."""
+        header = self._header.copy()
+        buckets = self._buckets.copy()
+        count = self._count.copy()
+        total = self._sum.copy()
+        lines = [
+            "# HELP paintwar_ticks_total Tours de boucle de jeu mesurés.",
+            "# TYPE paintwar_ticks_total counter",
+            f"paintwar_ticks_total {int(header[_TICKS])}",
+            "# HELP paintwar_tick_overruns_total Tours dont la durée dépasse le budget d'un pas.",
+            "# TYPE paintwar_tick_overruns_total counter",
+            f"paintwar_tick_overruns_total {int(header[_OVERRUNS])}",
+            "# HELP paintwar_tick_budget_seconds Budget d'un tour (1 / SIM_HZ).",
+            "# TYPE paintwar_tick_budget_seconds gauge",
+            f"paintwar_tick_budget_seconds {header[_BUDGET]:.6g}",
+            "# HELP paintwar_players Joueurs actifs au dernier tour.",
+            "# TYPE paintwar_players gauge",
+            f"paintwar_players {int(header[_PLAYERS])}",
+            "# HELP paintwar_projectiles Projectiles en vol au dernier tour.",
+            "# TYPE paintwar_projectiles gauge",
+            f"paintwar_projectiles {int(header[_PROJECTILES])}",
+            "# HELP paintwar_stage_seconds_total Temps cumulé passé dans chaque étape.",
+            "# TYPE paintwar_stage_seconds_total counter",
+        ]
+        lines += [f'paintwar_stage_seconds_total{{stage="{name}"}} {total[i]:.9g}' for i, name in enumerate(_SERIES)]
+        lines += [
+            "# HELP paintwar_stage_runs_total Nombre de mesures de chaque étape.",
+            "# TYPE paintwar_stage_runs_total counter",
+        ]
+        lines += [f'paintwar_stage_runs_total{{stage="{name}"}} {int(count[i])}' for i, name in enumerate(_SERIES)]
+        lines += [
+            f"# HELP paintwar_stage_window_seconds Histogramme glissant (cumulatif) des {self.window} dernières mesures de chaque étape.",
+            "# TYPE paintwar_stage_window_seconds gauge",
+        ]
+        for i, name in enumerate(_SERIES):
+            cumulative = np.cumsum(buckets[i])
+            for bound, n in zip(BUCKETS, cumulative):
+                lines.append(f'paintwar_stage_window_seconds{{stage="{name}",le="{bound:g}"}} {int(n)}')
+            lines.append(f'paintwar_stage_window_seconds{{stage="{name}",le="+Inf"}} {int(cumulative[-1])}')
+        lines += [
+            "# HELP paintwar_stage_window_quantile_seconds Quantiles de la fenêtre glissante (borne supérieure de la classe).",
+            "# TYPE paintwar_stage_window_quantile_seconds gauge",
+        ]
+        for i, name in enumerate(_SERIES):
+            for q in (0.5, 0.99):
+                value = self.quantile(i, q)
+                if value is not None:
+                    lines.append(f'paintwar_stage_window_quantile_seconds{{stage="{name}",quantile="{q}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self._shm is not None:
+            # Les vues NumPy doivent être libérées avant de fermer le segment
+            self._header = self._buckets = self._count = self._sum = None
+            self._buffer = None
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
@@ -1,24 +1,49 @@
 import multiprocessing as mp
 import sys
 import time
+from multiprocessing.connection import wait
+from queue import Empty
 
 from network.server_process import webapp_main, get_local_ip
 from network.admin_process import admin_main
 from utils.display_process import display_main
 from game_core.lobby_logic import lobby_logic
-from game_core.real_game import real_game_logic
+from game_core.real_game import game_worker
 from utils.recup_couleur import processus_calcul_couleur
+from game_core.player_table import PlayerTable
+from game_core.paint_buffer import PaintBuffer
+from game_core.snapshot import SnapshotChannel
+from game_core.tick_profiler import TickProfiler
+from utils.channel import BoundedChannel
+from utils.config import GameConfig, share_screen
+from utils.startup import StartupReport, configure_start_method, launch
+
+# Secondes entre deux contrôles des pertes sur les canaux
+CHANNEL_REPORT_INTERVAL = 5.0
+# Secondes laissées aux enfants pour se terminer avant un arrêt forcé
+SHUTDOWN_TIMEOUT = 3.0
 
 def main():
-    mp.set_start_method("spawn")
+    # spawn ou forkserver (GameConfig.START_METHOD, PAINTWAR_START_METHOD)
+    start_method = configure_start_method()
+    # Résolution détectée une seule fois ici, puis héritée des enfants par l'environnement
+    width, height = share_screen()
+    print(f"[Manager] Écran de référence : {width}x{height}")
 
     manager = mp.Manager()
-    connected_players = manager.dict()
-    admin_queue = mp.Queue()
-    manager_queue = mp.Queue()
-    display_queue = mp.Queue()
-    lobby_state_queue = mp.Queue()
-    paint_surface_queue = mp.Queue()
+    manager_ready_at = time.time()
+    # Table des joueurs en mémoire partagée (remplace le dict du Manager)
+    player_table = PlayerTable.create()
+    # Canaux bornés (capacité et politique dans ChannelConfig) : un consommateur lent ne fait pas grossir la mémoire
+    admin_queue = BoundedChannel.from_config("admin")
+    manager_queue = BoundedChannel.from_config("manager")
+    display_queue = BoundedChannel.from_config("display")
+    # État lobby/jeu -> affichage : boîtes « dernière valeur » en mémoire partagée (rien ne s'accumule)
+    state_channel = SnapshotChannel.create()
+    # Grille de peinture en mémoire partagée (peinte par le jeu, lue par l'affichage et le calcul des couleurs)
+    paint_buffer = PaintBuffer.create()
+    # Durées des étapes de la boucle de jeu (écrites par le jeu, exposées par la webapp sur /metrics)
+    profiler = TickProfiler.create()
 
     game_started = manager.Value("b", False)
     prepare_phase = manager.Value("b", False)
@@ -29,8 +54,12 @@ def main():
     friendly_collisions = manager.Value("b", True)
     calc_couleur = manager.Value("b", True)
 
-    to_couleur_queue = mp.Queue()
-    from_couleur_queue = mp.Queue()
+    to_couleur_queue = BoundedChannel.from_config("to_couleur")
+    from_couleur_queue = BoundedChannel.from_config("from_couleur")
+    # Enfants -> manager : « prêt », pour le rapport de démarrage
+    startup_queue = BoundedChannel.from_config("startup")
+    channels = (admin_queue, manager_queue, display_queue, to_couleur_queue, from_couleur_queue, startup_queue)
+    dropped_reported = 0
 
     speed_config = manager.dict({
         "neutre": 8,
@@ -40,104 +69,215 @@ def main():
 
     processes = {
         "webapp": mp.Process(
-            target=webapp_main,
-            args=(connected_players, game_started),
+            target=launch,
+            args=("webapp", startup_queue, webapp_main, player_table, game_started, profiler),
             name="WebApp"
         ),
         "admin": mp.Process(
-            target=admin_main,
-            args=(admin_queue, manager_queue, connected_players, game_started, friendly_collisions, calc_couleur, speed_config, game_duration),
+            target=launch,
+            args=("admin", startup_queue, admin_main, admin_queue, manager_queue, player_table, game_started, friendly_collisions, calc_couleur, speed_config, game_duration),
             name="Admin"
         ),
         "display": mp.Process(
-            target=display_main,
+            target=launch,
             args=(
-                display_queue, lobby_state_queue,
+                "display", startup_queue, display_main,
+                display_queue, state_channel,
                 game_started, get_local_ip(),
                 calc_couleur,
-                to_couleur_queue,
                 from_couleur_queue,
-                paint_surface_queue,
+                paint_buffer,
                 prepare_phase,
                 prepare_start_time
             ),
             name="Display"
         ),
         "lobby": mp.Process(
-            target=lobby_logic,
-            args=(connected_players, lobby_state_queue, game_started),
+            target=launch,
+            args=("lobby", startup_queue, lobby_logic, player_table, state_channel, game_started),
             name="Lobby"
         ),
         "couleurs": mp.Process(
-            target=processus_calcul_couleur,
-            args=(to_couleur_queue, from_couleur_queue, calc_couleur, paint_surface_queue),
+            target=launch,
+            args=("couleurs", startup_queue, processus_calcul_couleur, to_couleur_queue, from_couleur_queue, calc_couleur, paint_buffer),
             name="ProcessCouleur"
         )
     }
 
+    def spawn_standby():
+        """Processus de jeu de réserve : importé et prêt, il attend l'ordre de départ sur le tube retourné."""
+        start_recv, start_send = mp.Pipe(duplex=False)
+        proc = mp.Process(
+            target=launch,
+            args=("standby", startup_queue, game_worker, start_recv, player_table, state_channel,
+                  game_started, friendly_collisions, paint_buffer, game_duration, speed_config, prepare_phase, game_start_time,
+                  profiler),
+            name="RealGame"
+        )
+        proc.start()
+        start_recv.close()
+        return proc, start_send
+
     for proc in processes.values():
         proc.start()
 
     real_game_proc = None
+    next_match = False  # START_GAME reçu, partie à lancer dès qu'aucune n'est en cours
+    # Le prochain processus de jeu démarre pendant le lobby, pas au lancement de la partie
+    standby, standby_start = spawn_standby()
+    prepare_deadline = None  # fin de la phase de préparation (time.time())
+    next_report = time.monotonic() + CHANNEL_REPORT_INTERVAL
     print("[Manager] Tous les processus sont lancés. Ctrl+C pour quitter.")
+    # Depuis `python manager.py` jusqu'à ce que chaque enfant (et le serveur du Manager) soit prêt
+    startup = StartupReport(start_method, ["manager", "standby", *processes])
+    startup.mark("manager", manager_ready_at)
 
     try:
         while True:
+            # Attente passive : commandes admin, messages, fin d'un enfant, ou prochaine échéance
+            watched = {admin_queue.reader: "admin_queue", manager_queue.reader: "manager_queue",
+                       startup_queue.reader: "startup_queue"}
+            for name, proc in processes.items():
+                if proc.exitcode is None:
+                    watched[proc.sentinel] = name
+            if real_game_proc is not None:
+                watched[real_game_proc.sentinel] = "game"
+            if standby is not None:
+                watched[standby.sentinel] = "standby"
+            timeout = next_report - time.monotonic()
+            if prepare_deadline is not None:
+                timeout = min(timeout, prepare_deadline - time.time())
+            ready = {watched[obj] for obj in wait(list(watched), max(0.0, timeout))}
+
             # Phase préparation
-            if prepare_phase.value:
-                if time.time() - prepare_start_time.value >= 6:
-                    print("[Manager] Fin de la phase de préparation.")
-                    prepare_phase.value = False
-                    game_start_time.value = time.time()  # Démarrage officiel de la partie ici
-
-            # Redémarrage lobby si crash après partie
-            if not game_started.value and real_game_proc and not real_game_proc.is_alive():
-                if not processes["lobby"].is_alive():
+            if prepare_deadline is not None and time.time() >= prepare_deadline:
+                print("[Manager] Fin de la phase de préparation.")
+                prepare_deadline = None
+                # Démarrage officiel de la partie ici, publié avant la fin de la préparation : le jeu
+                # compare l'heure à game_start_time dès qu'il voit prepare_phase à False
+                game_start_time.value = time.time()
+                prepare_phase.value = False
+
+            # Fin de partie (normale, arrêt admin ou crash) : retour au lobby
+            if "game" in ready:
+                real_game_proc.join()
+                if real_game_proc.exitcode:
+                    print(f"[Manager] Le processus de jeu s'est arrêté (code {real_game_proc.exitcode}).")
+                real_game_proc = None
+                prepare_deadline = None
+                prepare_phase.value = False
+                game_started.value = False
+                # Sauf si la partie suivante a été programmée pendant le podium
+                if not next_match and not processes["lobby"].is_alive():
                     print("[Manager] Redémarrage du lobby après fin de partie.")
                     processes["lobby"] = mp.Process(
-                        target=lobby_logic,
-                        args=(connected_players, lobby_state_queue, game_started),
+                        target=launch,
+                        args=("lobby", startup_queue, lobby_logic, player_table, state_channel, game_started),
                         name="Lobby"
                     )
                     processes["lobby"].start()
-                    real_game_proc = None
+
+            # Réserve morte avant d'avoir servi : la prochaine partie sera lancée à froid
+            if "standby" in ready:
+                standby.join()
+                print(f"[Manager] Le processus de jeu de réserve s'est arrêté (code {standby.exitcode}).")
+                standby_start.close()
+                standby = standby_start = None
+
+            # Autres enfants : signalés dès leur sortie (le lobby s'arrête normalement au lancement d'une partie)
+            for name in ready - {"game", "standby", "admin_queue", "manager_queue", "startup_queue"}:
+                proc = processes[name]
+                proc.join()
+                if name != "lobby" or proc.exitcode:
+                    print(f"[Manager] Processus {proc.name} terminé (code {proc.exitcode}).")
 
             # Admin triggers
-            if not admin_queue.empty():
-                msg = admin_queue.get()
+            while "admin_queue" in ready:
+                try:
+                    msg = admin_queue.get_nowait()
+                except Empty:
+                    break
                 if msg == "START_GAME":
-                    print("[Manager] Passage immédiat en mode jeu avec phase préparation.")
-                    game_started.value = True
-                    prepare_phase.value = True
-                    prepare_start_time.value = time.time()
-
-                    if processes["lobby"].is_alive():
-                        processes["lobby"].terminate()
-                        processes["lobby"].join()
-
-                    real_game_proc = mp.Process(
-                        target=real_game_logic,
-                        args=(connected_players, lobby_state_queue,
-                              game_started, friendly_collisions, paint_surface_queue, to_couleur_queue, from_couleur_queue, game_duration, speed_config, prepare_phase,game_start_time),
-                        name="RealGame"
-                    )
-                    real_game_proc.start()
+                    if real_game_proc is not None and not game_started.value:
+                        print("[Manager] Partie suivante programmée à la fin du podium.")
+                    next_match = next_match or real_game_proc is None or not game_started.value
+
+            # Lancement d'une partie (immédiat, ou dès la fin du podium de la précédente)
+            if next_match and real_game_proc is None:
+                next_match = False
+                print("[Manager] Passage immédiat en mode jeu avec phase préparation.")
+                game_started.value = True
+                prepare_phase.value = True
+                prepare_start_time.value = time.time()
+                prepare_deadline = prepare_start_time.value + GameConfig.PREPARE_DURATION
+
+                if processes["lobby"].is_alive():
+                    processes["lobby"].terminate()
+                    processes["lobby"].join()
+
+                # La réserve ne reçoit que les paramètres de la manche, puis une nouvelle réserve est lancée
+                if standby is None:
+                    standby, standby_start = spawn_standby()
+                real_game_proc = standby
+                standby_start.send({"duration": game_duration.value})
+                standby_start.close()
+                standby, standby_start = spawn_standby()
 
-            manager_queue.put(("UPDATE_PLAYERS", len(connected_players)))
-            time.sleep(0.5)
+            # Processus prêts : rapport de démarrage dès que tous le sont (les réserves suivantes sont ignorées)
+            while "startup_queue" in ready:
+                try:
+                    name, when = startup_queue.get_nowait()
+                except Empty:
+                    break
+                if not startup.complete and startup.mark(name, when):
+                    print(f"[Manager] {startup}")
+
+            # Messages de l'admin (nombre de joueurs, fermeture de la fenêtre)
+            while "manager_queue" in ready:
+                try:
+                    kind, _ = manager_queue.get_nowait()
+                except Empty:
+                    break
+                if kind == "ADMIN_CLOSED":
+                    print("[Manager] Fenêtre admin fermée.")
+
+            # Signaler les canaux qui perdent des messages (consommateur trop lent ou absent)
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + CHANNEL_REPORT_INTERVAL
+                dropped = sum(channel.stats()["dropped"] for channel in channels)
+                if dropped != dropped_reported:
+                    dropped_reported = dropped
+                    print("[Manager] Canaux :", ", ".join(repr(channel) for channel in channels if channel.stats()["dropped"]))
 
     except KeyboardInterrupt:
         print("[Manager] Arrêt demandé. Fermeture...")
 
-        for name, proc in processes.items():
-            if proc.is_alive():
+        # Le processus couleurs s'arrête sur None (il ferme son pool de threads), les autres sur SIGTERM
+        to_couleur_queue.put(None)
+        children = list(processes.values()) + [proc for proc in (real_game_proc, standby) if proc]
+        for proc in children:
+            if proc.is_alive() and proc is not processes["couleurs"]:
                 proc.terminate()
+        # Un enfant qui ignore SIGTERM ne doit pas bloquer la fermeture
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for proc in children:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                print(f"[Manager] {proc.name} ne répond pas, arrêt forcé.")
+                proc.kill()
                 proc.join()
 
-        if real_game_proc and real_game_proc.is_alive():
-            real_game_proc.terminate()
-            real_game_proc.join()
+        for channel in channels:
+            print(f"[Manager] {channel!r}")
 
+        player_table.close()
+        player_table.unlink()
+        paint_buffer.close()
+        paint_buffer.unlink()
+        state_channel.close()
+        state_channel.unlink()
+        profiler.close()
+        profiler.unlink()
         print("[Manager] Fermeture propre.")
         sys.exit(0)
 
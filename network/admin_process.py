@@ -3,6 +3,8 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
 import sys
 
+from utils import startup
+
 ROW_HEIGHT = 40
 BTN_WIDTH = 60
 BTN_HEIGHT = 30
@@ -39,7 +41,7 @@ class Slider:
             self.value = int(self.min_val + ratio * (self.max_val - self.min_val))
 
 
-def admin_main(admin_queue, manager_queue, connected_players, game_started,
+def admin_main(admin_queue, manager_queue, player_table, game_started,
                friendly_collisions, calc_couleur, speed_config,game_duration):
     
     WINDOW_HEIGHT = 600
@@ -67,6 +69,8 @@ def admin_main(admin_queue, manager_queue, connected_players, game_started,
 
     running = True
     scroll_offset = 0  # Ajout pour scroller la liste
+    nb_joueurs_envoye = None  # dernier nombre de joueurs transmis au manager
+    startup.ready()
 
     try:
         while running:
@@ -81,7 +85,7 @@ def admin_main(admin_queue, manager_queue, connected_players, game_started,
                     scroll_offset = max(0, scroll_offset)
 
                     # Calcul du scroll max pour ne pas remonter au-dessus du bouton "Lancer le jeu"
-                    nb_joueurs = len(connected_players)
+                    nb_joueurs = player_table.count()
                     total_height = nb_joueurs * ROW_HEIGHT
                     visible_height = WINDOW_HEIGHT - SCROLL_START  # Hauteur visible pour la liste (400 = point de départ)
                     max_scroll = max(0, total_height - visible_height)
@@ -117,17 +121,13 @@ def admin_main(admin_queue, manager_queue, connected_players, game_started,
 
                     # Changement d'équipe
                     else:
-                        for i, (pseudo, d) in enumerate(connected_players.items()):
+                        for i, slot in enumerate(player_table.active_slots()):
                             row_y = i * ROW_HEIGHT + SCROLL_START - scroll_offset
                             if row_y >= SCROLL_START:
                                 for j in range(3):
                                     btn_rect = pygame.Rect(200 + j*70, row_y, BTN_WIDTH, BTN_HEIGHT)
                                     if btn_rect.collidepoint(mouse_pos):
-                                        p = d["player"]
-
-                                        p["team"] = j
-                                        d["player"] = p
-                                        connected_players[pseudo] = d
+                                        player_table.team[slot] = j
 
 
             # Affichage
@@ -169,23 +169,23 @@ def admin_main(admin_queue, manager_queue, connected_players, game_started,
             screen.blit(label_col, (BTN_COLLISION_RECT.x+10, BTN_COLLISION_RECT.y+10))
 
             # Info nombre de joueurs et joueurs par équipe 
+            slots = player_table.active_slots()
             team_counts = {0: 0, 1: 0, 2: 0}
-            for d in connected_players.values():
-                p = d["player"]
-                team = p.get("team", 0)
+            for slot in slots:
+                team = int(player_table.team[slot])
                 if team in team_counts:
                     team_counts[team] += 1
 
-            info_text = f"{len(connected_players)} joueurs connectés | T0= {team_counts[0]} | T1= {team_counts[1]} | T2= {team_counts[2]}"
+            info_text = f"{len(slots)} joueurs connectés | T0= {team_counts[0]} | T1= {team_counts[1]} | T2= {team_counts[2]}"
             txt_surf = font.render(info_text, True, (255,255,255))
             screen.blit(txt_surf, (20, 220))
 
             # Liste joueurs + boutons de changement d'équipe
-            for i, (pseudo, d) in enumerate(connected_players.items()):
+            for i, slot in enumerate(slots):
                 row_y = i*ROW_HEIGHT + SCROLL_START - scroll_offset
                 if row_y >= SCROLL_START:  # Ne dessine le joueur que s'il est sous les boutons
-                    p = d["player"]
-                    team = p["team"]
+                    pseudo = player_table.pseudo_of(slot)
+                    team = int(player_table.team[slot])
                     txt_surf = font.render(f"{pseudo} (team={team})", True, (255,255,255))
                     screen.blit(txt_surf, (20, row_y))
 
@@ -197,8 +197,10 @@ def admin_main(admin_queue, manager_queue, connected_players, game_started,
                         label = font.render(labels[j], True, (255,255,255))
                         screen.blit(label, (btn_rect.x+15, btn_rect.y+5))
 
-            # Envoie du nombre de joueurs au manager
-            manager_queue.put(("UPDATE_PLAYERS", len(connected_players)))
+            # Envoie du nombre de joueurs au manager, seulement quand il change
+            if len(slots) != nb_joueurs_envoye:
+                nb_joueurs_envoye = len(slots)
+                manager_queue.put(("UPDATE_PLAYERS", nb_joueurs_envoye))
 
             pygame.display.flip()
             clock.tick(30)
@@ -0,0 +1,69 @@
+"""
+Protocole binaire des manettes (WebSocket)
+
+Trame de taille fixe, little-endian, négociée par le message JSON "HELLO" :
+
+    offset  type    champ
+    0       uint8   version (PROTOCOL_VERSION)
+    1       uint8   drapeaux (FLAG_MOVE | FLAG_AIM | FLAG_SHOOT)
+    2       int16   dx       quantifié sur [-1, 1]
+    4       int16   dy       quantifié sur [-1, 1]
+    6       int16   aim_dx   quantifié sur [-1, 1] (vecteur normalisé par le rayon du joystick)
+    8       int16   aim_dy   quantifié sur [-1, 1]
+    10      int16   angle    quantifié sur [-pi, pi]
+
+Une trame peut porter plusieurs commandes à la fois (ex: déplacement + visée).
+Les commandes JSON historiques restent acceptées pour les clients qui ne négocient pas.
+"""
+import math
+import struct
+
+from game_core.input_ring import INPUT_MOVE, INPUT_AIM, INPUT_SHOOT
+
+PROTOCOL_VERSION = 1
+
+FLAG_MOVE = 0x01
+FLAG_AIM = 0x02
+FLAG_SHOOT = 0x04
+
+FRAME = struct.Struct("<BBhhhhh")
+
+_Q = 32767
+_ANGLE_SCALE = math.pi / _Q
+
+
+class ProtocolError(ValueError):
+    """Trame binaire invalide (taille ou version inconnue)."""
+
+
+def _quantize(value, scale=1.0):
+    return max(-_Q, min(_Q, int(round(value / scale * _Q))))
+
+
+def encode_frame(flags, dx=0.0, dy=0.0, aim_dx=0.0, aim_dy=0.0, angle=0.0):
+    """Construit une trame (utilisé par les outils de test et de charge, le client JS a son propre encodeur)."""
+    return FRAME.pack(PROTOCOL_VERSION, flags, _quantize(dx), _quantize(dy),
+                      _quantize(aim_dx), _quantize(aim_dy), _quantize(angle, math.pi))
+
+
+def decode_frame(data):
+    """
+    Décode une trame en enregistrements d'entrée pour InputRings.push.
+
+    Returns:
+        list: tuples (cmd, a, b) dans l'ordre déplacement, visée, tir
+    """
+    if len(data) != FRAME.size:
+        raise ProtocolError(f"Taille de trame invalide: {len(data)}")
+    version, flags, dx, dy, aim_dx, aim_dy, angle = FRAME.unpack(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Version de protocole inconnue: {version}")
+
+    records = []
+    if flags & FLAG_MOVE:
+        records.append((INPUT_MOVE, dx / _Q, dy / _Q))
+    if flags & FLAG_AIM:
+        records.append((INPUT_AIM, aim_dx / _Q, aim_dy / _Q))
+    if flags & FLAG_SHOOT:
+        records.append((INPUT_SHOOT, angle * _ANGLE_SCALE, 0.0))
+    return records
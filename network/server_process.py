@@ -1,14 +1,21 @@
 import asyncio
 import json
 import os
+from collections import deque
 from pathlib import Path
 import socket
 from aiohttp import web
-from game_core.player import Player
 from game_core.lobby_logic import assign_team
+from game_core.input_ring import INPUT_MOVE, INPUT_AIM, INPUT_SHOOT
+from network.protocol import PROTOCOL_VERSION, ProtocolError, decode_frame
+from utils import startup
 
 routes = web.RouteTableDef()
 
+# Retard de la boucle asyncio : échantillonné toutes les LOOP_LAG_INTERVAL s, LOOP_LAG_SAMPLES gardés (10 s)
+LOOP_LAG_INTERVAL = 0.1
+LOOP_LAG_SAMPLES = 100
+
 @routes.get('/')
 async def handle_telecommande(request):
     BASE_DIR = Path(__file__).parent
@@ -22,12 +29,17 @@ async def ws_handler(request):
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
-    connected_players = request.app["connected_players"]
+    player_table = request.app["player_table"]
     game_started = request.app["game_started"]
+    ws_stats = request.app["ws_stats"]
+    inputs = player_table.inputs
     pseudo = None
+    slot = -1
 
+    ws_stats["connections"] += 1
     try:
         async for msg in ws:
+            ws_stats["messages"] += 1
             if msg.type == web.WSMsgType.TEXT:
                 try:
                     data = json.loads(msg.data)
@@ -35,54 +47,53 @@ async def ws_handler(request):
                     cmd = data.get("command")
 
                     # Init le joueur si pas existant
-                    if pseudo not in connected_players:
-                        new_id = len(connected_players) + 1
+                    slot = player_table.slot_of(pseudo)
+                    if slot < 0:
                         # Choix de l'équipe
-                        team = assign_team(connected_players)
-                        p = Player(pseudo=pseudo, team=team)
-                        connected_players[pseudo] = {
-                            "id":     new_id,
-                            "player": p.to_dict(),
-                            "inputs": {
-                                "dx": 0.0, "dy": 0.0,
-                                "aim_dx":0.0, "aim_dy":0.0,
-                                "shoot_angle": None
-                            }
-                        }
-                        pid = connected_players[pseudo]["id"]
+                        team = assign_team(player_table)
+                        slot = player_table.register(pseudo, team)
+                        if slot < 0:
+                            print("[Server] Table des joueurs pleine, connexion ignorée:", pseudo)
+                            continue
+                        pid = int(player_table.id[slot])
                         # On informe le client
                         await ws.send_json({"type": "assign_id", "player_id": pid})
 
-                    entry = connected_players[pseudo]
-                    p_data = entry["player"]
-                    inputs = entry["inputs"]
+                    # Négociation du protocole binaire
+                    if cmd == "HELLO":
+                        if PROTOCOL_VERSION in data.get("protocols", []):
+                            await ws.send_json({"type": "protocol", "version": PROTOCOL_VERSION})
 
-                    if cmd == "MOVE_VECTOR":
-                        inputs["dx"] = float(data.get("dx", 0))
-                        inputs["dy"] = float(data.get("dy", 0))
+                    # Ajout dans la file d'entrées du joueur (aucun appel bloquant)
+                    elif cmd == "MOVE_VECTOR":
+                        inputs.push(slot, INPUT_MOVE, float(data.get("dx", 0)), float(data.get("dy", 0)))
 
                     elif cmd == "AIM_VECTOR":
-                        inputs["aim_dx"] = float(data.get("dx", 0))
-                        inputs["aim_dy"] = float(data.get("dy", 0))
+                        inputs.push(slot, INPUT_AIM, float(data.get("dx", 0)), float(data.get("dy", 0)))
 
                     elif cmd == "SHOOT_ANGLE":
                         angle = float(data.get("angle", 0))
-                        inputs["shoot_angle"] = angle
-
-                    # Retrieve existing entry so we keep "id"
-                    entry = connected_players[pseudo]
-                    entry["player"] = p_data
-                    entry["inputs"] = inputs
-                    connected_players[pseudo] = entry
+                        inputs.push(slot, INPUT_SHOOT, angle)
 
 
                 except json.JSONDecodeError:
                     print("[Server] Erreur JSON:", msg.data)
 
+            elif msg.type == web.WSMsgType.BINARY:
+                # Trames binaires acceptées une fois le joueur identifié par HELLO
+                if slot < 0:
+                    continue
+                try:
+                    for cmd, a, b in decode_frame(msg.data):
+                        inputs.push(slot, cmd, a, b)
+                except ProtocolError as e:
+                    print("[Server] Trame binaire rejetée:", e)
+
             elif msg.type == web.WSMsgType.ERROR:
                 print("[Server] WebSocket fermé avec erreur:", ws.exception())
 
     finally:
+        ws_stats["connections"] -= 1
         return ws
 
 @routes.get('/status')
@@ -90,6 +101,50 @@ async def handle_status(request):
     game_started = request.app["game_started"]
     return web.json_response({"game_started": game_started.value})
 
+@routes.get('/metrics')
+async def handle_metrics(request):
+    # Métriques de la webapp et durées des étapes de la boucle de jeu, format texte Prometheus
+    text = webapp_metrics_text(request.app)
+    profiler = request.app["profiler"]
+    if profiler is not None:
+        text += profiler.metrics_text()
+    return web.Response(body=text.encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+def webapp_metrics_text(app):
+    """Connexions et messages WebSocket, retard de la boucle asyncio sur les 10 dernières secondes."""
+    ws_stats = app["ws_stats"]
+    lines = [
+        "# HELP paintwar_ws_connections Manettes connectées.",
+        "# TYPE paintwar_ws_connections gauge",
+        f"paintwar_ws_connections {ws_stats['connections']}",
+        "# HELP paintwar_ws_messages_total Messages WebSocket reçus.",
+        "# TYPE paintwar_ws_messages_total counter",
+        f"paintwar_ws_messages_total {ws_stats['messages']}",
+        "# HELP paintwar_webapp_loop_lag_seconds Retard de réveil de la boucle asyncio de la webapp.",
+        "# TYPE paintwar_webapp_loop_lag_seconds gauge",
+    ]
+    samples = sorted(app["loop_lag"])
+    if samples:
+        for q in (0.5, 0.99, 1.0):
+            value = samples[min(len(samples) - 1, int(q * len(samples)))]
+            lines.append(f'paintwar_webapp_loop_lag_seconds{{quantile="{q}"}} {value:.6g}')
+    return "\n".join(lines) + "\n"
+
+async def monitor_loop_lag(app):
+    """Mesure le retard de réveil de la boucle : un handler lent ou une rafale de messages le fait grimper."""
+    loop = asyncio.get_running_loop()
+    samples = app["loop_lag"]
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - start - LOOP_LAG_INTERVAL))
+
+async def loop_lag_ctx(app):
+    task = asyncio.create_task(monitor_loop_lag(app))
+    yield
+    task.cancel()
+
 def get_local_ip():
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
@@ -101,30 +156,42 @@ def get_local_ip():
         s.close()
     return ip
 
-async def init_app(connected_players, game_started):
+async def init_app(player_table, game_started, profiler=None):
     app = web.Application()
-    app["connected_players"] = connected_players
+    app["player_table"] = player_table
     app["game_started"] = game_started
+    app["profiler"] = profiler
+    app["ws_stats"] = {"connections": 0, "messages": 0}
+    app["loop_lag"] = deque(maxlen=LOOP_LAG_SAMPLES)
+    app.cleanup_ctx.append(loop_lag_ctx)
     app.add_routes(routes)
     STATIC_DIR = Path(__file__).parent / "static" 
     app.router.add_static('/static/', path=STATIC_DIR, name='static')
     
     return app
 
-async def run_webapp(connected_players, game_started):
-    app = await init_app(connected_players, game_started)
+async def run_webapp(player_table, game_started, profiler=None, host=None, port=8081):
+    app = await init_app(player_table, game_started, profiler)
     runner = web.AppRunner(app)
     await runner.setup()
-    server_ip = get_local_ip()
-    site = web.TCPSite(runner, server_ip, 8081)
+    # Adresse du réseau local par défaut (QR code des manettes) ; 127.0.0.1 pour les tests de charge
+    server_ip = host or get_local_ip()
+    site = web.TCPSite(runner, server_ip, port)
     await site.start()
-    print(f"[WebApp] Démarré sur http://{server_ip}:8081")
-    while True:
-        try:
+    print(f"[WebApp] Démarré sur http://{server_ip}:{port}")
+    startup.ready()
+    try:
+        while True:
             await asyncio.sleep(3600)
-        except asyncio.CancelledError:
-            print("[WebApp] Fermeture propre.")
+    except asyncio.CancelledError:
+        # Ne pas reboucler : sans cela le processus ne se termine jamais et le manager reste bloqué sur join()
+        print("[WebApp] Fermeture propre.")
+    finally:
+        await runner.cleanup()
 
 
-def webapp_main(connected_players, game_started):
-    asyncio.run(run_webapp(connected_players, game_started))
+def webapp_main(player_table, game_started, profiler=None, host=None, port=8081):
+    try:
+        asyncio.run(run_webapp(player_table, game_started, profiler, host, port))
+    except KeyboardInterrupt:
+        pass
@@ -8,11 +8,45 @@ let host = window.location.hostname;
 let wsUrl = "ws://" + host + ":8081/ws";
 let ws = new WebSocket(wsUrl);
 
-ws.onopen = () => console.log("WebSocket connecté!");
+// -- Protocole binaire (voir network/protocol.py) --
+// Trame de 12 octets little-endian : version, drapeaux, dx, dy, aim_dx, aim_dy, angle (int16 quantifiés)
+const PROTOCOL_VERSION = 1;
+const FLAG_MOVE = 0x01;
+const FLAG_AIM = 0x02;
+const FLAG_SHOOT = 0x04;
+const Q = 32767;
+let useBinary = false; // passe à true quand le serveur accepte le protocole
+const frame = new DataView(new ArrayBuffer(12));
+
+function quantize(v) {
+  return Math.max(-Q, Math.min(Q, Math.round(v * Q)));
+}
+
+function sendFrame(flags, dx, dy, aimDx, aimDy, angle) {
+  frame.setUint8(0, PROTOCOL_VERSION);
+  frame.setUint8(1, flags);
+  frame.setInt16(2, quantize(dx), true);
+  frame.setInt16(4, quantize(dy), true);
+  frame.setInt16(6, quantize(aimDx), true);
+  frame.setInt16(8, quantize(aimDy), true);
+  frame.setInt16(10, quantize(angle / Math.PI), true);
+  ws.send(frame.buffer);
+}
+
+ws.binaryType = "arraybuffer";
+
+ws.onopen = () => {
+  console.log("WebSocket connecté!");
+  // Identification + négociation ; sans réponse, on reste en JSON
+  ws.send(JSON.stringify({ pseudo, command: "HELLO", protocols: [PROTOCOL_VERSION] }));
+};
 
 ws.onmessage = e => {
   const data = JSON.parse(e.data);
   console.log("Reçu :", data);
+  if (data.type === "protocol" && data.version === PROTOCOL_VERSION) {
+    useBinary = true;
+  }
   if (data.type === "assign_id" && data.player_id) {
     document.getElementById("pPseudo")
         .textContent = `Bonjour Player ${data.player_id}`;
@@ -81,6 +115,10 @@ function pointerUpMove(e) {
 // Envoi périodique du vecteur move
 function sendMoveVector() {
   if (ws && ws.readyState === WebSocket.OPEN) {
+    if (useBinary) {
+      sendFrame(FLAG_MOVE, moveVector.x, moveVector.y, 0, 0, 0);
+      return;
+    }
     let msg = {
       pseudo,
       command: "MOVE_VECTOR",
@@ -131,6 +169,11 @@ function pointerMoveAim(e) {
 
   // On envoie AIM_VECTOR en continu pour que le serveur calcule aim_angle
   if (ws && ws.readyState === WebSocket.OPEN) {
+    if (useBinary) {
+      // Vecteur normalisé par le rayon du joystick pour tenir dans [-1, 1]
+      sendFrame(FLAG_AIM, 0, 0, dx / r, dy / r, 0);
+      return;
+    }
     let msg = {
       pseudo,
       command: "AIM_VECTOR",
@@ -151,12 +194,16 @@ function pointerUpAim(e) {
   if (dist > 20) {
     let angle = Math.atan2(dy, dx);
     if (ws && ws.readyState === WebSocket.OPEN) {
-      let msg = {
-        pseudo,
-        command: "SHOOT_ANGLE",
-        angle: angle
-      };
-      ws.send(JSON.stringify(msg));
+      if (useBinary) {
+        sendFrame(FLAG_SHOOT, 0, 0, 0, 0, angle);
+      } else {
+        let msg = {
+          pseudo,
+          command: "SHOOT_ANGLE",
+          angle: angle
+        };
+        ws.send(JSON.stringify(msg));
+      }
     }
   }
   // reset
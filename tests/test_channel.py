@@ -0,0 +1,54 @@
+"""
+Canaux IPC bornés : politique appliquée quand la file est pleine et compteurs.
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import time
+from queue import Empty
+
+from utils.channel import BLOCK, DROP_NEWEST, DROP_OLDEST, BoundedChannel
+
+
+def drain(channel):
+    """Vide le canal ; le délai laisse au thread d'écriture de mp.Queue le temps de remplir le tube."""
+    items = []
+    while True:
+        try:
+            items.append(channel.get(timeout=0.5))
+        except Empty:
+            return items
+
+
+def fill(channel, count):
+    """Envoie 0..count-1 et retourne les valeurs de retour de put."""
+    return [channel.put(i) for i in range(count)]
+
+
+def test_drop_oldest_keeps_latest_messages():
+    channel = BoundedChannel("test", 2, DROP_OLDEST)
+    assert fill(channel, 4) == [True, True, False, False]
+    assert channel.stats() == {"enqueued": 4, "dropped": 2, "depth": 2}
+    assert drain(channel) == [2, 3]
+    assert channel.stats()["depth"] == 0
+
+
+def test_drop_newest_keeps_first_messages():
+    channel = BoundedChannel("test", 2, DROP_NEWEST)
+    assert fill(channel, 4) == [True, True, False, False]
+    assert channel.stats() == {"enqueued": 2, "dropped": 2, "depth": 2}
+    assert drain(channel) == [0, 1]
+
+
+def test_block_waits_then_counts_timeout_as_lost():
+    channel = BoundedChannel("test", 1, BLOCK, timeout=0.2)
+    assert channel.put("a")
+    start = time.monotonic()
+    assert not channel.put("b")
+    assert time.monotonic() - start >= 0.2
+    assert channel.stats() == {"enqueued": 1, "dropped": 1, "depth": 1}
+    assert drain(channel) == ["a"]
+    assert channel.put("c")
+    assert channel.get(timeout=1) == "c"
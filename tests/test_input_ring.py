@@ -0,0 +1,41 @@
+"""
+Files d'entrées SPSC des manettes : retour au début du tampon et pertes quand la file est pleine.
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from game_core.input_ring import INPUT_AIM, INPUT_MOVE, RING_SIZE, InputRings
+
+
+def test_drain_wraps_around_the_ring():
+    """Indices au-delà de RING_SIZE : le lot retiré est remis dans l'ordre d'arrivée."""
+    rings = InputRings.local(capacity=2)
+    for i in range(RING_SIZE - 3):
+        assert rings.push(1, INPUT_MOVE, float(i), t=float(i))
+    assert len(rings.drain(1)) == RING_SIZE - 3
+
+    for i in range(10):
+        assert rings.push(1, INPUT_AIM, float(i), -float(i), t=100.0 + i)
+    batch = rings.drain(1)
+    assert batch == [(100.0 + i, float(i), -float(i), INPUT_AIM) for i in range(10)]
+    assert int(rings.head[1]) == RING_SIZE + 7
+    assert rings.drain(1) == []
+    assert rings.drain(0) == []
+
+
+def test_full_ring_drops_and_counts():
+    rings = InputRings.local(capacity=2)
+    for i in range(RING_SIZE):
+        assert rings.push(0, INPUT_MOVE, float(i), t=float(i))
+    assert not rings.push(0, INPUT_MOVE, -1.0)
+    assert not rings.push(0, INPUT_MOVE, -2.0)
+    assert int(rings.dropped[0]) == 2
+    assert int(rings.dropped[1]) == 0
+
+    # Les enregistrements perdus sont les nouveaux : la file garde les RING_SIZE premiers
+    assert [a for _, a, _, _ in rings.drain(0)] == [float(i) for i in range(RING_SIZE)]
+    assert rings.push(0, INPUT_MOVE, 1.0)
+    assert int(rings.dropped[0]) == 2
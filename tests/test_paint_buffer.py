@@ -0,0 +1,46 @@
+"""
+Compteurs de cellules par équipe tenus par paint_trails, comparés au recomptage complet de la grille.
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from game_core.paint_buffer import UNPAINTED, PaintBuffer
+
+
+def test_trail_counts_match_rescan():
+    paint = PaintBuffer.local(200, 100, cell_size=4)
+    # Deux traces disjointes, une par équipe
+    paint.paint_trails([20, 20], [20, 80], [100, 100], [20, 80], [0, 1], radius=6)
+    assert paint.counts[1] > 0 and paint.counts[1] == paint.counts[2]
+    assert np.array_equal(paint.counts, paint.rescan())
+    assert paint.counts.sum() == paint.owners.size
+
+
+def test_repainting_moves_cells_between_teams():
+    """Une équipe repeint la trace de l'autre : les cellules passent d'un compteur à l'autre, sans double comptage."""
+    paint = PaintBuffer.local(200, 100, cell_size=4)
+    paint.paint_trails([20], [50], [150], [50], [0], radius=6)
+    painted = int(paint.counts[1])
+    generation = paint.generation
+
+    # Même trace par l'équipe 2, et un même tampon couvert deux fois dans un seul appel
+    paint.paint_trails([20, 150], [50, 50], [150, 150], [50, 50], [2, 2], radius=6)
+    assert paint.counts[1] == 0
+    assert paint.counts[3] == painted
+    assert paint.counts[UNPAINTED] == paint.owners.size - painted
+    assert np.array_equal(paint.counts, paint.rescan())
+    assert paint.generation > generation
+    assert paint.live_coverage([0, 2]) == {0: 0.0, 2: painted / paint.owners.size}
+
+
+def test_trail_off_grid_is_clipped():
+    paint = PaintBuffer.local(200, 100, cell_size=4)
+    paint.paint_trails([-50], [-50], [-10], [-10], [1], radius=6)
+    assert paint.counts[UNPAINTED] == paint.owners.size
+    paint.paint_trails([190], [95], [260], [95], [1], radius=6)
+    assert 0 < paint.counts[2] == paint.rescan()[2]
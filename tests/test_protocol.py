@@ -0,0 +1,40 @@
+"""
+Trames binaires des manettes : décodage et rejet des trames invalides.
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import math
+
+import pytest
+
+from game_core.input_ring import INPUT_AIM, INPUT_MOVE, INPUT_SHOOT
+from network.protocol import (FLAG_AIM, FLAG_MOVE, FLAG_SHOOT, FRAME, PROTOCOL_VERSION, ProtocolError,
+                              decode_frame, encode_frame)
+
+
+def test_frame_round_trip_in_move_aim_shoot_order():
+    frame = encode_frame(FLAG_SHOOT | FLAG_AIM | FLAG_MOVE, 0.5, -1.0, 0.25, 0.75, math.pi / 2)
+    (move, aim, shoot) = decode_frame(frame)
+    assert move[0] == INPUT_MOVE and move[1:] == pytest.approx((0.5, -1.0), abs=1e-4)
+    assert aim[0] == INPUT_AIM and aim[1:] == pytest.approx((0.25, 0.75), abs=1e-4)
+    assert shoot[0] == INPUT_SHOOT and shoot[1] == pytest.approx(math.pi / 2, abs=1e-3)
+
+
+def test_frame_without_flags_carries_no_record():
+    assert decode_frame(encode_frame(0, 1.0, 1.0)) == []
+
+
+@pytest.mark.parametrize("data", [b"", b"\x01", encode_frame(FLAG_MOVE)[:-1], encode_frame(FLAG_MOVE) + b"\x00"])
+def test_wrong_length_is_rejected(data):
+    with pytest.raises(ProtocolError):
+        decode_frame(data)
+
+
+def test_unknown_version_is_rejected():
+    frame = FRAME.pack(PROTOCOL_VERSION + 1, FLAG_MOVE, 0, 0, 0, 0, 0)
+    with pytest.raises(ProtocolError):
+        decode_frame(frame)
+
@@ -0,0 +1,62 @@
+"""
+Images clés et deltas des snapshots : état reconstruit par le décodeur à partir d'une PlayerTable.
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from game_core.player_table import PlayerTable
+from game_core.real_game import colonnes_joueurs, snapshot_joueurs
+from game_core.snapshot import DELTA, KEYFRAME, SnapshotDecoder, SnapshotEncoder
+
+STATIC = {"obstacles": [], "start_time": 0.0, "duration": 180}
+
+
+def small_table():
+    table = PlayerTable.local(capacity=4)
+    for i in range(3):
+        slot = table.register(f"Player{i}", i % 2)
+        table.health[slot] = 100
+    return table
+
+
+def test_delta_after_keyframe_rebuilds_full_state():
+    """Tout le monde bouge, un seul joueur change de munitions : seul lui est dans `changed`."""
+    table = small_table()
+    encoder, decoder = SnapshotEncoder(keyframe_interval=20), SnapshotDecoder()
+    keyframe = encoder.encode(colonnes_joueurs(table), np.zeros((0, 3), dtype=np.float32), STATIC)
+    assert keyframe["type"] == KEYFRAME
+    decoder.apply(keyframe)
+
+    table.x += 5.0
+    table.aim_angle[2] = 1.5
+    table.ammo[1] -= 1
+    projectiles = np.ones((2, 3), dtype=np.float32)
+    delta = encoder.encode(colonnes_joueurs(table), projectiles, STATIC)
+    assert delta["type"] == DELTA and delta["base"] == keyframe["seq"]
+    assert delta["changed"].tolist() == [1]
+
+    state = decoder.apply(delta)
+    assert state["players"] == snapshot_joueurs(table)
+    assert state["players"]["Player2"]["aim_angle"] == 1.5
+    assert state["players"]["Player0"]["aim_angle"] is None
+    assert state["projectiles"] is projectiles
+    assert state["duration"] == 180
+
+
+def test_delta_without_its_keyframe_is_dropped():
+    table = small_table()
+    encoder = SnapshotEncoder(keyframe_interval=20)
+    encoder.encode(colonnes_joueurs(table), np.zeros((0, 3)), STATIC)
+    delta = encoder.encode(colonnes_joueurs(table), np.zeros((0, 3)), STATIC)
+
+    decoder = SnapshotDecoder()
+    assert decoder.apply(delta) is None
+    assert decoder.dropped == 1
+    # Les messages du lobby n'ont pas de type et passent tels quels
+    lobby = {"lobby": True, "players": {}}
+    assert decoder.apply(lobby) is lobby
@@ -0,0 +1,90 @@
+"""
+Snapshots publiés près de la capacité de la boîte « dernière valeur ».
+
+Lancement (depuis la racine du dépôt) :
+    SDL_VIDEODRIVER=dummy python -m pytest -q tests
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import math
+import pickle
+
+import pytest
+
+from utils.config import GameConfig
+from game_core.mailbox import Mailbox
+from game_core.player_table import PSEUDO_BYTES, PlayerTable
+from game_core.projectiles import ProjectilePool
+from game_core.real_game import colonnes_joueurs, creer_obstacles
+from game_core.snapshot import SnapshotChannel, SnapshotEncoder
+
+
+def payload_of_size(size):
+    """Objet dont la version picklée fait exactement `size` octets."""
+    overhead = len(pickle.dumps(b"", protocol=pickle.HIGHEST_PROTOCOL))
+    for extra in range(16):
+        data = b"x" * (size - overhead - extra)
+        if len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)) == size:
+            return data
+    raise AssertionError(size)
+
+
+def test_mailbox_accepts_message_of_exact_capacity():
+    box = Mailbox.local(capacity=4096)
+    data = payload_of_size(4096)
+    box.publish(data)
+    assert box.read() == (1, data)
+
+
+def test_mailbox_rejects_oversized_message_and_keeps_previous():
+    box = Mailbox.local(capacity=4096)
+    box.publish("avant")
+    with pytest.raises(ValueError):
+        box.publish(payload_of_size(4097))
+    assert box.read() == (1, "avant")
+
+
+def full_match(projectiles):
+    """Table pleine (pseudos de taille maximale), `projectiles` en vol et obstacles de la manche."""
+    table = PlayerTable.local(capacity=GameConfig.MAX_PLAYERS)
+    for i in range(GameConfig.MAX_PLAYERS):
+        table.register(f"{i:03d}".ljust(PSEUDO_BYTES, "x"), i % 3)
+    pool = ProjectilePool()
+    for i in range(projectiles):
+        pool.spawn(100.0, 100.0, i * 0.01 % (2 * math.pi), i % 3, i % GameConfig.MAX_PLAYERS)
+    obstacles = [{"x": o.x, "y": o.y, "width": o.width, "height": o.height} for o in creer_obstacles()]
+    return table, pool, {"obstacles": obstacles, "start_time": 0.0, "duration": 180}
+
+
+def test_full_match_keyframe_fits_default_capacity():
+    """Plus de projectiles en vol que la limite du snapshot : l'image clé bornée tient dans la boîte."""
+    table, pool, static = full_match(GameConfig.SNAPSHOT_MAX_PROJECTILES + 1000)
+    message = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL).encode(
+        colonnes_joueurs(table), pool.snapshot(GameConfig.SNAPSHOT_MAX_PROJECTILES), static)
+    channel = SnapshotChannel.local()
+    channel.publish(message)
+
+    state = channel.reader().poll()
+    assert len(state["players"]) == GameConfig.MAX_PLAYERS
+    assert len(state["projectiles"]) == GameConfig.SNAPSHOT_MAX_PROJECTILES
+
+
+def test_snapshot_at_capacity_limit():
+    """Image clé de la taille exacte de la boîte, puis un projectile de trop : repli sans projectiles (real_game_logic)."""
+    table, pool, static = full_match(1001)
+    players = colonnes_joueurs(table)
+    message = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL).encode(players, pool.snapshot(1000), static)
+    channel = SnapshotChannel.local(capacity=len(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)))
+    reader = channel.reader()
+    channel.publish(message)
+    assert len(reader.poll()["projectiles"]) == 1000
+
+    encoder = SnapshotEncoder(GameConfig.SNAPSHOT_KEYFRAME_INTERVAL)
+    projectiles = pool.snapshot()
+    with pytest.raises(ValueError):
+        channel.publish(encoder.encode(players, projectiles, static))
+    encoder.force_keyframe()
+    channel.publish(encoder.encode(players, projectiles[:0], static))
+    state = reader.poll()
+    assert len(state["players"]) == GameConfig.MAX_PLAYERS
+    assert len(state["projectiles"]) == 0
@@ -0,0 +1,123 @@
+"""
+Module Channel
+Canal IPC borné : une mp.Queue de capacité fixe, une politique appliquée quand elle est pleine,
+et des compteurs partagés entre processus (messages acceptés, perdus, profondeur courante).
+
+Politiques :
+- DROP_OLDEST : le plus ancien message en attente est retiré pour faire place au nouveau
+  (flux d'états où seul le plus récent compte) ;
+- DROP_NEWEST : le nouveau message est abandonné (le producteur ne ralentit jamais) ;
+- BLOCK : le producteur attend qu'une place se libère, au plus `timeout` secondes (None : sans limite),
+  le message est compté comme perdu si le délai expire (commandes qui ne doivent pas se perdre).
+
+Un consommateur lent ne peut donc jamais faire croître la mémoire au-delà de `capacity` messages.
+"""
+import multiprocessing as mp
+from queue import Empty, Full
+
+from utils.config import ChannelConfig
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Indices des compteurs partagés
+_ENQUEUED, _DROPPED, _DEQUEUED = range(3)
+
+
+class BoundedChannel:
+    def __init__(self, name, capacity, policy=DROP_OLDEST, timeout=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Politique inconnue pour le canal {name}: {policy}")
+        if capacity < 1:
+            raise ValueError(f"Capacité invalide pour le canal {name}: {capacity}")
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self._queue = mp.Queue(maxsize=capacity)
+        self._counters = mp.Array("q", 3)
+
+    @classmethod
+    def from_config(cls, name):
+        """Canal dimensionné selon ChannelConfig.CHANNELS[name]."""
+        capacity, policy, timeout = ChannelConfig.CHANNELS[name]
+        return cls(name, capacity, policy, timeout)
+
+    def _count(self, index):
+        with self._counters.get_lock():
+            self._counters[index] += 1
+
+    # ------------------------------------------------------
+    # Producteur
+    # ------------------------------------------------------
+    def put(self, item):
+        """Envoie `item` selon la politique du canal ; retourne False si un message (celui-ci ou le plus ancien) est perdu."""
+        if self.policy == BLOCK:
+            try:
+                self._queue.put(item, timeout=self.timeout)
+            except Full:
+                self._count(_DROPPED)
+                return False
+            self._count(_ENQUEUED)
+            return True
+
+        accepted = True
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                break
+            except Full:
+                if self.policy == DROP_NEWEST:
+                    self._count(_DROPPED)
+                    return False
+                # DROP_OLDEST : retirer le plus ancien (le consommateur a pu le prendre entre-temps)
+                try:
+                    self._queue.get_nowait()
+                except Empty:
+                    continue
+                self._count(_DEQUEUED)
+                self._count(_DROPPED)
+                accepted = False
+        self._count(_ENQUEUED)
+        return accepted
+
+    # ------------------------------------------------------
+    # Consommateur
+    # ------------------------------------------------------
+    def get(self, block=True, timeout=None):
+        item = self._queue.get(block, timeout)
+        self._count(_DEQUEUED)
+        return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self):
+        return self._queue.empty()
+
+    @property
+    def reader(self):
+        """
+        Extrémité lisible de la queue, attendable par multiprocessing.connection.wait (boucle du manager).
+
+        Dépend d'un détail d'implémentation de CPython : mp.Queue n'expose pas sa Connection de lecture,
+        on utilise l'attribut privé `_reader` (présent au moins jusqu'à Python 3.13). S'il disparaît, le
+        canal devra reposer sur un Pipe explicite et un sémaphore de capacité.
+        """
+        return self._queue._reader
+
+    # ------------------------------------------------------
+    # Métriques
+    # ------------------------------------------------------
+    def stats(self):
+        """{"enqueued", "dropped", "depth"} : messages acceptés, perdus, en attente."""
+        with self._counters.get_lock():
+            enqueued, dropped, dequeued = self._counters[:]
+        return {"enqueued": enqueued, "dropped": dropped, "depth": max(0, enqueued - dequeued)}
+
+    def __repr__(self):
+        stats = self.stats()
+        return (f"<BoundedChannel {self.name} {self.policy} {stats['depth']}/{self.capacity} "
+                f"acceptés={stats['enqueued']} perdus={stats['dropped']}>")
@@ -6,7 +6,6 @@ organisés par catégories pour une meilleure maintenance.
 """
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
-import pygame
 import sys
 import logging
 from typing import Dict, Tuple
@@ -19,19 +18,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Config")
 
+# Résolution de référence transmise par le manager à ses processus enfants ("LARGEURxHAUTEUR")
+SCREEN_ENV = "PAINTWAR_SCREEN"
+DEFAULT_SCREEN = (1920, 1080)
+# Images par seconde, abaissées à 30 sur écran géant (voir _apply_screen)
+DEFAULT_FPS = 60
+
+
+class _LazyScreen(type):
+    """Métaclasse de GameConfig : BASE_WIDTH/BASE_HEIGHT et FPS ne sont résolus qu'au premier accès."""
+
+    def __getattr__(cls, name):
+        if name in ("BASE_WIDTH", "BASE_HEIGHT", "FPS"):
+            resolve_screen()
+            return type.__getattribute__(cls, name)
+        raise AttributeError(f"type object {cls.__name__!r} has no attribute {name!r}")
+
 # ------------------------------------------------------
 # CONFIGURATION DE BASE DU JEU
 # ------------------------------------------------------
-class GameConfig:
+class GameConfig(metaclass=_LazyScreen):
     """Configuration générale du jeu"""
     VERSION = "1.0.0"
     TITLE = "Paint War"
     DEBUG_MODE = True
     
     # Dimensions et performance
-    BASE_WIDTH = None
-    BASE_HEIGHT = None
-    FPS = 60
+    # BASE_WIDTH / BASE_HEIGHT / FPS : résolus à la demande par resolve_screen()
+
+    # Boucle de simulation (pas fixe)
+    SIM_HZ = 60  # pas de physique par seconde, indépendant du rythme réel de la boucle
+    SNAPSHOT_HZ = 60  # publications de display_data par seconde (ex: 30 sur machine faible)
+    SNAPSHOT_KEYFRAME_INTERVAL = 20  # deltas entre deux images clés (obstacles et état complet)
+    MAILBOX_CAPACITY = 1 << 18  # octets par emplacement de la boîte aux lettres des snapshots (x2, double tampon)
+    SNAPSHOT_MAX_PROJECTILES = 8192  # projectiles par snapshot (12 octets chacun) : le message tient dans la boîte
+    PROFILER_WINDOW = 600  # mesures par étape dans l'histogramme glissant du profileur de tours (10 s à 60 Hz)
+
+    # Lancement des processus enfants (utils.startup) : "spawn" ou "forkserver", surchargé par PAINTWAR_START_METHOD
+    START_METHOD = "spawn"
+    # Modules préchargés une fois par le serveur forkserver ("__main__" : manager.py et tout ce qu'il importe).
+    # pygame y est importé mais jamais initialisé : aucune connexion à l'affichage n'est héritée par les enfants
+    FORKSERVER_PRELOAD = ("__main__", "numpy", "aiohttp.web", "pygame", "qrcode", "PIL.Image")
+    PREPARE_DURATION = 6  # secondes de préparation (joueurs figés) avant le début de la partie
+    PODIUM_DURATION = 5  # secondes d'affichage du gagnant avant le retour au lobby
+    MAX_CATCHUP_STEPS = 5  # pas rattrapés au plus par itération après un retard
+    SPEED_REFERENCE_HZ = 60  # les vitesses (joueurs, projectiles) sont exprimées en px par pas à cette fréquence
     
     # Apparence
     BG_COLOR = (0, 0, 0)
@@ -39,6 +70,15 @@ class GameConfig:
     # Gestion de la partie
     DEFAULT_GAME_DURATION = 180  # Durée par défaut d'une partie en secondes (3 minutes)
     TEAMS_COUNT = 3  # Nombre d'équipes
+    MAX_PLAYERS = 128  # Capacité de la table des joueurs en mémoire partagée
+    PAINT_CELL_SIZE = 4  # Côté (px) d'une cellule de la grille de peinture (propriété par équipe)
+    PAINT_TILE_CELLS = 16  # Côté (cellules) d'une tuile de suivi des zones modifiées
+    COVERAGE_HZ = 30  # Publications par seconde des pourcentages en direct (processus couleurs)
+    COVERAGE_RESCAN_INTERVAL = 5.0  # Secondes entre deux recomptages complets de contrôle
+    COVERAGE_MODE = "compteurs"  # Couverture en direct : "compteurs" (incrémentale), "tuiles" (recomptage parallèle) ou "echantillon" (estimée)
+    COVERAGE_SAMPLES = 4096  # Pixels tirés par estimation en mode "echantillon"
+    COVERAGE_WORKERS = 4  # Threads du comptage par tuiles (mode "tuiles" et recomptages de contrôle)
+    COVERAGE_TILE_ROWS = 32  # Hauteur (lignes) d'une tuile du comptage par tuiles
     
     # QR Code
     QR_BOX_SIZE = 10
@@ -67,6 +107,20 @@ class GameConfig:
     # Intervalle d'envoi des snapshots couleur (secondes)
     COLOR_SNAPSHOT_INTERVAL = Performance.COLOR_ANALYSIS_INTERVAL
 # ------------------------------------------------------
+# CONFIGURATION DES CANAUX IPC
+# ------------------------------------------------------
+class ChannelConfig:
+    """Capacité, politique si plein et délai d'attente (politique "block") des canaux du manager"""
+    CHANNELS = {
+        "admin": (16, "block", 1.0),           # commandes admin -> manager (START_GAME), ne doivent pas se perdre
+        "manager": (8, "drop-oldest", None),   # état admin/manager (nombre de joueurs), seul le plus récent compte
+        "display": (16, "drop-oldest", None),  # messages vers l'affichage
+        "to_couleur": (4, "block", 1.0),       # contrôle du processus couleurs (None : arrêt)
+        "from_couleur": (4, "drop-oldest", None),  # pourcentages de couleurs, l'affichage ne garde que le dernier
+        "startup": (16, "drop-newest", None),  # enfants -> manager : processus prêt (mesure du démarrage)
+    }
+
+# ------------------------------------------------------
 # CONFIGURATION DES JOUEURS
 # ------------------------------------------------------
 class PlayerConfig:
@@ -93,6 +147,9 @@ class PlayerConfig:
     # Largeur du contour dans _draw_circle
     OUTLINE_W   = 2
 
+    # Taille des cellules de la broadphase joueurs (>= plus grande distance d'interaction)
+    BROADPHASE_CELL_SIZE = RADIUS * 4
+
 # ------------------------------------------------------
 # CONFIGURATION DES PROJECTILES
 # ------------------------------------------------------
@@ -104,6 +161,8 @@ class ProjectileConfig:
     PAINT_RADIUS = 10  # Rayon de l'impact de peinture
     LIFETIME = 2.0     # Durée de vie en secondes
     RANGE = 300        # Portée du projectile
+    MULTI_SHOT_SPREAD = 0.15  # Écart angulaire (radians) entre projectiles d'une salve multiple
+    POOL_CAPACITY = 4096      # Taille initiale du pool de projectiles (agrandi si besoin)
     
     # Couleurs des projectiles par équipe
     COLOR_MAP = {
@@ -126,6 +185,9 @@ class ObstacleConfig:
     MAX_WIDTH = 200
     MIN_HEIGHT = 10
     MAX_HEIGHT = 200
+
+    # Taille des cellules de l'index spatial (pixels)
+    GRID_CELL_SIZE = 64
     
     # Apparence
     COLOR = (100, 100, 100)  # Gris foncé
@@ -223,45 +285,93 @@ class ColorConfig:
 # ------------------------------------------------------
 # DÉTECTION DE L'ENVIRONNEMENT
 # ------------------------------------------------------
-# Initialiser pygame et le système vidéo uniquement si nécessaire
-try:
-    pygame.init()
-    pygame.display.init()
-    
-    # Obtenir la résolution native de l'écran
-    info = pygame.display.Info()
-    NATIVE_WIDTH = info.current_w
-    NATIVE_HEIGHT = info.current_h
+# Rien n'est initialisé à l'import : la résolution de l'écran est lue au premier accès
+# (GameConfig.BASE_WIDTH, NATIVE_WIDTH...). Le manager la détecte une seule fois avec pygame et
+# l'exporte dans SCREEN_ENV (share_screen) ; les processus enfants héritent de la variable et
+# n'ouvrent jamais de connexion au serveur d'affichage pour la connaître.
+_SCREEN_ATTRS = ("NATIVE_WIDTH", "NATIVE_HEIGHT", "IS_CINEMA_SCREEN", "IS_LARGE_SCREEN", "SCALE_X", "SCALE_Y")
+
+
+def _detect_screen():
+    """Résolution native de l'écran via pygame ; DEFAULT_SCREEN si aucun affichage n'est disponible."""
+    try:
+        import pygame
+        pygame.display.init()
+        try:
+            info = pygame.display.Info()
+            return info.current_w, info.current_h
+        finally:
+            # Libère la connexion au serveur d'affichage : seul l'affichage la garde ouverte
+            pygame.display.quit()
+    except Exception as e:
+        logger.warning(f"Erreur lors de l'initialisation de pygame: {e}")
+        return DEFAULT_SCREEN
+
+
+def _apply_screen(width, height, detected):
+    global NATIVE_WIDTH, NATIVE_HEIGHT, IS_CINEMA_SCREEN, IS_LARGE_SCREEN, SCALE_X, SCALE_Y
+    NATIVE_WIDTH = width
+    NATIVE_HEIGHT = height
 
     # On définit la taille logique de référence sur la même résolution
     GameConfig.BASE_WIDTH = NATIVE_WIDTH
     GameConfig.BASE_HEIGHT = NATIVE_HEIGHT
-    
+
     # Détecter les écrans exceptionnellement grands (cinéma, etc.)
     IS_CINEMA_SCREEN = (NATIVE_WIDTH > 3000 or NATIVE_HEIGHT > 2000)
     IS_LARGE_SCREEN = (NATIVE_WIDTH > 1920 or NATIVE_HEIGHT > 1080)
-    
+
     # Facteurs d'échelle
     SCALE_X = NATIVE_WIDTH / GameConfig.BASE_WIDTH
     SCALE_Y = NATIVE_HEIGHT / GameConfig.BASE_HEIGHT
-    
+
     # Ajustement de la configuration selon la taille de l'écran
+    GameConfig.FPS = DEFAULT_FPS
     if IS_CINEMA_SCREEN:
-        logger.info(f"Écran de taille exceptionnelle détecté: {NATIVE_WIDTH}x{NATIVE_HEIGHT}")
-        logger.info("Adaptation automatique des paramètres pour grand écran")
-        
+        if detected:
+            logger.info(f"Écran de taille exceptionnelle détecté: {NATIVE_WIDTH}x{NATIVE_HEIGHT}")
+            logger.info("Adaptation automatique des paramètres pour grand écran")
+
         # Adaptation du FPS pour les grands écrans (plus exigeants)
         if NATIVE_WIDTH * NATIVE_HEIGHT > 6000000:  # > 6 megapixels
             GameConfig.FPS = 30
-            logger.info("FPS limité à 30 pour optimiser les performances sur écran géant")
-except Exception as e:
-    logger.warning(f"Erreur lors de l'initialisation de pygame: {e}")
-    NATIVE_WIDTH = 1920
-    NATIVE_HEIGHT = 1080
-    IS_CINEMA_SCREEN = False
-    IS_LARGE_SCREEN = False
-    SCALE_X = 1.0
-    SCALE_Y = 1.0
+            if detected:
+                logger.info("FPS limité à 30 pour optimiser les performances sur écran géant")
+
+
+def resolve_screen():
+    """
+    (largeur, hauteur) de référence, résolue une seule fois par processus :
+    depuis SCREEN_ENV si le manager l'a transmise, sinon détectée avec pygame.
+    """
+    if "NATIVE_WIDTH" in globals():
+        return NATIVE_WIDTH, NATIVE_HEIGHT
+    shared = os.environ.get(SCREEN_ENV)
+    if shared:
+        try:
+            width, height = (int(v) for v in shared.lower().split("x"))
+            _apply_screen(width, height, detected=False)
+            return width, height
+        except ValueError:
+            logger.warning(f"{SCREEN_ENV} invalide ({shared!r}), détection de l'écran")
+    width, height = _detect_screen()
+    _apply_screen(width, height, detected=True)
+    return width, height
+
+
+def share_screen():
+    """Résout l'écran et l'exporte dans l'environnement hérité par les processus enfants (appelé par le manager)."""
+    width, height = resolve_screen()
+    os.environ[SCREEN_ENV] = f"{width}x{height}"
+    return width, height
+
+
+def __getattr__(name):
+    # NATIVE_WIDTH, IS_CINEMA_SCREEN... : résolus au premier accès comme GameConfig.BASE_WIDTH
+    if name in _SCREEN_ATTRS:
+        resolve_screen()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Enregistrer l'environnement d'exécution
 RUNNING_PLATFORM = sys.platform
\ No newline at end of file
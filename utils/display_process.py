@@ -1,30 +1,26 @@
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import math
-import pickle
 import random
 import time
-from math import hypot
 from queue import Empty
 
 import pygame
 
 from utils.config import PlayerConfig, TeamConfig, GameConfig
 from game_core.obstacle import Obstacle
+from utils import startup
 
-last_positions = {}
-player_was_dead = {}
 
 
 def display_main(
         display_queue,
-        lobby_state_queue,
+        state_channel,
         game_started,
         server_ip,
         calc_couleur,
-        to_couleur_queue,
         from_couleur_queue,
-        paint_surface_queue,
+        paint_buffer,
         prepare_phase,
         prepare_start_time,
         etat_jeu_precedent=False
@@ -36,9 +32,12 @@ def display_main(
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    # Surfaces
-    paint_surface = pygame.Surface((GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT), pygame.SRCALPHA)
-    paint_surface.fill((0, 0, 0, 0))  # transparent au départ
+    # Surfaces : la peinture est la grille de propriété tenue par le jeu, colorisée via une palette
+    paint_surface = paint_buffer.surface()
+    # Grille agrandie à l'échelle des pixels ; seules les tuiles modifiées depuis paint_generation sont refaites
+    cs = paint_buffer.cell_size
+    paint_layer = pygame.transform.scale(paint_surface, (paint_buffer.cols * cs, paint_buffer.rows * cs))
+    paint_generation = paint_buffer.generation
 
     render_surface = pygame.Surface((GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT), pygame.SRCALPHA)
 
@@ -49,14 +48,11 @@ def display_main(
         2: (150, 150, 255),
     }
 
-    # tentative bricollage pour eviter les lags (spoilers ca fonctionne pas des masses)
-    intervalle_couleur = 2.0
-    dernier_envoi = time.time()
+    # Pourcentages en direct publiés par le processus couleurs
     ratio_couleur = {0: 0, 1: 0, 2: 0}
 
-    # Intervalle d'envoi de la paint_surface
-    intervalle_surface = 0.1  # 100ms
-    dernier_envoi_surface = 0
+    # Dernier retour en lobby (durée d'affichage du gagnant)
+    retour_lobby = 0
 
     # QR code pour le lobby
     def generate_qr_code_image(url):
@@ -78,7 +74,9 @@ def display_main(
 
     running = True
     last_data = {}
+    state_reader = state_channel.reader()
     winner_info = None  # Stocker l'information du gagnant 
+    startup.ready()
     try:
         while running:
             for event in pygame.event.get():
@@ -87,21 +85,19 @@ def display_main(
                 elif event.type == pygame.VIDEORESIZE:
                     window = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
-            # Récupère l'état (lobby / jeu) si disponible
-            try:
-                while True:
-                    new_data = lobby_state_queue.get_nowait()
-                    # Préserver l'information du gagnant si elle existe
-                    if "winner" in new_data and new_data.get("show_winner", False):
-                        winner_info = new_data["winner"]
-                    last_data = new_data
-            except Empty:
-                pass
+            # Récupère l'état le plus récent (lobby / jeu) : images clés et deltas du jeu reconstruits
+            # en état complet, lobby et gagnant tels quels
+            new_data = state_reader.poll()
+            if new_data is not None:
+                # Préserver l'information du gagnant si elle existe
+                if "winner" in new_data and new_data.get("show_winner", False):
+                    winner_info = new_data["winner"]
+                last_data = new_data
 
-            # Récupère le dernier pourcentage de couleurs
+            # Récupère le dernier pourcentage de couleurs (on ne garde que le plus récent)
             try:
-                new_coul = from_couleur_queue.get_nowait()
-                ratio_couleur = new_coul
+                while True:
+                    ratio_couleur = from_couleur_queue.get_nowait()
             except Empty:
                 pass
 
@@ -115,53 +111,33 @@ def display_main(
                     txt_rect = txt_win.get_rect(center=(window.get_width() // 2, window.get_height() // 2))
                     render_surface.blit(txt_win, txt_rect)
 
-                print("[Display] Retour en lobby détecté, nettoyage de la peinture.")
-                paint_surface.fill((0, 0, 0, 0))  # Surface transparente
-                last_positions.clear()
-            if game_started.value and not etat_jeu_precedent:
-                paint_surface.fill((0, 0, 0, 0))  # Reset début de partie
+                print("[Display] Retour en lobby détecté.")
+                retour_lobby = time.time()
 
+            # Réinitialiser l'info du gagnant quand une nouvelle partie commence
+            if game_started.value and not etat_jeu_precedent:
+                winner_info = None
             etat_jeu_precedent = game_started.value
 
-            # Envoi de la paint_surface au processus de jeu pour détection de couleur
-            if game_started.value:
-                now = time.time()
-                if now - dernier_envoi_surface >= intervalle_surface:
-                    try:
-                        arr = pygame.surfarray.array3d(paint_surface)
-                        paint_surface_queue.put_nowait(arr)
-                        dernier_envoi_surface = now
-                    except:
-                        pass  # Queue pleine, on ignore
+            # Podium : la manche est finie (game_started à False) mais la carte finale reste affichée avec le gagnant
+            if winner_info and not game_started.value and time.time() - retour_lobby > GameConfig.PODIUM_DURATION:
+                winner_info = None
+            podium = winner_info is not None and not game_started.value
 
             # MODE LOBBY
-            if not game_started.value:
-                # Affichage du gagnant si présent, même en mode lobby
-                if winner_info:
-                    win_font = pygame.font.SysFont(None, 100)
-                    txt_win = win_font.render(f"VICTOIRE {winner_info}", True, (255, 200, 0))
-                    txt_rect = txt_win.get_rect(center=(render_surface.get_width() // 2, render_surface.get_height() // 2 - 150))
-                    render_surface.blit(txt_win, txt_rect)
-                    
-                    # Effacer l'info du gagnant après 5 secondes en mode lobby
-                    if time.time() - dernier_envoi_surface > 5:
-                        winner_info = None
+            if not game_started.value and not podium:
                 # Passez render_surface et window à la fonction render_lobby au lieu de "this"
-                render_lobby(window, render_surface, lobby_state_queue, qr_surf, server_ip)
+                render_lobby(window, render_surface, last_data, qr_surf, server_ip)
 
                 
 
             # MODE JEU
             else:
 
-                # Réinitialiser l'info du gagnant quand une nouvelle partie commence
-                if not etat_jeu_precedent:
-                    winner_info = None
-
                 players_data = last_data.get("players", {})
                 # Affichage du décompte centré pendant la phase préparation dans le mode jeu
                 if prepare_phase.value:
-                    countdown = int(6 - (time.time() - prepare_start_time.value))
+                    countdown = int(GameConfig.PREPARE_DURATION - (time.time() - prepare_start_time.value))
                     countdown = max(0, countdown)
 
                     big_font = pygame.font.SysFont(None, 150)
@@ -175,11 +151,17 @@ def display_main(
                         num_rect = num_surf.get_rect(center=(window.get_width() // 2, window.get_height() // 2 + 100))
                         render_surface.blit(num_surf, num_rect)
 
-                projectiles_data = last_data.get("projectiles", {})
+                projectiles_data = last_data.get("projectiles", [])
                 obstacles_data = last_data.get("obstacles", [])
 
-                # On colle la paint_surface (traînée) en fond
-                render_surface.blit(paint_surface, (0, 0))
+                # On colle la peinture (traînée) en fond
+                generation = paint_buffer.generation
+                if generation != paint_generation:
+                    for c0, r0, w, h in paint_buffer.dirty_rects(paint_generation):
+                        pygame.transform.scale(paint_surface.subsurface((c0, r0, w, h)), (w * cs, h * cs),
+                                               paint_layer.subsurface((c0 * cs, r0 * cs, w * cs, h * cs)))
+                    paint_generation = generation
+                render_surface.blit(paint_layer, (0, 0))
 
                 # Mise à jour traînée + joueurs
                 for pseudo, info in players_data.items():
@@ -197,32 +179,8 @@ def display_main(
                     is_dead = info.get("dead", False)
                     respawn_time = info.get("respawn_time", 0)
 
-                    if pseudo in last_positions and not is_dead:
-                        # Si le joueur était précédemment mort (marqué dans un dictionnaire)
-                        if pseudo in player_was_dead and player_was_dead[pseudo]:
-                            # Il vient de réapparaître, on supprime sa dernière position pour éviter la traînée
-                            del last_positions[pseudo]
-                            player_was_dead[pseudo] = False
-
-                    # Mettre à jour l'état de mort pour le prochain cycle
-                    if is_dead:
-                        player_was_dead[pseudo] = True
-
+                    # La traînée est peinte par le jeu dans la grille partagée
                     if not is_dead:
-                        # TRAÎNÉE FLUIDE seulement pour les joueurs vivants
-                        if pseudo in last_positions:
-                            old_x, old_y = last_positions[pseudo]
-                            dist = hypot(x - old_x, y - old_y)
-                            steps = int(dist // 6) + 1
-                            for i in range(steps):
-                                t = i / steps
-                                interp_x = old_x + t * (x - old_x)
-                                interp_y = old_y + t * (y - old_y)
-                                pygame.draw.circle(paint_surface, col, (int(interp_x), int(interp_y)), r)
-                        else:
-                            pygame.draw.circle(paint_surface, col, (int(x), int(y)), r)
-
-                        last_positions[pseudo] = (x, y)
                         pygame.draw.circle(render_surface, col, (x, y), r)
                         # Contour blanc du joueur
                         pygame.draw.circle(render_surface, (255, 255, 255), (x, y), r, width=2)
@@ -269,12 +227,9 @@ def display_main(
                         col_pv = (int((1 - pct) * 255), int(pct * 255), 0)
                         pygame.draw.rect(render_surface, col_pv, (bx, by, filled_w, bar_h))
 
-                # Projectiles
-                for pid, proj in projectiles_data.items():
-                    px = proj.get("x", 0)
-                    py = proj.get("y", 0)
-                    t = proj.get("team", 0)
-                    pygame.draw.circle(render_surface, projectile_color_map.get(t, (200, 200, 200)), (int(px), int(py)),
+                # Projectiles : lignes [x, y, team]
+                for px, py, t in projectiles_data:
+                    pygame.draw.circle(render_surface, projectile_color_map.get(int(t), (200, 200, 200)), (int(px), int(py)),
                                        5)
 
                 for obs in obstacles_data:
@@ -284,13 +239,6 @@ def display_main(
                     oh = obs.get("height", 40)
                     pygame.draw.rect(render_surface, (100, 100, 100), pygame.Rect(ox, oy, ow, oh))
 
-                # Envoi snapshot pour calcul couleur
-                if calc_couleur.value and (time.time() - dernier_envoi) >= intervalle_couleur:
-                    arr = pygame.surfarray.array3d(paint_surface)  # Conversion en tableau NumPy
-                    to_couleur_queue.put(pickle.dumps(arr))  # Envoi de la surface sérialisée
-                    dernier_envoi = time.time()
-                   # print("[Display] Snapshot envoyé pour calcul couleur")
-
                 # Barre (en haut) pour afficher le pourcentage
                 scoreboard_x, scoreboard_y = 200, 40
                 scoreboard_w, scoreboard_h = GameConfig.BASE_WIDTH-400, 20
@@ -306,8 +254,11 @@ def display_main(
                     pygame.draw.rect(render_surface, color_map[tid], (current_x, scoreboard_y, bar_w, scoreboard_h))
                     current_x += bar_w
 
+                # Marges à 95 % si la couverture est estimée par échantillonnage
+                marges = ratio_couleur.get("marge", {})
                 info_text = " | ".join([
-                    f"T{tid} {int(ratio_couleur[tid] * 100)}%" for tid in sorted(color_map.keys())
+                    f"T{tid} {int(ratio_couleur[tid] * 100)}%" + (f" ±{marges[tid] * 100:.1f}" if tid in marges else "")
+                    for tid in sorted(color_map.keys())
                 ])
                 txt_coul = font.render(info_text, True, (255, 255, 255))
                 render_surface.blit(txt_coul, (scoreboard_x + 10, scoreboard_y + scoreboard_h + 2))
@@ -389,14 +340,14 @@ def display_main(
         pygame.quit()
 
 
-def render_lobby(window, surface, lobby_state_queue, qr_img, local_ip):
+def render_lobby(window, surface, state, qr_img, local_ip):
     """
     Fonction de rendu du lobby.
 
     Args:
         window: Fenêtre Pygame
         surface: Surface sur laquelle dessiner
-        lobby_state_queue: Queue pour recevoir l'état du lobby
+        state: Dernier état reçu (lobby, ou jeu avec clé "players")
         qr_img: Image QR code pour rejoindre la partie
         local_ip: Adresse IP locale pour affichage
     """
@@ -423,22 +374,8 @@ def render_lobby(window, surface, lobby_state_queue, qr_img, local_ip):
     surface.blit(join_text, join_rect)
     surface.blit(url_text, url_rect)
 
-    # Récupérer l'état du lobby
-    # Utilisation d'un état local persistant
-    if not hasattr(render_lobby, "last_players"):
-        render_lobby.last_players = {}
-
-    # Mise à jour uniquement si de nouvelles données sont disponibles
-    if not lobby_state_queue.empty():
-        try:
-            render_lobby.last_players = lobby_state_queue.get_nowait()
-        except:
-            pass
-
     # Si on reçoit un état de jeu (avec clé "players"), on ne garde que la partie lobby
-    raw = render_lobby.last_players
-
-    players = raw["players"] if isinstance(raw, dict) and "players" in raw else raw
+    players = state["players"] if isinstance(state, dict) and "players" in state else state
 
     # Calcul dynamique des marges et zones utile
     w,h = surface.get_width(), surface.get_height()
@@ -1,76 +1,250 @@
 import logging
-import pickle
+import math
 import sys
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from utils.config import TeamConfig, GameConfig
+from utils import startup
 
 # Configuration du logger
 logger = logging.getLogger("AnalyseCouleur")
 
+# Tables de correspondance couleur empaquetée -> équipe, par (palette, seuil)
+_tables_couleurs = {}
+
+
+def empaqueter_rgb(arr):
+    """
+    Empaquette les pixels RGB (dernier axe de taille 3 ou 4, uint8) en un uint32 par pixel : R | G << 8 | B << 16.
+    Les octets sont lus au travers d'une vue uint32 (non alignée, un élément tous les 3 ou 4 octets)
+    masquée sur 24 bits : une seule passe, sans temporaire par canal.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    channels = arr.shape[-1]
+    flat = arr.reshape(-1)
+    n = flat.size // channels
+    packed = np.empty(n, dtype=np.uint32)
+    if n:
+        # Chaque élément de la vue déborde d'un octet sur le pixel suivant (masqué) : le dernier pixel est fait à part
+        view = np.ndarray((n - 1,), dtype="<u4", buffer=flat.data, strides=(channels,))
+        np.bitwise_and(view, 0xFFFFFF, out=packed[:-1])
+        r, g, b = (int(v) for v in flat[(n - 1) * channels:(n - 1) * channels + 3])
+        packed[-1] = r | (g << 8) | (b << 16)
+    return packed.reshape(arr.shape[:-1])
+
+
+def table_couleurs(map_couleur, seuil=0):
+    """
+    Table (2^24 entrées uint8) qui associe chaque couleur empaquetée à l'index + 1 de l'équipe
+    dont elle est à une distance euclidienne <= seuil (0 : correspondance exacte, 0 : aucune équipe).
+    Si deux tolérances se recouvrent, la première équipe de la palette l'emporte.
+    """
+    key = (tuple(map_couleur.items()), seuil)
+    table = _tables_couleurs.get(key)
+    if table is not None:
+        return table
+
+    table = np.zeros(1 << 24, dtype=np.uint8)
+    d = np.arange(-seuil, seuil + 1)
+    dr, dg, db = (a.ravel() for a in np.meshgrid(d, d, d, indexing="ij"))
+    sphere = dr * dr + dg * dg + db * db <= seuil * seuil
+    dr, dg, db = dr[sphere], dg[sphere], db[sphere]
+    for index, (r_ref, g_ref, b_ref) in reversed(list(enumerate(map_couleur.values()))):
+        r, g, b = r_ref + dr, g_ref + dg, b_ref + db
+        valid = (r >= 0) & (r < 256) & (g >= 0) & (g < 256) & (b >= 0) & (b < 256)
+        table[r[valid] | (g[valid] << 8) | (b[valid] << 16)] = index + 1
+    _tables_couleurs[key] = table
+    return table
+
+
+def compter_couleurs(arr, map_couleur, seuil=0):
+    """Nombre de pixels de chaque équipe, en une seule passe sur l'image (empaquetage + table + bincount)."""
+    labels = table_couleurs(map_couleur, seuil)[empaqueter_rgb(arr)]
+    # Comptage sur les étiquettes uint8 (np.bincount convertirait tout en int64)
+    return {team: int(np.count_nonzero(labels == index + 1)) for index, team in enumerate(map_couleur)}
+
+
 def calcul_pourcentage_nuance(arr, map_couleur, width, height, seuil=2):
     """
-    Calcule le pourcentage de chaque couleur présente dans l'image en utilisant NumPy pour une comparaison rapide.
+    Calcule le pourcentage de chaque couleur présente dans l'image (tolérance : distance RGB <= seuil).
+    Chaque pixel est classé une seule fois contre toutes les équipes (voir compter_couleurs).
     """
     total_pixels = width * height
     if total_pixels == 0:
         return {team: 0.0 for team in map_couleur}
 
-    # Conversion en tableau numpy (la surface est déjà convertie avec array3d)
-    arr = np.array(arr)  # Shape (height, width, 3) pour RGB
-
-    seuil_carre = seuil * seuil  # Calcul du seuil au carré pour comparer les distances
-    compteur_couleur = {team: 0 for team in map_couleur}
-
-    for ident, (r_ref, g_ref, b_ref) in map_couleur.items():
-        # Calcul de la distance carrée entre chaque pixel et la couleur de référence
-        r_diff = arr[:, :, 0] - r_ref
-        g_diff = arr[:, :, 1] - g_ref
-        b_diff = arr[:, :, 2] - b_ref
-        dist_carre = r_diff**2 + g_diff**2 + b_diff**2  # Distance carrée
-
-        # Compter le nombre de pixels dans la tolérance du seuil
-        pixels_color = np.sum(dist_carre <= seuil_carre)  # Seulement les pixels dont la distance est en-dessous du seuil
-        # print(f"Couleur {ident}: Pixels trouvés : {pixels_color}")  # Log pour vérifier les pixels comptés
-        compteur_couleur[ident] = pixels_color
+    compteur_couleur = compter_couleurs(arr, map_couleur, seuil)
 
     # Calcul des pourcentages en fonction du nombre total de pixels
     pourcentages = {team: (count / total_pixels) for team, count in compteur_couleur.items()}
-    # print(f"Pourcentages: {pourcentages}")  # Log pour vérifier les pourcentages calculés
 
     return pourcentages
 
 
 
-def processus_calcul_couleur(to_queue, from_queue, calc_couleur, paint_surface_queue=None):
+# Quantile de la loi normale pour un intervalle de confiance à 95 %
+Z_95 = 1.96
+
+
+def echantillon_stratifie(height, width, echantillons, rng=None):
     """
-    Processus qui calcule, en tâche de fond, les pourcentages de chaque couleur.
-    Cette fonction est maintenant optimisée avec NumPy.
+    Coordonnées (lignes, colonnes) d'environ `echantillons` pixels : l'image est découpée en strates
+    régulières et un pixel est tiré au hasard dans chacune (couverture uniforme, sans amas).
     """
+    rng = rng or np.random.default_rng()
+    ny = max(1, min(height, round(math.sqrt(echantillons * height / width))))
+    nx = max(1, min(width, echantillons // ny))
+    rows = ((np.arange(ny)[:, None] + rng.random((ny, nx))) * (height / ny)).astype(np.int64)
+    cols = ((np.arange(nx)[None, :] + rng.random((ny, nx))) * (width / nx)).astype(np.int64)
+    return rows.ravel(), cols.ravel()
 
-    seuil_rgb = 20  # Tolérance (fuzzy)
 
-    last_analysis_time = 0
-    analysis_interval = 0.5  # Intervalle d'analyse en secondes
+def _intervalles(compteur, n):
+    """(proportion, demi-largeur de l'intervalle à 95 %) par équipe ; borne de l'échantillon simple, prudente pour un tirage stratifié."""
+    resultat = {}
+    for team, count in compteur.items():
+        p = count / n
+        resultat[team] = (p, Z_95 * math.sqrt(p * (1 - p) / n))
+    return resultat
 
-    while calc_couleur.value:
-        current_time = time.time()
 
-        if current_time - last_analysis_time < analysis_interval:
-            time.sleep(0.1)
-            continue
+def estimer_couverture(owners, teams, echantillons=GameConfig.COVERAGE_SAMPLES, rng=None):
+    """Estimation de la couverture d'une grille de propriété (valeur team + 1) par échantillonnage stratifié."""
+    rows, cols = echantillon_stratifie(owners.shape[0], owners.shape[1], echantillons, rng)
+    sample = owners[rows, cols]
+    return _intervalles({team: int(np.count_nonzero(sample == team + 1)) for team in teams}, len(sample))
+
 
+def estimer_pourcentage_nuance(arr, map_couleur, echantillons=GameConfig.COVERAGE_SAMPLES, seuil=2, rng=None):
+    """
+    Estimation de calcul_pourcentage_nuance à partir d'un échantillon stratifié de pixels,
+    avec un intervalle de confiance à 95 % : {team: (proportion, marge)}.
+    """
+    arr = np.asarray(arr)
+    rows, cols = echantillon_stratifie(arr.shape[0], arr.shape[1], echantillons, rng)
+    sample = arr[rows, cols]
+    return _intervalles(compter_couleurs(sample, map_couleur, seuil), len(sample))
+
+
+class CouvertureTuiles:
+    """
+    Comptage exact par tuiles sur un pool de threads (NumPy et zlib relâchent le GIL sur les gros tableaux).
+
+    Les tuiles sont des bandes horizontales de `hauteur` lignes : contiguës en mémoire, leur somme de contrôle
+    (crc32) se calcule sans copie. Les comptes de chaque tuile sont gardés en cache avec sa somme de contrôle,
+    une tuile inchangée n'est donc pas recomptée.
+
+    Accepte une image RGB (h, w, 3|4), classée avec la table de couleurs, ou une grille de propriété 2D
+    (valeur team + 1, comme PaintBuffer.owners).
+    """
+
+    def __init__(self, map_couleur, hauteur=GameConfig.COVERAGE_TILE_ROWS, workers=GameConfig.COVERAGE_WORKERS, seuil=0):
+        self.map_couleur = map_couleur
+        self.hauteur = hauteur
+        self.seuil = seuil
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Couverture")
+        self._cache = {}  # début de bande -> (forme, crc32, comptes)
+        self.recomptees = 0  # tuiles recomptées lors du dernier appel
+
+    def _compter_tuile(self, start, tile, sale):
+        # sale : False si l'appelant sait que la tuile n'a pas changé (cache utilisé sans somme de contrôle)
+        cached = self._cache.get(start)
+        if sale is False and cached is not None and cached[0] == tile.shape:
+            return cached[2], False
+        checksum = zlib.crc32(tile)
+        if cached is not None and cached[0] == tile.shape and cached[1] == checksum:
+            return cached[2], False
+        if tile.ndim == 3:
+            labels = table_couleurs(self.map_couleur, self.seuil)[empaqueter_rgb(tile)]
+        else:
+            labels = tile
+        counts = [int(np.count_nonzero(labels == index + 1)) for index in range(len(self.map_couleur))]
+        self._cache[start] = (tile.shape, checksum, counts)
+        return counts, True
+
+    def compter(self, arr, lignes_sales=None):
+        """
+        Nombre de pixels (ou cellules) de chaque équipe. `lignes_sales` : booléen par ligne de `arr`
+        (ex: PaintBuffer.dirty_rows) ; les bandes sans ligne sale sont reprises du cache sans crc32.
+        """
+        arr = np.ascontiguousarray(arr)
+        futures = [
+            self.pool.submit(self._compter_tuile, start, arr[start:start + self.hauteur],
+                             None if lignes_sales is None else bool(lignes_sales[start:start + self.hauteur].any()))
+            for start in range(0, arr.shape[0], self.hauteur)
+        ]
+        totals = [0] * len(self.map_couleur)
+        self.recomptees = 0
+        for future in futures:
+            counts, recomptee = future.result()
+            self.recomptees += recomptee
+            for index, count in enumerate(counts):
+                totals[index] += count
+        return dict(zip(self.map_couleur, totals))
+
+    def pourcentages(self, arr, lignes_sales=None):
+        arr = np.asarray(arr)
+        total = arr.shape[0] * arr.shape[1]
+        return {team: (count / total if total else 0.0) for team, count in self.compter(arr, lignes_sales).items()}
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def processus_calcul_couleur(to_queue, from_queue, calc_couleur, paint_buffer):
+    """
+    Processus qui publie, en tâche de fond, les pourcentages de chaque couleur.
+    La couverture en direct est lue dans les compteurs de la grille partagée (PaintBuffer), tenus à jour
+    par le jeu à chaque tampon de peinture, et publiée dès que la génération change.
+    En mode "tuiles" (GameConfig.COVERAGE_MODE), elle est recomptée exactement par CouvertureTuiles
+    (pool de threads, tuiles inchangées prises dans le cache). En mode "echantillon", elle est estimée
+    sur un échantillon stratifié et publiée avec ses marges ({..., "marge": {team: demi-largeur à 95 %}}).
+    Un recomptage complet par tuiles sert de contrôle de cohérence périodique. to_queue reçoit None pour arrêter.
+    Le score final reste un comptage exact, fait par le jeu.
+    """
+    teams = list(TeamConfig.COLOR_MAP)
+    mode = GameConfig.COVERAGE_MODE
+    rng = np.random.default_rng()
+    tuiles = CouvertureTuiles(TeamConfig.COLOR_MAP)
+    publish_interval = 1.0 / GameConfig.COVERAGE_HZ
+    rescan_interval = GameConfig.COVERAGE_RESCAN_INTERVAL
+
+    last_generation = None
+    last_rescan = time.time()
+    startup.ready()
+
+    while calc_couleur.value:
         try:
-            if not to_queue.empty():
-                data = to_queue.get(block=False)
-                if data is None:
-                    break
-                # Désérialisation et analyse
-                arr = pickle.loads(data)  # Convertit l'objet sérialisé
-                result = calcul_pourcentage_nuance(arr, TeamConfig.COLOR_MAP, GameConfig.BASE_WIDTH, GameConfig.BASE_HEIGHT)
+            if not to_queue.empty() and to_queue.get(block=False) is None:
+                break
+
+            generation = paint_buffer.generation
+            if generation != last_generation:
+                if mode == "tuiles":
+                    # Seules les bandes touchées depuis la dernière publication sont recomptées
+                    result = tuiles.pourcentages(paint_buffer.owners, paint_buffer.dirty_rows(last_generation))
+                elif mode == "echantillon":
+                    estimation = estimer_couverture(paint_buffer.owners, teams, rng=rng)
+                    result = {team: p for team, (p, _) in estimation.items()}
+                    result["marge"] = {team: marge for team, (_, marge) in estimation.items()}
+                else:
+                    result = paint_buffer.live_coverage(teams)
                 from_queue.put(result)  # Envoie les résultats du calcul
-                last_analysis_time = current_time
+                last_generation = generation
+
+            current_time = time.time()
+            if current_time - last_rescan >= rescan_interval:
+                last_rescan = current_time
+                counts = [int(paint_buffer.counts[team + 1]) for team in teams]
+                exact = list(tuiles.compter(paint_buffer.owners).values())
+                # Écart significatif seulement si la grille n'a pas bougé pendant le recomptage
+                if paint_buffer.generation == generation and counts != exact:
+                    logger.warning("Compteurs de couverture incohérents: %s au lieu de %s", counts, exact)
         except Exception as e:
             print(f"Erreur lors du calcul des couleurs: {e}")
 
-        time.sleep(0.1)  # Attente avant la prochaine analyse
+        time.sleep(publish_interval)
+
+    tuiles.close()
@@ -0,0 +1,105 @@
+"""
+Module Startup
+Stratégie de lancement des processus enfants et mesure du temps de démarrage.
+
+Deux méthodes (GameConfig.START_METHOD, surchargée par la variable d'environnement PAINTWAR_START_METHOD) :
+- "spawn" : chaque enfant démarre un interpréteur neuf et réimporte le module principal
+  (pygame, NumPy, aiohttp...) pour son propre compte ;
+- "forkserver" : un serveur lancé au premier démarrage précharge une seule fois les modules de
+  GameConfig.FORKSERVER_PRELOAD, puis chaque enfant est forké depuis lui, modules déjà importés.
+  Rien n'y ouvre l'affichage (utils.config n'initialise plus pygame à l'import), les enfants
+  forkés n'héritent donc d'aucune connexion au serveur graphique.
+
+Chaque enfant lancé par `launch` signale au manager le moment où il est prêt (`ready`), ce qui
+donne le temps écoulé depuis le lancement de `python manager.py` jusqu'à chaque processus prêt.
+"""
+import logging
+import multiprocessing as mp
+import os
+import time
+
+from utils.config import GameConfig
+
+logger = logging.getLogger("Startup")
+
+START_METHOD_ENV = "PAINTWAR_START_METHOD"
+START_METHODS = ("spawn", "forkserver")
+
+# Instant d'import, à défaut de connaître celui du lancement du processus (hors Linux)
+_IMPORTED_AT = time.time()
+
+# Côté enfant : canal de démarrage et nom transmis par launch
+_channel = None
+_name = None
+
+
+def configure_start_method():
+    """Applique la méthode de lancement configurée (appelé une fois par le manager) ; retourne son nom."""
+    method = os.environ.get(START_METHOD_ENV, GameConfig.START_METHOD)
+    if method not in START_METHODS:
+        raise ValueError(f"Méthode de lancement inconnue: {method} (attendu: {', '.join(START_METHODS)})")
+    if method not in mp.get_all_start_methods():
+        logger.warning(f"Méthode {method} indisponible sur cette plateforme, repli sur spawn")
+        method = "spawn"
+    mp.set_start_method(method)
+    if method == "forkserver":
+        mp.set_forkserver_preload(list(GameConfig.FORKSERVER_PRELOAD))
+    return method
+
+
+def process_start_time():
+    """Instant (time.time()) du lancement de ce processus ; à défaut, celui de l'import de ce module."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Le nom du programme (2e champ) peut contenir des espaces : on coupe après la parenthèse fermante
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")  # champ 22 : starttime, en tics depuis le boot
+        return time.time() - (uptime - started)
+    except (OSError, ValueError, IndexError):
+        return _IMPORTED_AT
+
+
+def launch(name, channel, target, *args):
+    """Point d'entrée des processus enfants : retient le canal de démarrage, puis exécute `target(*args)`."""
+    global _channel, _name
+    _channel, _name = channel, name
+    return target(*args)
+
+
+def ready():
+    """Signale au manager que ce processus est prêt ; sans effet hors d'un processus lancé par launch, ou la seconde fois."""
+    global _channel
+    if _channel is not None:
+        _channel.put((_name, time.time()))
+        _channel = None
+
+
+class StartupReport:
+    """Côté manager : instants où chaque processus attendu s'est déclaré prêt."""
+
+    def __init__(self, method, expected, started_at=None):
+        self.method = method
+        self.expected = set(expected)
+        self.started_at = started_at if started_at is not None else process_start_time()
+        self.ready_at = {}
+
+    def mark(self, name, when):
+        """Enregistre un processus prêt ; retourne True quand tous les processus attendus le sont."""
+        if name in self.expected:
+            self.ready_at.setdefault(name, when)
+        return self.complete
+
+    @property
+    def complete(self):
+        return self.expected.issubset(self.ready_at)
+
+    @property
+    def total(self):
+        return max(self.ready_at.values()) - self.started_at
+
+    def __str__(self):
+        details = " ".join(f"{name}={when - self.started_at:.2f}s"
+                           for name, when in sorted(self.ready_at.items(), key=lambda item: item[1]))
+        return f"Démarrage ({self.method}) : tous les processus prêts en {self.total:.2f}s ({details})"